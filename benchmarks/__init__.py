@@ -0,0 +1,18 @@
+"""
+Benchmark beban kerja aplikasi HR.
+
+Jalankan dari direktori utama proyek dengan DATABASE_URL mengarah ke database khusus benchmark
+(isi database akan diubah):
+
+    python -m benchmarks generate --jumlah 100000
+    python -m benchmarks run --output hasil.json
+    python -m benchmarks compare sebelum.json hasil.json
+
+Throughput server HTTP yang sudah berjalan (mis. gunicorn -c gunicorn.conf.py app:app):
+
+    python -m benchmarks throughput --url http://127.0.0.1:5000 --konkurensi 16 --durasi 20
+
+Waktu start aplikasi (python -X importtime di proses baru):
+
+    python -m benchmarks startup --maks-ms 1500
+"""
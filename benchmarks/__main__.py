@@ -0,0 +1,215 @@
+import json
+import os
+import platform
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+import click
+
+# Log per request dari aplikasi tidak perlu ditampilkan selama benchmark
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+
+def _commit_git():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                              ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@click.group()
+def cli():
+    """Benchmark beban kerja aplikasi HR (memakai DATABASE_URL)."""
+
+
+@cli.command()
+@click.option('--jumlah', default=10000, show_default=True, help='Jumlah karyawan yang ditambahkan (10k-1M).')
+@click.option('--dokumen', 'dokumen_rata_rata', default=1.5, show_default=True,
+              help='Rata-rata jumlah dokumen per karyawan.')
+@click.option('--seed', default=42, show_default=True, help='Seed data acak (hasil deterministik).')
+@click.option('--kosongkan', is_flag=True, help='Hapus semua karyawan dan dokumen lebih dulu.')
+def generate(jumlah, dokumen_rata_rata, seed, kosongkan):
+    """Mengisi database dengan karyawan dan dokumen sintetis (skema dibuat dengan migrasi)."""
+    from flask_migrate import upgrade
+    from app import app
+    from benchmarks.data import generate_data, kosongkan_data
+
+    with app.app_context():
+        upgrade(directory=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations'))
+        if kosongkan:
+            kosongkan_data()
+
+        def laporkan(selesai, total):
+            click.echo(f'\r{selesai}/{total} karyawan', nl=False)
+
+        mulai = datetime.now()
+        generate_data(jumlah, dokumen_rata_rata, seed, app.config['UPLOAD_FOLDER_DOC'], laporkan)
+        click.echo(f'\nSelesai dalam {(datetime.now() - mulai).total_seconds():.1f} detik.')
+
+
+@cli.command()
+@click.option('--skenario', 'nama_skenario', multiple=True,
+              help='Nama skenario (boleh berulang; awalan juga cocok, mis. "dashboard"). Default: semua.')
+@click.option('--output', default=None, help='File JSON hasil (default: benchmark-<commit>-<waktu>.json).')
+@click.option('--iterasi', default=None, type=int, help='Ganti jumlah iterasi semua skenario.')
+@click.option('--pemanasan', default=None, type=int, help='Ganti jumlah iterasi pemanasan semua skenario.')
+@click.option('--tanpa-isolasi', is_flag=True,
+              help='Jalankan semua skenario di satu proses (peak RSS tidak lagi per skenario).')
+@click.option('--daftar', is_flag=True, help='Tampilkan nama skenario lalu keluar.')
+def run(nama_skenario, output, iterasi, pemanasan, tanpa_isolasi, daftar):
+    """Menjalankan skenario dan menyimpan latensi, jumlah query, dan peak RSS ke JSON."""
+    from benchmarks.skenario import SKENARIO, jalankan_skenario
+
+    if daftar:
+        for nama, definisi in SKENARIO.items():
+            click.echo(f'{nama} (iterasi {definisi.iterasi}, pemanasan {definisi.pemanasan})')
+        return
+
+    dipilih = [nama for nama in SKENARIO
+               if not nama_skenario or any(nama == n or nama.startswith(n) for n in nama_skenario)]
+    if not dipilih:
+        raise click.UsageError('Tidak ada skenario yang cocok. Lihat --daftar.')
+
+    commit = _commit_git()
+    waktu = datetime.now()
+    hasil = {
+        'meta': {
+            'waktu': waktu.isoformat(timespec='seconds'),
+            'commit': commit,
+            'database': os.environ.get('DATABASE_URL', 'sqlite (fallback)').split('://', 1)[0],
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'isolasi': not tanpa_isolasi,
+        },
+        'skenario': {},
+    }
+
+    for nama in dipilih:
+        click.echo(f'{nama} ... ', nl=False)
+        if tanpa_isolasi:
+            ringkasan = jalankan_skenario(nama, iterasi, pemanasan)
+        else:
+            # Proses baru per skenario, sehingga peak RSS dan cache tidak terbawa dari skenario sebelumnya
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                ringkasan = executor.submit(jalankan_skenario, nama, iterasi, pemanasan).result()
+        hasil['skenario'][nama] = ringkasan
+        latensi = ringkasan.get('latensi_ms', {})
+        click.echo(f"p50 {latensi.get('p50')} ms, p95 {latensi.get('p95')} ms, "
+                   f"query {ringkasan.get('query', {}).get('mean')}, RSS {ringkasan.get('peak_rss_mb')} MB")
+
+    output = output or f"benchmark-{commit or 'tanpa-git'}-{waktu:%Y%m%d%H%M%S}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(hasil, f, indent=2, ensure_ascii=False)
+    click.echo(f'Hasil disimpan ke {output}')
+
+
+@cli.command()
+@click.option('--url', default='http://127.0.0.1:5000', show_default=True, help='Alamat server yang sudah berjalan.')
+@click.option('--path', 'daftar_path', multiple=True,
+              help='Path yang diminta bergiliran (boleh berulang). Default: /dashboard, /karyawan, dan '
+                   '/karyawan?after=<cursor> ke halaman tengah daftar karyawan.')
+@click.option('--konkurensi', default=16, show_default=True, help='Jumlah koneksi bersamaan.')
+@click.option('--durasi', default=20.0, show_default=True, help='Lama pengukuran (detik).')
+@click.option('--pemanasan', default=3.0, show_default=True, help='Lama pemanasan yang tidak dihitung (detik).')
+@click.option('--label', default=None, help='Nama konfigurasi server (disimpan di hasil).')
+@click.option('--output', default=None, help='File JSON hasil (default: hanya ditampilkan).')
+def throughput(url, daftar_path, konkurensi, durasi, pemanasan, label, output):
+    """
+    Mengukur request per detik server HTTP (mis. Gunicorn) dengan konfigurasi tertentu.
+
+    Server harus memakai DATABASE_URL dan SECRET_KEY yang sama dengan proses ini, karena cookie
+    login dibuat di sini.
+    """
+    from benchmarks.beban import cookie_login, path_halaman_tengah, ukur_throughput
+
+    daftar_path = list(daftar_path)
+    if not daftar_path:
+        daftar_path = ['/dashboard', '/karyawan']
+        # Paginasi keyset memakai ?after=<cursor> (bukan ?page=), jadi cursor diambil dari database
+        tengah = path_halaman_tengah()
+        if tengah:
+            daftar_path.append(tengah)
+    hasil = ukur_throughput(url, daftar_path, konkurensi, durasi, pemanasan, cookie=cookie_login())
+    hasil['meta'] = {
+        'waktu': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit_git(),
+        'label': label,
+        'url': url,
+        'path': daftar_path,
+        'konkurensi': konkurensi,
+        'cpu': os.cpu_count(),
+    }
+    click.echo(f"{label or url}: {hasil['rps']} req/s, p50 {hasil['latensi_ms']['p50']} ms, "
+               f"p95 {hasil['latensi_ms']['p95']} ms, p99 {hasil['latensi_ms']['p99']} ms, "
+               f"error {hasil['error']}")
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(hasil, f, indent=2, ensure_ascii=False)
+        click.echo(f'Hasil disimpan ke {output}')
+
+
+@cli.command()
+@click.option('--kode', default='import app', show_default=True, help='Kode Python yang diukur waktu impornya.')
+@click.option('--ulangan', default=5, show_default=True, help='Jumlah proses baru yang diukur.')
+@click.option('--maks-ms', default=None, type=float,
+              help='Gagal (exit 1) jika median waktu impor melebihi nilai ini, atau pustaka berat ikut terimpor.')
+@click.option('--output', default=None, help='File JSON hasil (default: hanya ditampilkan).')
+def startup(kode, ulangan, maks_ms, output):
+    """Mengukur waktu start aplikasi dingin dengan python -X importtime (untuk mendeteksi regresi)."""
+    from benchmarks.startup import ukur_startup
+
+    hasil = ukur_startup(kode, ulangan)
+    hasil['meta'] = {
+        'waktu': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit_git(),
+        'python': platform.python_version(),
+    }
+    click.echo(f"{kode}: p50 {hasil['import_ms']['p50']} ms (min {hasil['import_ms']['min']}, "
+               f"max {hasil['import_ms']['max']})")
+    for nama, ms in hasil['modul_termahal_ms'].items():
+        click.echo(f'  {nama:<40} {ms:>8} ms')
+    if hasil['modul_berat_terimpor']:
+        click.echo(f"Pustaka berat ikut terimpor: {', '.join(hasil['modul_berat_terimpor'])}")
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(hasil, f, indent=2, ensure_ascii=False)
+        click.echo(f'Hasil disimpan ke {output}')
+    if maks_ms is not None and (hasil['import_ms']['p50'] > maks_ms or hasil['modul_berat_terimpor']):
+        raise SystemExit(1)
+
+
+def _perubahan(lama, baru):
+    if lama in (None, 0) or baru is None:
+        return ''
+    return f'{(baru - lama) / lama * 100:+.0f}%'
+
+
+@cli.command()
+@click.argument('sebelum', type=click.File(encoding='utf-8'))
+@click.argument('sesudah', type=click.File(encoding='utf-8'))
+def compare(sebelum, sesudah):
+    """Membandingkan dua file hasil (p50, p95, query, peak RSS per skenario)."""
+    lama, baru = json.load(sebelum), json.load(sesudah)
+    click.echo(f"{lama['meta'].get('commit')} -> {baru['meta'].get('commit')}")
+    click.echo(f"{'skenario':<40} {'p50 ms':>18} {'p95 ms':>18} {'query':>14} {'RSS MB':>14}")
+    for nama, hasil_baru in baru['skenario'].items():
+        hasil_lama = lama['skenario'].get(nama)
+        if not hasil_lama or not hasil_baru.get('iterasi') or not hasil_lama.get('iterasi'):
+            click.echo(f'{nama:<40} (tidak ada pembanding)')
+            continue
+        kolom = []
+        for nilai_lama, nilai_baru in (
+                (hasil_lama['latensi_ms']['p50'], hasil_baru['latensi_ms']['p50']),
+                (hasil_lama['latensi_ms']['p95'], hasil_baru['latensi_ms']['p95']),
+                (hasil_lama['query']['mean'], hasil_baru['query']['mean']),
+                (hasil_lama['peak_rss_mb'], hasil_baru['peak_rss_mb'])):
+            kolom.append(f'{nilai_baru} ({_perubahan(nilai_lama, nilai_baru) or "="})')
+        click.echo(f'{nama:<40} {kolom[0]:>18} {kolom[1]:>18} {kolom[2]:>14} {kolom[3]:>14}')
+
+
+if __name__ == '__main__':
+    cli()
@@ -0,0 +1,113 @@
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.pengukuran import persentil
+
+
+def cookie_login(user_id=1):
+    """
+    Cookie sesi yang sudah login, dibuat lewat session interface aplikasi (cookie bertanda tangan
+    atau ID sesi di penyimpanan server, sesuai SESSION_BACKEND).
+    """
+    from flask import request
+    from app import app
+
+    with app.test_request_context():
+        sesi = app.session_interface.open_session(app, request)
+        sesi['user_id'] = user_id
+        sesi['username'] = 'benchmark'
+        response = app.response_class()
+        app.session_interface.save_session(app, sesi, response)
+    return response.headers['Set-Cookie'].split(';', 1)[0]
+
+
+def path_halaman_tengah():
+    """
+    Path /karyawan?after=<cursor> ke halaman di tengah daftar karyawan (paginasi keyset),
+    atau None jika tabel karyawan kosong. Cursor diambil dari data nyata, sama seperti
+    skenario karyawan[halaman_tengah].
+    """
+    from sqlalchemy import func, select
+    from app import app
+    from models import db
+    from models.karyawan import Karyawan
+    from services.paginasi import encode_cursor
+
+    with app.app_context():
+        jumlah = db.session.execute(select(func.count(Karyawan.id))).scalar()
+        tengah = db.session.execute(
+            select(Karyawan.nama, Karyawan.id).order_by(Karyawan.nama, Karyawan.id).offset(jumlah // 2).limit(1)
+        ).first()
+    return f'/karyawan?after={encode_cursor(tengah)}' if tengah else None
+
+
+def _pekerja(url, daftar_path, cookie, berhenti, latensi, galat, kunci):
+    bagian = urlsplit(url)
+    koneksi = http.client.HTTPConnection(bagian.hostname, bagian.port or 80, timeout=30)
+    headers = {'Cookie': cookie} if cookie else {}
+    urutan = 0
+    lokal, gagal = [], []
+    while not berhenti.is_set():
+        path = daftar_path[urutan % len(daftar_path)]
+        urutan += 1
+        mulai = time.perf_counter()
+        try:
+            koneksi.request('GET', bagian.path.rstrip('/') + path, headers=headers)
+            response = koneksi.getresponse()
+            response.read()
+            if response.status >= 400:
+                gagal.append(f'HTTP {response.status}')
+            elif response.getheader('Connection', '').lower() == 'close':
+                koneksi.close()
+        except (OSError, http.client.HTTPException) as e:
+            gagal.append(type(e).__name__)
+            koneksi.close()
+        lokal.append(time.perf_counter() - mulai)
+    koneksi.close()
+    with kunci:
+        latensi.extend(lokal)
+        galat.extend(gagal)
+
+
+def ukur_throughput(url, daftar_path, konkurensi, durasi, pemanasan=2.0, cookie=None):
+    """
+    Membebani server HTTP yang sudah berjalan dengan `konkurensi` koneksi keep-alive
+    selama `durasi` detik (setelah `pemanasan` detik yang tidak dihitung).
+
+    Mengembalikan request per detik, persentil latensi, dan jumlah error.
+    """
+    if pemanasan:
+        ukur_throughput(url, daftar_path, konkurensi, pemanasan, pemanasan=0, cookie=cookie)
+
+    berhenti = threading.Event()
+    latensi, galat, kunci = [], [], threading.Lock()
+    daftar_thread = [
+        threading.Thread(target=_pekerja, args=(url, daftar_path, cookie, berhenti, latensi, galat, kunci),
+                         daemon=True)
+        for _ in range(konkurensi)
+    ]
+    mulai = time.perf_counter()
+    for thread in daftar_thread:
+        thread.start()
+    time.sleep(durasi)
+    berhenti.set()
+    for thread in daftar_thread:
+        thread.join()
+    lama = time.perf_counter() - mulai
+
+    latensi_ms = sorted(nilai * 1000 for nilai in latensi)
+    return {
+        'request': len(latensi_ms),
+        'durasi_detik': round(lama, 2),
+        'rps': round(len(latensi_ms) / lama, 1),
+        'latensi_ms': {
+            'p50': round(persentil(latensi_ms, 50), 2) if latensi_ms else None,
+            'p95': round(persentil(latensi_ms, 95), 2) if latensi_ms else None,
+            'p99': round(persentil(latensi_ms, 99), 2) if latensi_ms else None,
+            'max': round(latensi_ms[-1], 2) if latensi_ms else None,
+        },
+        'error': len(galat),
+        'contoh_error': sorted(set(galat))[:5],
+    }
@@ -0,0 +1,154 @@
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, insert, select, text
+
+from models import db
+from models.dokumen import Dokumen
+from models.karyawan import Karyawan
+
+# Jumlah baris per INSERT executemany
+UKURAN_BATCH = 5000
+
+NAMA_DEPAN = ['Adi', 'Agus', 'Ahmad', 'Andi', 'Ani', 'Budi', 'Dewi', 'Dian', 'Eka', 'Fajar', 'Fitri', 'Hendra',
+              'Indah', 'Joko', 'Kartika', 'Lestari', 'Muhammad', 'Nur', 'Putri', 'Rina', 'Rudi', 'Sari', 'Siti',
+              'Sri', 'Teguh', 'Wahyu', 'Wulan', 'Yanti', 'Yudi', 'Zainal']
+NAMA_BELAKANG = ['Hidayat', 'Kurniawan', 'Lubis', 'Nasution', 'Pratama', 'Purnomo', 'Rahman', 'Saputra',
+                 'Santoso', 'Setiawan', 'Siregar', 'Sitompul', 'Susanto', 'Utami', 'Wibowo', 'Wijaya',
+                 'Permata', 'Maharani', 'Hakim', 'Gunawan']
+KOTA = ['Jakarta', 'Bandung', 'Surabaya', 'Medan', 'Semarang', 'Makassar', 'Palembang', 'Yogyakarta',
+        'Denpasar', 'Balikpapan', 'Pekanbaru', 'Padang', 'Malang', 'Pontianak', 'Manado', 'Banjarmasin',
+        'Jambi', 'Kupang', 'Mataram', 'Ambon', 'Jayapura', 'Bengkulu', 'Cirebon', 'Solo', 'Bogor']
+# (jabatan, bobot)
+JABATAN = [('Staf Administrasi', 30), ('Staf Operasional', 25), ('Teller', 15), ('Customer Service', 12),
+           ('Analis', 6), ('Supervisor', 5), ('Pengemudi', 4), ('Satpam', 8), ('Kepala Seksi', 2),
+           ('Manajer', 1)]
+JENIS_DOKUMEN = ['KTP', 'CV', 'Ijazah', 'Kontrak', 'SK']
+
+
+def daftar_unit_kerja():
+    """Unit kerja realistis: kantor pusat, kantor wilayah, dan cabang di tiap kota."""
+    unit = ['Kantor Pusat']
+    unit += [f'Kantor Wilayah {kota}' for kota in KOTA[:8]]
+    unit += [f'Cabang {kota}' for kota in KOTA]
+    unit += [f'Cabang Pembantu {kota}' for kota in KOTA[:15]]
+    return unit
+
+
+def _bobot_zipf(jumlah, eksponen=1.1):
+    # Beberapa unit besar dan banyak unit kecil, seperti organisasi sebenarnya
+    return [1 / (peringkat ** eksponen) for peringkat in range(1, jumlah + 1)]
+
+
+class GeneratorKaryawan:
+    """Membuat baris karyawan dan dokumen sintetis yang deterministik untuk `seed` tertentu."""
+
+    def __init__(self, seed=42, today=None):
+        self.acak = random.Random(seed)
+        self.today = today or date.today()
+        self.unit_kerja = daftar_unit_kerja()
+        self.bobot_unit = _bobot_zipf(len(self.unit_kerja))
+        self.jabatan = [j for j, _ in JABATAN]
+        self.bobot_jabatan = [b for _, b in JABATAN]
+
+    def karyawan(self, nomor):
+        acak = self.acak
+        today = self.today
+        tanggal_mulai = today - timedelta(days=acak.randint(30, 12 * 365))
+        aktif = acak.random() < 0.88
+
+        if aktif:
+            # Sebagian besar kontrak masih berjalan, sekitar 12% habis dalam 90 hari, sebagian kecil lewat
+            tanggal_akhir = today + timedelta(days=acak.randint(-30, 720))
+            sisa = (tanggal_akhir - today).days
+            if sisa < 0:
+                tindak_lanjut = acak.choice(['Tidak diperpanjang', 'Dalam proses perpanjangan kontrak'])
+            elif sisa <= 90:
+                tindak_lanjut = acak.choices(
+                    ['Tidak perlu', 'Belum ditindaklanjuti', 'Telah dikonfirmasi ke cabang/unit kerja',
+                     'Dalam proses perpanjangan kontrak', 'Tidak diperpanjang'],
+                    weights=[2, 4, 2, 2, 1])[0]
+            else:
+                tindak_lanjut = 'Tidak perlu'
+        else:
+            tanggal_akhir = today - timedelta(days=acak.randint(1, 5 * 365))
+            tindak_lanjut = 'Tidak diperpanjang'
+        tanggal_akhir = max(tanggal_akhir, tanggal_mulai + timedelta(days=30))
+
+        perempuan = acak.random() < 0.5
+        nama = f'{acak.choice(NAMA_DEPAN)} {acak.choice(NAMA_BELAKANG)}'
+        if acak.random() < 0.3:
+            nama += f' {acak.choice(NAMA_BELAKANG)}'
+        gaji = int(acak.lognormvariate(15.3, 0.35)) // 50000 * 50000
+        return {
+            'id': nomor,
+            'nama': nama,
+            'jenis_kelamin': 'Perempuan' if perempuan else 'Laki-laki',
+            'nup': f'{tanggal_mulai.year}{nomor:08d}',
+            'tempat_lahir': acak.choice(KOTA),
+            'tanggal_lahir': today - timedelta(days=acak.randint(20 * 365, 56 * 365)),
+            'nik': f'32{nomor:014d}',
+            'alamat': f'Jl. {acak.choice(NAMA_BELAKANG)} No. {acak.randint(1, 200)}, {acak.choice(KOTA)}',
+            'no_hp': f'08{acak.randint(100000000, 9999999999)}',
+            'jabatan': acak.choices(self.jabatan, weights=self.bobot_jabatan)[0],
+            'unit_kerja': acak.choices(self.unit_kerja, weights=self.bobot_unit)[0],
+            'email': f'karyawan{nomor}@contoh.co.id' if acak.random() < 0.7 else None,
+            'tanggal_mulai': tanggal_mulai,
+            'tanggal_akhir_kontrak': tanggal_akhir,
+            'gaji_honorarium': gaji,
+            'tunjangan_tetap': gaji * acak.randint(10, 25) // 100 // 1000 * 1000,
+            'status': 'Aktif' if aktif else 'Nonaktif',
+            'tindak_lanjut_kontrak': tindak_lanjut,
+        }
+
+    def dokumen(self, karyawan_id, rata_rata, folder):
+        jumlah = min(len(JENIS_DOKUMEN), int(self.acak.expovariate(1 / rata_rata))) if rata_rata else 0
+        for jenis in self.acak.sample(JENIS_DOKUMEN, jumlah):
+            yield {
+                'karyawan_id': karyawan_id,
+                'jenis': jenis,
+                'file_path': f'{folder}/{jenis.lower()}_{karyawan_id}.pdf',
+                'nomor_surat': f'SPK.{karyawan_id:03d}/KR/BKI-{self.today.year}' if jenis == 'Kontrak' else None,
+                'tanggal_upload': self.today - timedelta(days=self.acak.randint(0, 3 * 365)),
+            }
+
+
+def kosongkan_data():
+    """Menghapus semua dokumen dan karyawan."""
+    db.session.execute(delete(Dokumen))
+    db.session.execute(delete(Karyawan))
+    db.session.commit()
+
+
+def generate_data(jumlah, dokumen_rata_rata=1.5, seed=42, folder_dokumen='uploads/dokumen', laporkan=None):
+    """
+    Menambahkan `jumlah` karyawan sintetis (beserta dokumennya) ke database aktif.
+
+    Baris disisipkan per UKURAN_BATCH dengan INSERT executemany; id dimulai setelah id
+    terbesar yang sudah ada. File dokumen tidak dibuat, hanya record-nya.
+    """
+    generator = GeneratorKaryawan(seed)
+    awal = (db.session.execute(select(func.max(Karyawan.id))).scalar() or 0) + 1
+
+    for mulai in range(awal, awal + jumlah, UKURAN_BATCH):
+        akhir = min(mulai + UKURAN_BATCH, awal + jumlah)
+        baris_karyawan = [generator.karyawan(nomor) for nomor in range(mulai, akhir)]
+        baris_dokumen = [d for k in baris_karyawan
+                         for d in generator.dokumen(k['id'], dokumen_rata_rata, folder_dokumen)]
+        db.session.execute(insert(Karyawan), baris_karyawan)
+        if baris_dokumen:
+            db.session.execute(insert(Dokumen), baris_dokumen)
+        db.session.commit()
+        if laporkan:
+            laporkan(akhir - awal, jumlah)
+
+    dialek = db.engine.dialect.name
+    if dialek == 'postgresql':
+        # id diisi eksplisit; sesuaikan sequence agar INSERT berikutnya tidak bentrok
+        db.session.execute(text("SELECT setval(pg_get_serial_sequence('karyawan', 'id'), "
+                                "(SELECT MAX(id) FROM karyawan))"))
+        db.session.execute(text('ANALYZE karyawan'))
+        db.session.execute(text('ANALYZE dokumen'))
+    elif dialek == 'sqlite':
+        db.session.execute(text('ANALYZE'))
+    db.session.commit()
@@ -0,0 +1,85 @@
+import resource
+import statistics
+import sys
+import time
+
+from sqlalchemy import event
+
+
+def persentil(data, p):
+    """Persentil `p` (0-100) dengan interpolasi linear; `data` harus sudah terurut."""
+    if not data:
+        return None
+    if len(data) == 1:
+        return data[0]
+    posisi = (len(data) - 1) * p / 100
+    bawah = int(posisi)
+    atas = min(bawah + 1, len(data) - 1)
+    return data[bawah] + (data[atas] - data[bawah]) * (posisi - bawah)
+
+
+def peak_rss_mb():
+    """Puncak resident set size proses ini (MB)."""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS byte
+    return round(maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class PenghitungQuery:
+    """Menghitung statement SQL yang dijalankan engine selama pengukuran."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.jumlah = 0
+
+    def _hitung(self, *args):
+        self.jumlah += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._hitung)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._hitung)
+
+
+class Pengukuran:
+    """Mengumpulkan latensi dan jumlah query setiap iterasi satu skenario."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.latensi = []
+        self.query = []
+
+    def ukur(self, fungsi, *args, **kwargs):
+        """Menjalankan `fungsi` sekali dan mencatat durasi serta jumlah query-nya."""
+        with PenghitungQuery(self.engine) as penghitung:
+            mulai = time.perf_counter()
+            hasil = fungsi(*args, **kwargs)
+            durasi = time.perf_counter() - mulai
+        self.latensi.append(durasi)
+        self.query.append(penghitung.jumlah)
+        return hasil
+
+    def ringkasan(self):
+        latensi = sorted(d * 1000 for d in self.latensi)
+        if not latensi:
+            return {'iterasi': 0}
+        return {
+            'iterasi': len(latensi),
+            'latensi_ms': {
+                'min': round(latensi[0], 2),
+                'mean': round(statistics.fmean(latensi), 2),
+                'p50': round(persentil(latensi, 50), 2),
+                'p90': round(persentil(latensi, 90), 2),
+                'p95': round(persentil(latensi, 95), 2),
+                'p99': round(persentil(latensi, 99), 2),
+                'max': round(latensi[-1], 2),
+            },
+            'query': {
+                'min': min(self.query),
+                'mean': round(statistics.fmean(self.query), 1),
+                'max': max(self.query),
+            },
+            'peak_rss_mb': peak_rss_mb(),
+        }
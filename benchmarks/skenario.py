@@ -0,0 +1,359 @@
+import io
+import itertools
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, func, or_, select, update
+
+from benchmarks.data import GeneratorKaryawan
+from benchmarks.pengukuran import Pengukuran
+
+# Daftar skenario, diisi lewat dekorator @skenario (urutan = urutan pendaftaran)
+SKENARIO = {}
+
+# Jumlah karyawan per generate kontrak massal
+UKURAN_BATCH_KONTRAK = 200
+
+
+class Skenario:
+    def __init__(self, nama, fungsi, iterasi, pemanasan):
+        self.nama = nama
+        self.fungsi = fungsi
+        self.iterasi = iterasi
+        self.pemanasan = pemanasan
+
+
+def skenario(nama, iterasi=20, pemanasan=2):
+    """Mendaftarkan fungsi `f(konteks)` sebagai skenario benchmark."""
+    def decorator(f):
+        SKENARIO[nama] = Skenario(nama, f, iterasi, pemanasan)
+        return f
+    return decorator
+
+
+class Konteks:
+    """Yang tersedia untuk skenario: app, test client yang sudah login, folder kerja, dan pengukuran."""
+
+    def __init__(self, app, db, folder, iterasi, pemanasan):
+        self.app = app
+        self.db = db
+        self.folder = folder
+        self.iterasi = iterasi
+        self.pemanasan = pemanasan
+        self.pengukuran = Pengukuran(db.engine)
+        self.client = app.test_client()
+        with self.client.session_transaction() as sesi:
+            sesi['user_id'] = 1
+            sesi['username'] = 'benchmark'
+
+    def ulangi(self, fungsi, persiapan=None, pembersihan=None):
+        """
+        Menjalankan `fungsi` sebanyak pemanasan (tidak diukur) lalu iterasi (diukur).
+
+        `persiapan` dan `pembersihan` dijalankan sebelum/sesudah setiap panggilan, di luar pengukuran.
+        """
+        for i in range(self.pemanasan + self.iterasi):
+            if persiapan:
+                persiapan()
+            if i < self.pemanasan:
+                fungsi()
+            else:
+                self.pengukuran.ukur(fungsi)
+            if pembersihan:
+                pembersihan()
+
+    def get(self, url, **params):
+        respons = self.client.get(url, query_string=params)
+        _periksa_respons(respons, url)
+        return respons
+
+    def post(self, url, **kwargs):
+        respons = self.client.post(url, **kwargs)
+        _periksa_respons(respons, url)
+        return respons
+
+
+def _periksa_respons(respons, url):
+    respons.get_data()  # pastikan body (termasuk yang streaming) ikut terukur
+    if respons.status_code >= 400:
+        raise RuntimeError(f'{url} mengembalikan HTTP {respons.status_code}')
+
+
+# --- Dashboard: setiap kombinasi filter ---
+
+def _filter_dashboard():
+    from models import db
+    from models.karyawan import Karyawan
+    # Unit kerja terbesar kedua: cukup banyak baris, tapi bukan seluruh tabel
+    unit = db.session.execute(
+        select(Karyawan.unit_kerja).group_by(Karyawan.unit_kerja)
+        .order_by(func.count().desc(), Karyawan.unit_kerja).limit(2)
+    ).scalars().all()
+    return {
+        'search': {'search': 'sari'},
+        'unit_kerja': {'unit_kerja': unit[-1] if unit else ''},
+        'gaji': {'gaji_min': '4000000', 'gaji_max': '6000000'},
+    }
+
+
+def _skenario_dashboard(kombinasi):
+    def jalankan(konteks):
+        semua_filter = _filter_dashboard()
+        params = {}
+        for nama in kombinasi:
+            params.update(semua_filter[nama])
+        konteks.ulangi(lambda: konteks.get('/dashboard', **params))
+    return jalankan
+
+
+for _n in range(4):
+    for _kombinasi in itertools.combinations(('search', 'unit_kerja', 'gaji'), _n):
+        _nama = 'dashboard' + (f"[{'+'.join(_kombinasi)}]" if _kombinasi else '')
+        skenario(_nama)(_skenario_dashboard(_kombinasi))
+
+
+@skenario('dashboard_tanpa_cache')
+def dashboard_tanpa_cache(konteks):
+    from services.referensi import invalidate_cache_karyawan
+    # Seperti kunjungan pertama setelah data karyawan berubah: ringkasan dan dropdown dihitung ulang
+    konteks.ulangi(lambda: konteks.get('/dashboard'), persiapan=invalidate_cache_karyawan)
+
+
+# --- Daftar karyawan ---
+
+@skenario('karyawan')
+def daftar_karyawan(konteks):
+    konteks.ulangi(lambda: konteks.get('/karyawan'))
+
+
+@skenario('karyawan[per_page=500]')
+def daftar_karyawan_500(konteks):
+    konteks.ulangi(lambda: konteks.get('/karyawan', per_page=500))
+
+
+@skenario('karyawan[halaman_tengah]')
+def daftar_karyawan_tengah(konteks):
+    from models import db
+    from models.karyawan import Karyawan
+    from services.paginasi import encode_cursor
+    jumlah = db.session.execute(select(func.count(Karyawan.id))).scalar()
+    tengah = db.session.execute(
+        select(Karyawan.nama, Karyawan.id).order_by(Karyawan.nama, Karyawan.id).offset(jumlah // 2).limit(1)
+    ).first()
+    konteks.ulangi(lambda: konteks.get('/karyawan', after=encode_cursor(tengah)))
+
+
+# --- Impor Excel ---
+
+def _buat_excel(jumlah, nup_duplikat):
+    from openpyxl import Workbook
+    from services.impor_excel import EXPECTED_HEADER
+
+    generator = GeneratorKaryawan(seed=jumlah)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Karyawan')
+    ws.append(EXPECTED_HEADER)
+    for i in range(jumlah):
+        data = generator.karyawan(i)
+        data['nup'] = f'BX{i:08d}'
+        data['nik'] = f'BXK{i:010d}'
+        data['email'] = None
+        # Sekitar 1% baris memakai NUP yang sudah ada, seperti unggahan ulang sebagian
+        if nup_duplikat and i % 100 == 99:
+            data['nup'] = nup_duplikat
+        ws.append([data[kolom] for kolom in EXPECTED_HEADER])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def _hapus_hasil_impor():
+    from models import db
+    from models.karyawan import Karyawan
+    db.session.execute(delete(Karyawan).where(Karyawan.nup.like('BX%')))
+    db.session.commit()
+
+
+def _skenario_impor_excel(jumlah):
+    def jalankan(konteks):
+        from models import db
+        from models.job import Job
+        from models.karyawan import Karyawan
+
+        nup_duplikat = db.session.execute(select(Karyawan.nup).limit(1)).scalar()
+        isi = _buat_excel(jumlah, nup_duplikat)
+
+        def unggah():
+            konteks.post('/karyawan/upload_excel', content_type='multipart/form-data',
+                         data={'file': (io.BytesIO(isi), f'benchmark_{jumlah}.xlsx')})
+            job = db.session.execute(select(Job).order_by(Job.id.desc()).limit(1)).scalar()
+            if job.status != Job.STATUS_SELESAI:
+                raise RuntimeError(f'Impor gagal: {job.pesan_error}')
+
+        _hapus_hasil_impor()
+        konteks.ulangi(unggah, pembersihan=_hapus_hasil_impor)
+    return jalankan
+
+
+for _jumlah, _label in ((1000, '1k'), (10000, '10k'), (50000, '50k')):
+    skenario(f'upload_excel[{_label}]', iterasi=3 if _jumlah < 50000 else 1, pemanasan=0)(
+        _skenario_impor_excel(_jumlah))
+
+
+# --- Generate kontrak ---
+
+def _buat_template(konteks):
+    from docx import Document as DocumentDocx
+    from models import db
+    from models.template_kontrak import TemplateKontrak
+
+    path = os.path.join(konteks.folder, 'template_benchmark.docx')
+    dokumen = DocumentDocx()
+    dokumen.add_heading('PERJANJIAN KERJA WAKTU TERTENTU', level=1)
+    dokumen.add_paragraph('Nomor: {{ nomor_surat }}')
+    for label, tag in (('Nama', 'nama'), ('NUP', 'nup'), ('NIK', 'nik'), ('Jabatan', 'jabatan'),
+                       ('Unit Kerja', 'unit_kerja'), ('Alamat', 'alamat'), ('Gaji', 'gaji'),
+                       ('Tunjangan', 'tunjangan')):
+        dokumen.add_paragraph(f'{label}: {{{{ {tag} }}}}')
+    for pasal in range(1, 21):
+        dokumen.add_paragraph(f'Pasal {pasal}. Perjanjian ini berlaku sejak {{{{ tanggal_mulai }}}} '
+                              f'sampai dengan {{{{ tanggal_akhir }}}} untuk {{{{ nama }}}}. ' * 3)
+    dokumen.save(path)
+
+    template = TemplateKontrak(nama_template=f'Benchmark {datetime.now():%Y%m%d%H%M%S}', file_path=path)
+    db.session.add(template)
+    db.session.commit()
+    return template
+
+
+def _hapus_kontrak(konteks, template):
+    from models import db
+    from models.dokumen import Dokumen
+    db.session.execute(delete(Dokumen).where(Dokumen.file_path.like(f'{konteks.folder}%')))
+    db.session.delete(template)
+    db.session.commit()
+
+
+@skenario('generate_kontrak', iterasi=20, pemanasan=1)
+def generate_kontrak(konteks):
+    from models import db
+    from models.karyawan import Karyawan
+
+    template = _buat_template(konteks)
+    daftar_id = itertools.cycle(db.session.execute(
+        select(Karyawan.id).where(Karyawan.status == 'Aktif').order_by(Karyawan.id).limit(100)
+    ).scalars().all())
+    try:
+        konteks.ulangi(lambda: konteks.post(f'/kontrak/generate/{next(daftar_id)}',
+                                            data={'template_id': template.id}))
+    finally:
+        _hapus_kontrak(konteks, template)
+
+
+@skenario('generate_kontrak_batch', iterasi=3, pemanasan=0)
+def generate_kontrak_batch(konteks):
+    from models import db
+    from models.karyawan import Karyawan
+    from services.kontrak import buat_kontrak_batch
+
+    template = _buat_template(konteks)
+    karyawan_list = []
+
+    def muat_karyawan():
+        # Dimuat ulang setiap iterasi, seperti job: objek dari iterasi sebelumnya sudah expired setelah commit
+        karyawan_list[:] = db.session.execute(
+            select(Karyawan).where(Karyawan.status == 'Aktif').order_by(Karyawan.id).limit(UKURAN_BATCH_KONTRAK)
+        ).scalars().all()
+
+    try:
+        konteks.ulangi(lambda: buat_kontrak_batch(karyawan_list, template, buat_zip=True), persiapan=muat_karyawan)
+    finally:
+        _hapus_kontrak(konteks, template)
+
+
+# --- Login ---
+
+@skenario('login', iterasi=20, pemanasan=1)
+def login(konteks):
+    from models import db
+    from models.user import User
+    from services.pembatas_login import pembatas_login
+
+    # Hash dibuat dengan PASSWORD_HASH_METHOD saat ini, sehingga yang terukur adalah biaya login normal
+    user = User(username=f'benchmark-{os.getpid()}')
+    user.set_password('benchmark')
+    db.session.add(user)
+    db.session.commit()
+    client = konteks.app.test_client()
+    data = {'username': user.username, 'password': 'benchmark'}
+
+    def keluar():
+        client.get('/logout')
+        pembatas_login.reset()
+
+    try:
+        konteks.ulangi(lambda: _periksa_respons(client.post('/login', data=data), '/login'), pembersihan=keluar)
+    finally:
+        db.session.delete(user)
+        db.session.commit()
+
+
+# --- Update status otomatis ---
+
+@skenario('check_and_update_statuses', iterasi=10, pemanasan=1)
+def update_status(konteks):
+    from models import db
+    from models.karyawan import Karyawan
+    from services.status_otomatis import check_and_update_statuses
+
+    # Simpan keadaan baris yang akan diubah, lalu kembalikan setelah setiap iterasi
+    today = date.today()
+    terdampak = db.session.execute(
+        select(Karyawan.id, Karyawan.status, Karyawan.tindak_lanjut_kontrak).where(or_(
+            (Karyawan.tindak_lanjut_kontrak == 'Tidak diperpanjang') & (Karyawan.tanggal_akhir_kontrak < today)
+            & (Karyawan.status == 'Aktif'),
+            (Karyawan.tanggal_akhir_kontrak <= today + timedelta(days=90))
+            & (Karyawan.tindak_lanjut_kontrak == 'Tidak perlu'),
+        ))
+    ).all()
+    semula = [{'id': id_, 'status': status, 'tindak_lanjut_kontrak': tindak_lanjut}
+              for id_, status, tindak_lanjut in terdampak]
+
+    def kembalikan():
+        if semula:
+            db.session.execute(update(Karyawan), semula)
+            db.session.commit()
+
+    konteks.ulangi(check_and_update_statuses, pembersihan=kembalikan)
+
+
+# --- Runner ---
+
+def jalankan_skenario(nama, iterasi=None, pemanasan=None):
+    """Menjalankan satu skenario di proses ini dan mengembalikan ringkasan hasilnya."""
+    from app import app
+    from models import db
+    from models.karyawan import Karyawan
+
+    definisi = SKENARIO[nama]
+    folder = tempfile.mkdtemp(prefix='hr-benchmark-')
+    # File hasil (kontrak, laporan impor) ditulis ke folder sementara, bukan ke uploads/
+    for kunci in ('UPLOAD_FOLDER_DOC', 'UPLOAD_FOLDER_KONTRAK', 'UPLOAD_FOLDER_LAPORAN', 'UPLOAD_FOLDER_ANTRIAN'):
+        app.config[kunci] = os.path.join(folder, kunci.rsplit('_', 1)[-1].lower())
+        os.makedirs(app.config[kunci], exist_ok=True)
+    # Job (impor, generate kontrak) dijalankan langsung di request agar durasinya ikut terukur
+    app.config['JOB_EAGER'] = True
+
+    try:
+        with app.app_context():
+            konteks = Konteks(app, db, folder,
+                              definisi.iterasi if iterasi is None else iterasi,
+                              definisi.pemanasan if pemanasan is None else pemanasan)
+            definisi.fungsi(konteks)
+            hasil = konteks.pengukuran.ringkasan()
+            hasil['jumlah_karyawan'] = db.session.execute(select(func.count(Karyawan.id))).scalar()
+            return hasil
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
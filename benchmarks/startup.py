@@ -0,0 +1,62 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from benchmarks.pengukuran import persentil
+
+# Pustaka yang seharusnya tidak ikut diimpor saat aplikasi dimulai (lihat create_app)
+MODUL_BERAT = ('docxtpl', 'docx', 'openpyxl', 'lxml', 'alembic', 'flask_migrate')
+
+_BARIS_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+FOLDER_PROYEK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _parse_importtime(stderr):
+    """Baris `-X importtime` -> daftar (modul, kumulatif_us, kedalaman)."""
+    hasil = []
+    for baris in stderr.splitlines():
+        cocok = _BARIS_IMPORTTIME.match(baris)
+        if cocok:
+            hasil.append((cocok.group(4), int(cocok.group(2)), len(cocok.group(3)) // 2))
+    return hasil
+
+
+def ukur_sekali(kode):
+    """Menjalankan `kode` di interpreter baru dengan -X importtime; mengembalikan daftar impor."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    proses = subprocess.run([sys.executable, '-X', 'importtime', '-c', kode], cwd=FOLDER_PROYEK, env=env,
+                            capture_output=True, text=True, check=True)
+    return _parse_importtime(proses.stderr)
+
+
+def ukur_startup(kode='import app', ulangan=5, teratas=15):
+    """
+    Mengukur waktu impor `kode` (default: membuat aplikasi) di `ulangan` proses baru.
+
+    Mengembalikan total waktu impor (ms), modul tingkat atas termahal dari pengukuran
+    terakhir, dan pustaka berat yang ikut terimpor.
+    """
+    total_ms, impor = [], []
+    for _ in range(ulangan):
+        impor = ukur_sekali(kode)
+        # Modul kedalaman 0 tidak saling tumpang tindih, jumlahnya adalah total waktu impor
+        total_ms.append(sum(kumulatif for _, kumulatif, kedalaman in impor if kedalaman == 0) / 1000)
+    total_ms.sort()
+    termahal = sorted(((nama, kumulatif) for nama, kumulatif, kedalaman in impor if kedalaman <= 1),
+                      key=lambda x: x[1], reverse=True)[:teratas]
+    terimpor = {nama.split('.')[0] for nama, _, _ in impor}
+    return {
+        'kode': kode,
+        'ulangan': ulangan,
+        'import_ms': {
+            'min': round(total_ms[0], 1),
+            'p50': round(persentil(total_ms, 50), 1),
+            'mean': round(statistics.fmean(total_ms), 1),
+            'max': round(total_ms[-1], 1),
+        },
+        'modul_termahal_ms': {nama: round(kumulatif / 1000, 1) for nama, kumulatif in termahal},
+        'modul_berat_terimpor': sorted(terimpor.intersection(MODUL_BERAT)),
+    }
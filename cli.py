@@ -0,0 +1,167 @@
+import logging
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import or_
+
+from models import db
+from models.dokumen import Dokumen
+from models.template_kontrak import TemplateKontrak
+from models.user import User
+from services.antrian import worker_loop
+from services.kontrak import KontrakError, buat_kontrak_batch, pilih_karyawan_batch
+from services.penyimpanan import hapus_file, path_blob, simpan_blob_dari_path
+from services.status_otomatis import jalankan_update_status_harian
+
+logger = logging.getLogger(__name__)
+
+
+@click.command("create-admin")
+@with_appcontext
+def create_admin():
+    """Membuat user admin baru."""
+    import getpass
+    username = input("Masukkan username admin: ")
+    # Validasi username tidak boleh kosong
+    if not username:
+        click.echo("Error: Username tidak boleh kosong.", err=True)
+        return
+
+    password = getpass.getpass("Masukkan password: ")
+    # Validasi password tidak boleh kosong
+    if not password:
+        click.echo("Error: Password tidak boleh kosong.", err=True)
+        return
+
+    # Cek jika username sudah ada
+    if User.query.filter_by(username=username).first():
+        click.echo(f"Error: User '{username}' sudah ada.", err=True)
+        return
+
+    try:
+        new_admin = User(username=username)
+        new_admin.set_password(password)
+        db.session.add(new_admin)
+        db.session.commit()
+        click.echo(f"User admin '{username}' berhasil dibuat.")
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f"Gagal membuat admin. Error: {e}", err=True)
+
+
+@click.command("run-scheduler")
+@click.option('--once', is_flag=True, help='Jalankan satu kali lalu keluar.')
+@click.option('--force', is_flag=True, help='Jalankan walaupun job sudah berjalan hari ini.')
+@click.option('--interval', default=600, show_default=True,
+              help='Jeda (detik) antar pemeriksaan penanda last-run.')
+@with_appcontext
+def run_scheduler(once, force, interval):
+    """Menjalankan update status karyawan otomatis sekali per hari."""
+    while True:
+        try:
+            riwayat = jalankan_update_status_harian(paksa=force)
+            if riwayat:
+                logger.info('Update status selesai dalam %s ms (%s).', riwayat.durasi_ms, riwayat.keterangan,
+                            extra={'durasi_ms': riwayat.durasi_ms})
+        except Exception:
+            logger.exception('Error saat update status otomatis')
+
+        if once:
+            break
+        force = False
+        time.sleep(interval)
+
+
+@click.command("generate-kontrak")
+@click.option('--template', 'template_ref', required=True, help='ID atau nama template kontrak.')
+@click.option('--unit-kerja', default=None, help='Hanya karyawan aktif di unit kerja ini.')
+@click.option('--akan-habis', is_flag=True, help='Hanya karyawan yang kontraknya habis dalam 90 hari.')
+@click.option('--zip', 'buat_zip', is_flag=True, help='Gabungkan hasil ke dalam satu file ZIP.')
+@click.option('--processes', default=None, type=int, help='Jumlah proses render (default: KONTRAK_BATCH_PROCESSES).')
+@with_appcontext
+def generate_kontrak_cli(template_ref, unit_kerja, akan_habis, buat_zip, processes):
+    """Membuat kontrak untuk banyak karyawan sekaligus."""
+    template = TemplateKontrak.query.filter(or_(
+        TemplateKontrak.id == (int(template_ref) if template_ref.isdigit() else -1),
+        TemplateKontrak.nama_template == template_ref
+    )).first()
+    if not template:
+        click.echo(f"Error: Template '{template_ref}' tidak ditemukan.", err=True)
+        return
+
+    karyawan_list = pilih_karyawan_batch(unit_kerja, akan_habis)
+    click.echo(f"Membuat {len(karyawan_list)} kontrak dengan template '{template.nama_template}'...")
+    mulai = time.perf_counter()
+    try:
+        hasil = buat_kontrak_batch(karyawan_list, template, buat_zip=buat_zip, processes=processes)
+    except KontrakError as e:
+        click.echo(f"Error: {e}", err=True)
+        return
+    click.echo(f"{hasil['pesan']} ({time.perf_counter() - mulai:.2f} detik)")
+    for pesan in hasil['kesalahan']:
+        click.echo(f"  - {pesan}")
+    if hasil['zip']:
+        click.echo(f"ZIP: {os.path.join(current_app.config['UPLOAD_FOLDER_KONTRAK'], hasil['zip'])}")
+
+
+@click.command("migrasi-dokumen-blob")
+@with_appcontext
+def migrasi_dokumen_blob():
+    """Memindahkan file dokumen lama ke penyimpanan blob (file yang sama hanya disimpan sekali)."""
+    daftar = Dokumen.query.filter(Dokumen.blob_sha256.is_(None)).order_by(Dokumen.id).all()
+    dipindah, hilang, file_lama = 0, 0, []
+    for dokumen in daftar:
+        if not dokumen.file_path or not os.path.exists(dokumen.file_path):
+            hilang += 1
+            continue
+        sha256 = simpan_blob_dari_path(dokumen.file_path)
+        file_lama.append(dokumen.file_path)
+        dokumen.nama_file = dokumen.nama_file or os.path.basename(dokumen.file_path)
+        dokumen.blob_sha256 = sha256
+        dokumen.file_path = path_blob(sha256)
+        dipindah += 1
+        if dipindah % 500 == 0:
+            db.session.commit()
+            hapus_file(file_lama)
+            file_lama = []
+    db.session.commit()
+    hapus_file(file_lama)
+    click.echo(f"{dipindah} dokumen dipindahkan ke penyimpanan blob, {hilang} file tidak ditemukan.")
+
+
+@click.command("worker")
+@click.option('--processes', default=1, show_default=True, help='Jumlah proses worker.')
+@click.option('--interval', default=2.0, show_default=True, help='Jeda (detik) saat antrian kosong.')
+@click.option('--once', is_flag=True, help='Keluar setelah antrian kosong.')
+@with_appcontext
+def worker(processes, interval, once):
+    """Menjalankan worker antrian job (impor Excel, generate kontrak)."""
+    if processes <= 1:
+        worker_loop(interval=interval, sekali=once)
+        return
+
+    import multiprocessing
+    flask_app = current_app._get_current_object()
+
+    def proses_worker():
+        # Setiap proses memakai koneksi database sendiri
+        with flask_app.app_context():
+            db.engine.dispose(close=False)
+            worker_loop(interval=interval, sekali=once)
+
+    ctx = multiprocessing.get_context('fork')
+    db.engine.dispose()
+    workers = [ctx.Process(target=proses_worker, name=f'worker-{i + 1}') for i in range(processes)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+
+
+def daftarkan_cli(app):
+    """Menambahkan perintah `flask ...` aplikasi ini ke `app.cli`."""
+    for perintah in (create_admin, run_scheduler, generate_kontrak_cli, migrasi_dokumen_blob, worker):
+        app.cli.add_command(perintah)
@@ -7,6 +7,11 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 load_dotenv(os.path.join(basedir, '.env'))
 
 
+def _mapping_folder(nilai):
+    """'/app/uploads=/_internal/uploads/,/app/static=/_internal/static/' -> [(folder, prefix), ...]"""
+    return [tuple(bagian.split('=', 1)) for bagian in nilai.split(',') if '=' in bagian]
+
+
 class Config:
     # Mengambil SECRET_KEY dari environment variable, dengan nilai default jika tidak ditemukan
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'kunci-rahasia-default-jika-tidak-ada-env'
@@ -17,11 +22,129 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Pool koneksi per proses. Total koneksi ke database kira-kira
+    # jumlah worker x (DB_POOL_SIZE + DB_MAX_OVERFLOW); jaga di bawah max_connections PostgreSQL
+    _DB_SERVER = not SQLALCHEMY_DATABASE_URI.startswith('sqlite')
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        # Cek koneksi sebelum dipakai, agar koneksi yang diputus server/firewall tidak menimbulkan
+        # error (tidak perlu untuk file SQLite: hanya menambah satu query per request)
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1' if _DB_SERVER else '0').lower()
+                         in ('1', 'true', 'yes'),
+        # Ganti koneksi yang lebih tua dari ini (detik)
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+    }
+    if _DB_SERVER:
+        SQLALCHEMY_ENGINE_OPTIONS.update({
+            # Default: satu koneksi per thread Gunicorn
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', os.environ.get('GUNICORN_THREADS', 4))),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 2)),
+            'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        })
+
+    # Metode hash password dalam format Werkzeug, misalnya 'scrypt:32768:8:1' (default) atau
+    # 'pbkdf2:sha256:600000'. Biaya hash menentukan latensi dan CPU saat login; hash lama dibuat
+    # ulang dengan metode ini saat user berhasil login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt'
+
+    # Penyimpanan sesi: 'filesystem' (default) atau 'sqlite' menyimpan isi sesi di server dan cookie
+    # hanya berisi ID sesi; 'cookie' menyimpan seluruh isi sesi di cookie bertanda tangan (bawaan Flask).
+    # Dengan beberapa worker/kontainer, folder atau file SQLite-nya harus dipakai bersama
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'filesystem').lower()
+    SESSION_FOLDER = os.environ.get('SESSION_FOLDER') or os.path.join(basedir, 'instance', 'sesi')
+    SESSION_SQLITE_PATH = os.environ.get('SESSION_SQLITE_PATH') or os.path.join(basedir, 'instance', 'sesi.db')
+    # Pesan flash tertunda per kategori; kelebihannya digabung menjadi satu ringkasan (0 = tanpa batas)
+    FLASH_MAX_PER_CATEGORY = int(os.environ.get('FLASH_MAX_PER_CATEGORY', 5))
+
+    # Batas login gagal per username + IP dalam LOGIN_RATE_WINDOW detik (0 = nonaktif), per proses.
+    # LOGIN_RATE_LIMIT_IP membatasi total login gagal satu IP untuk semua username (menebak banyak akun)
+    LOGIN_RATE_LIMIT = int(os.environ.get('LOGIN_RATE_LIMIT', 10))
+    LOGIN_RATE_LIMIT_IP = int(os.environ.get('LOGIN_RATE_LIMIT_IP', 50))
+    LOGIN_RATE_WINDOW = int(os.environ.get('LOGIN_RATE_WINDOW', 300))
+
+    # Jumlah reverse proxy tepercaya di depan aplikasi (misalnya 1 untuk nginx.conf.example).
+    # Jika > 0, IP klien (untuk pembatas login) dan skema diambil dari X-Forwarded-For/-Proto.
+    # Biarkan 0 jika aplikasi bisa diakses langsung, karena header itu bisa dipalsukan klien
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    PROXY_FIX_X_PROTO = int(os.environ.get('PROXY_FIX_X_PROTO', PROXY_FIX_X_FOR))
+
+    # Token untuk klien integrasi /api/v1 (Authorization: Bearer <token>), dipisah koma
+    API_TOKENS = [token.strip() for token in os.environ.get('API_TOKENS', '').split(',') if token.strip()]
+    # Jumlah item maksimal per request batch POST/PUT/PATCH /api/v1/karyawan
+    API_BATCH_MAX = int(os.environ.get('API_BATCH_MAX', 1000))
+
     # Konfigurasi Folder Upload
     UPLOAD_FOLDER_DOC = os.path.join(basedir, 'uploads/dokumen')
+    # Dokumen unggahan disimpan per hash isi: uploads/blob/ab/cd/<sha256>
+    UPLOAD_FOLDER_BLOB = os.path.join(basedir, 'uploads/blob')
     UPLOAD_FOLDER_KONTRAK = os.path.join(basedir, 'uploads/kontrak')
     UPLOAD_FOLDER_TEMPLATE = os.path.join(basedir, 'uploads/template')
+    UPLOAD_FOLDER_LAPORAN = os.path.join(basedir, 'uploads/laporan')
+    # File unggahan yang menunggu diproses worker
+    UPLOAD_FOLDER_ANTRIAN = os.path.join(basedir, 'uploads/antrian')
+
+    # Batas ukuran body request (MB); request yang lebih besar ditolak (413) sebelum body dibaca
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_UPLOAD_MB', 32)) * 1024 * 1024
 
     # Ekstensi file yang diizinkan untuk dokumen umum
     ALLOWED_EXTENSIONS_DOC = {'pdf', 'doc', 'docx', 'jpg', 'jpeg', 'png'}
 
+    # Jumlah baris per halaman untuk daftar karyawan (paginasi keyset)
+    PER_PAGE = int(os.environ.get('PER_PAGE', 50))
+    # Batas atas parameter ?per_page= dari URL
+    MAX_PER_PAGE = int(os.environ.get('MAX_PER_PAGE', 500))
+
+    # Jalankan job langsung di dalam request (tanpa `flask worker`), berguna untuk pengembangan
+    JOB_EAGER = os.environ.get('JOB_EAGER', '').lower() in ('1', 'true', 'yes')
+    # Worker memperbarui heartbeat job yang sedang berjalan setiap JOB_HEARTBEAT_INTERVAL detik. Job 'berjalan'
+    # yang heartbeat-nya lebih tua dari JOB_STALE_TIMEOUT (worker mati) diantrikan ulang, paling banyak
+    # sampai JOB_MAX_ATTEMPTS kali klaim; setelah itu job ditandai gagal
+    JOB_HEARTBEAT_INTERVAL = int(os.environ.get('JOB_HEARTBEAT_INTERVAL', 30))
+    JOB_STALE_TIMEOUT = int(os.environ.get('JOB_STALE_TIMEOUT', 300))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+
+    # Jumlah proses untuk generate kontrak massal (default: jumlah CPU)
+    KONTRAK_BATCH_PROCESSES = int(os.environ.get('KONTRAK_BATCH_PROCESSES', os.cpu_count() or 1))
+
+    # Jumlah template kontrak .docx yang disimpan di cache per proses (hasil muat + kompilasi Jinja2)
+    DOCX_TEMPLATE_CACHE_SIZE = int(os.environ.get('DOCX_TEMPLATE_CACHE_SIZE', 16))
+
+    # Masa berlaku (detik) cache daftar unit kerja untuk dropdown
+    UNIT_KERJA_CACHE_TTL = int(os.environ.get('UNIT_KERJA_CACHE_TTL', 300))
+
+    # Masa berlaku (detik) cache angka ringkasan dashboard (jumlah karyawan, gaji, kontrak akan habis)
+    RINGKASAN_CACHE_TTL = int(os.environ.get('RINGKASAN_CACHE_TTL', 60))
+
+    # ETag dan 304 Not Modified untuk halaman daftar/detail karyawan dan template (lihat services.cache_halaman)
+    HTTP_CACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    # Ubah nilainya untuk membatalkan semua ETag yang sudah dipegang browser (misalnya setelah ganti config tampilan)
+    ETAG_SALT = os.environ.get('ETAG_SALT', '')
+    # Cache HTML hasil render per proses: total ukuran (byte) dan jumlah halaman per pengguna
+    FRAGMENT_CACHE_MAX_BYTES = int(os.environ.get('FRAGMENT_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    FRAGMENT_CACHE_PER_USER = int(os.environ.get('FRAGMENT_CACHE_PER_USER', 20))
+
+    # Batas jumlah query SQL per request untuk mendeteksi N+1 (0 = nonaktif). Aktifkan saat
+    # pengembangan/pengujian; dengan SQL_QUERY_LIMIT_RAISE request yang melebihi batas menjadi error
+    SQL_QUERY_LIMIT = int(os.environ.get('SQL_QUERY_LIMIT', 0))
+    SQL_QUERY_LIMIT_RAISE = os.environ.get('SQL_QUERY_LIMIT_RAISE', '').lower() in ('1', 'true', 'yes')
+
+    # Logging: LOG_FORMAT 'text' atau 'json' (satu objek JSON per baris, untuk agregator log)
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower()
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+
+    # Endpoint /metrics (format Prometheus); batasi aksesnya di reverse proxy (lihat nginx.conf.example)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    # Jika diisi, /metrics hanya melayani request dengan header `Authorization: Bearer <token>`
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+    # Folder bersama tempat worker antrian menulis snapshot metriknya; /metrics menjumlahkan
+    # snapshot yang diperbarui dalam METRICS_SNAPSHOT_MAX_AGE detik terakhir
+    METRICS_DIR = os.environ.get('METRICS_DIR') or os.path.join(basedir, 'instance', 'metrik')
+    METRICS_SNAPSHOT_MAX_AGE = int(os.environ.get('METRICS_SNAPSHOT_MAX_AGE', 3600))
+
+    # Pengiriman file unduhan: '' (oleh Python), 'x-accel-redirect' (nginx), atau 'x-sendfile' (Apache/lighttpd)
+    FILE_OFFLOAD = os.environ.get('FILE_OFFLOAD', '').lower()
+    # Folder lokal -> prefix location internal nginx untuk X-Accel-Redirect (lihat nginx.conf.example)
+    X_ACCEL_MAPPING = _mapping_folder(os.environ.get('X_ACCEL_MAPPING') or
+                                      f"{os.path.join(basedir, 'uploads')}=/_internal/uploads/,"
+                                      f"{os.path.join(basedir, 'static')}=/_internal/static/")
+    # Layani sendiri header X-Accel-Redirect/X-Sendfile tanpa proxy (untuk pengembangan dan pengujian)
+    FILE_OFFLOAD_EMULASI = os.environ.get('FILE_OFFLOAD_EMULASI', '').lower() in ('1', 'true', 'yes')
@@ -0,0 +1,54 @@
+# Konfigurasi Gunicorn untuk produksi: gunicorn -c gunicorn.conf.py app:app
+# Semua nilai bisa diganti lewat environment variable GUNICORN_*.
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# gthread: beberapa thread per proses, cocok untuk request yang banyak menunggu database.
+# gevent: ribuan koneksi per proses (pip install gevent psycogreen).
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+_cpu = multiprocessing.cpu_count()
+if worker_class == 'gevent':
+    workers = int(os.environ.get('GUNICORN_WORKERS', _cpu + 1))
+    worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 100))
+else:
+    # Dengan thread, satu proses per CPU (minimal 2, agar satu worker yang restart tidak menghentikan layanan)
+    workers = int(os.environ.get('GUNICORN_WORKERS', max(2, _cpu)))
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Impor aplikasi (Flask, SQLAlchemy, model, blueprint) sekali di master sebelum fork:
+# worker start lebih cepat dan halaman memori bersama dipakai ulang (copy-on-write).
+# docxtpl dan openpyxl tidak termasuk; keduanya diimpor worker saat pertama dibutuhkan
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1').lower() in ('1', 'true', 'yes')
+
+# Ekspor dan unduhan besar dikirim secara streaming; beri waktu lebih dari default 30 detik
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Di belakang nginx koneksi keep-alive dipakai ulang oleh proxy
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Restart worker secara berkala untuk membatasi pertumbuhan memori
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+# Log akses sudah ditulis aplikasi (logger 'hr.request'); log error Gunicorn ke stderr
+accesslog = os.environ.get('GUNICORN_ACCESSLOG') or None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning('psycogreen tidak terpasang: query PostgreSQL akan memblokir worker gevent.')
+
+    # Koneksi database yang mungkin dibuka master saat preload tidak boleh dipakai bersama
+    # oleh beberapa proses; setiap worker membuat pool-nya sendiri
+    from app import app
+    from models import db
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,34 @@
+"""tabel riwayat jadwal untuk job update status otomatis
+
+Revision ID: 3f1c7a2b9d10
+Revises: 9a42c29103ce
+Create Date: 2026-10-16 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c7a2b9d10'
+down_revision = '9a42c29103ce'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('riwayat_jadwal',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nama_job', sa.String(length=100), nullable=False),
+    sa.Column('tanggal', sa.Date(), nullable=False),
+    sa.Column('mulai', sa.DateTime(), nullable=False),
+    sa.Column('durasi_ms', sa.Integer(), nullable=True),
+    sa.Column('baris_terdampak', sa.Integer(), nullable=True),
+    sa.Column('keterangan', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('nama_job', 'tanggal', name='uq_riwayat_jadwal_job_tanggal')
+    )
+
+
+def downgrade():
+    op.drop_table('riwayat_jadwal')
@@ -0,0 +1,31 @@
+"""kolom heartbeat dan percobaan job untuk memulihkan job yang workernya mati
+
+Revision ID: 7b3e9d2f4a18
+Revises: c81d5e3a9f62
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3e9d2f4a18'
+down_revision = 'c81d5e3a9f62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('percobaan', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('heartbeat', sa.DateTime(), nullable=True))
+
+    # Job yang sedang berjalan saat migrasi dihitung sebagai percobaan pertama
+    op.execute("UPDATE job SET percobaan = 1, heartbeat = mulai WHERE status = 'berjalan'")
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat')
+        batch_op.drop_column('percobaan')
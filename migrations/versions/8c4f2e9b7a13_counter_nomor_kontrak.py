@@ -0,0 +1,45 @@
+"""counter nomor kontrak per tahun
+
+Revision ID: 8c4f2e9b7a13
+Revises: 5d8a1f3e6c27
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4f2e9b7a13'
+down_revision = '5d8a1f3e6c27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    counter = op.create_table('nomor_kontrak_counter',
+    sa.Column('tahun', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('nilai', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('tahun')
+    )
+
+    # Isi counter dari nomor_surat yang sudah ada, misalnya SPK.064/KR/BKI-25 -> tahun 2025, nilai 64
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT nomor_surat FROM dokumen WHERE jenis = 'Kontrak' AND nomor_surat LIKE 'SPK.%'"
+    ))
+    terakhir = {}
+    for (nomor_surat,) in rows:
+        try:
+            nomor_urut = int(nomor_surat.split('.')[1].split('/')[0])
+            tahun = 2000 + int(nomor_surat.rsplit('-', 1)[1])
+        except (IndexError, ValueError):
+            continue
+        terakhir[tahun] = max(terakhir.get(tahun, 0), nomor_urut)
+
+    if terakhir:
+        op.bulk_insert(counter, [{'tahun': tahun, 'nilai': nilai} for tahun, nilai in terakhir.items()])
+
+
+def downgrade():
+    op.drop_table('nomor_kontrak_counter')
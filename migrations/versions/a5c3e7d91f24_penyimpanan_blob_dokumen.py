@@ -0,0 +1,43 @@
+"""penyimpanan blob dokumen (content-addressed) dan nama file asli
+
+Revision ID: a5c3e7d91f24
+Revises: e6c1f8a2d594
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5c3e7d91f24'
+down_revision = 'e6c1f8a2d594'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('blob_dokumen',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('ukuran', sa.BigInteger(), nullable=False),
+    sa.Column('jumlah_referensi', sa.Integer(), nullable=False),
+    sa.Column('dibuat', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+
+    with op.batch_alter_table('dokumen', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('blob_sha256', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('nama_file', sa.String(length=255), nullable=True))
+        batch_op.create_index('ix_dokumen_blob_sha256', ['blob_sha256'], unique=False)
+        batch_op.create_foreign_key('fk_dokumen_blob_sha256_blob_dokumen', 'blob_dokumen',
+                                    ['blob_sha256'], ['sha256'])
+
+
+def downgrade():
+    with op.batch_alter_table('dokumen', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_dokumen_blob_sha256_blob_dokumen', type_='foreignkey')
+        batch_op.drop_index('ix_dokumen_blob_sha256')
+        batch_op.drop_column('nama_file')
+        batch_op.drop_column('blob_sha256')
+
+    op.drop_table('blob_dokumen')
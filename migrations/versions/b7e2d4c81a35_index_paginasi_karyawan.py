@@ -0,0 +1,25 @@
+"""index komposit (nama, id) untuk paginasi keyset karyawan
+
+Revision ID: b7e2d4c81a35
+Revises: 3f1c7a2b9d10
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d4c81a35'
+down_revision = '3f1c7a2b9d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('karyawan', schema=None) as batch_op:
+        batch_op.create_index('ix_karyawan_nama_id', ['nama', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('karyawan', schema=None) as batch_op:
+        batch_op.drop_index('ix_karyawan_nama_id')
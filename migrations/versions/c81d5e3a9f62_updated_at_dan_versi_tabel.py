@@ -0,0 +1,41 @@
+"""kolom updated_at dan tabel versi_tabel untuk ETag
+
+Revision ID: c81d5e3a9f62
+Revises: f2a8c4e61b07
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81d5e3a9f62'
+down_revision = 'f2a8c4e61b07'
+branch_labels = None
+depends_on = None
+
+TABEL = ('karyawan', 'dokumen', 'template_kontrak')
+
+
+def upgrade():
+    versi = op.create_table('versi_tabel',
+    sa.Column('nama', sa.String(length=64), nullable=False),
+    sa.Column('versi', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('nama')
+    )
+    op.bulk_insert(versi, [{'nama': nama, 'versi': 0} for nama in TABEL])
+
+    # ADD COLUMN biasa (bukan batch_alter_table): di SQLite batch membuat ulang tabel karyawan
+    # dan ikut membuang trigger FTS. Kolom nullable, lalu baris lama diisi waktu migrasi
+    for nama in TABEL:
+        op.add_column(nama, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f'UPDATE {nama} SET updated_at = CURRENT_TIMESTAMP')
+
+
+def downgrade():
+    # DROP COLUMN langsung (SQLite >= 3.35), juga agar trigger FTS karyawan tidak terbuang
+    for nama in reversed(TABEL):
+        op.drop_column(nama, 'updated_at')
+
+    op.drop_table('versi_tabel')
@@ -0,0 +1,45 @@
+"""index untuk kolom filter dashboard, update status, dan dokumen per karyawan
+
+Revision ID: d3b9a6f1e482
+Revises: 8c4f2e9b7a13
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b9a6f1e482'
+down_revision = '8c4f2e9b7a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('karyawan', schema=None) as batch_op:
+        batch_op.create_index('ix_karyawan_aktif_nama_id', ['nama', 'id'], unique=False,
+                              postgresql_where=sa.text("status = 'Aktif'"),
+                              sqlite_where=sa.text("status = 'Aktif'"))
+        batch_op.create_index('ix_karyawan_status_akhir_kontrak', ['status', 'tanggal_akhir_kontrak'], unique=False)
+        batch_op.create_index('ix_karyawan_tindak_lanjut_akhir_kontrak',
+                              ['tindak_lanjut_kontrak', 'tanggal_akhir_kontrak'], unique=False)
+        batch_op.create_index('ix_karyawan_unit_kerja', ['unit_kerja'], unique=False)
+
+    with op.batch_alter_table('dokumen', schema=None) as batch_op:
+        batch_op.create_index('ix_dokumen_karyawan_id', ['karyawan_id'], unique=False)
+
+    # SQLite baru memilih index parsial/komposit dengan benar setelah statistik tabel tersedia
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('ANALYZE')
+
+
+def downgrade():
+    with op.batch_alter_table('dokumen', schema=None) as batch_op:
+        batch_op.drop_index('ix_dokumen_karyawan_id')
+
+    with op.batch_alter_table('karyawan', schema=None) as batch_op:
+        batch_op.drop_index('ix_karyawan_unit_kerja')
+        batch_op.drop_index('ix_karyawan_tindak_lanjut_akhir_kontrak')
+        batch_op.drop_index('ix_karyawan_status_akhir_kontrak')
+        batch_op.drop_index('ix_karyawan_aktif_nama_id')
@@ -0,0 +1,74 @@
+"""index pencarian karyawan: pg_trgm (PostgreSQL) / FTS5 (SQLite)
+
+Revision ID: e6c1f8a2d594
+Revises: d3b9a6f1e482
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6c1f8a2d594'
+down_revision = 'd3b9a6f1e482'
+branch_labels = None
+depends_on = None
+
+KOLOM_PENCARIAN = ['nama', 'nup', 'jabatan']
+
+
+def upgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        # Index GIN trigram membuat ILIKE '%kata%' tidak lagi memindai seluruh tabel
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for kolom in KOLOM_PENCARIAN:
+            op.create_index(f'ix_karyawan_{kolom}_trgm', 'karyawan', [kolom], unique=False,
+                            postgresql_using='gin', postgresql_ops={kolom: 'gin_trgm_ops'})
+
+    elif conn.dialect.name == 'sqlite':
+        if not conn.execute(sa.text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar():
+            # SQLite tanpa FTS5: pencarian tetap memakai ILIKE
+            return
+
+        # Tabel FTS5 external content: hanya menyimpan index, isinya dibaca dari tabel karyawan
+        op.execute("""
+            CREATE VIRTUAL TABLE karyawan_fts USING fts5(
+                nama, nup, jabatan,
+                content='karyawan', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER karyawan_fts_ai AFTER INSERT ON karyawan BEGIN
+                INSERT INTO karyawan_fts(rowid, nama, nup, jabatan) VALUES (new.id, new.nama, new.nup, new.jabatan);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER karyawan_fts_ad AFTER DELETE ON karyawan BEGIN
+                INSERT INTO karyawan_fts(karyawan_fts, rowid, nama, nup, jabatan)
+                VALUES ('delete', old.id, old.nama, old.nup, old.jabatan);
+            END
+        """)
+        # Hanya saat kolom yang diindeks berubah, bukan setiap update status
+        op.execute("""
+            CREATE TRIGGER karyawan_fts_au AFTER UPDATE OF nama, nup, jabatan ON karyawan BEGIN
+                INSERT INTO karyawan_fts(karyawan_fts, rowid, nama, nup, jabatan)
+                VALUES ('delete', old.id, old.nama, old.nup, old.jabatan);
+                INSERT INTO karyawan_fts(rowid, nama, nup, jabatan) VALUES (new.id, new.nama, new.nup, new.jabatan);
+            END
+        """)
+        op.execute("INSERT INTO karyawan_fts(karyawan_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        for kolom in reversed(KOLOM_PENCARIAN):
+            op.drop_index(f'ix_karyawan_{kolom}_trgm', table_name='karyawan')
+    elif conn.dialect.name == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS karyawan_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS karyawan_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS karyawan_fts_ai')
+        op.execute('DROP TABLE IF EXISTS karyawan_fts')
@@ -0,0 +1,38 @@
+"""tabel user (belum pernah dibuat oleh migrasi sebelumnya)
+
+Revision ID: f2a8c4e61b07
+Revises: a5c3e7d91f24
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a8c4e61b07'
+down_revision = 'a5c3e7d91f24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Database lama bisa sudah memiliki tabel ini (dibuat dengan db.create_all())
+    if sa.inspect(op.get_bind()).has_table('user'):
+        return
+
+    op.create_table('user',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=64), nullable=False),
+    sa.Column('password_hash', sa.String(length=256), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_username'), ['username'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_username'))
+
+    op.drop_table('user')
@@ -0,0 +1,20 @@
+from datetime import datetime
+from . import db
+
+
+class BlobDokumen(db.Model):
+    """
+    Isi file dokumen yang disimpan sekali per hash SHA-256 (lihat services.penyimpanan).
+
+    jumlah_referensi adalah jumlah record Dokumen yang memakai blob ini; file fisiknya
+    dihapus saat referensi terakhir hilang.
+    """
+    __tablename__ = 'blob_dokumen'
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    ukuran = db.Column(db.BigInteger, nullable=False)
+    jumlah_referensi = db.Column(db.Integer, nullable=False, default=0)
+    dibuat = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<BlobDokumen {self.sha256[:12]} x{self.jumlah_referensi}>'
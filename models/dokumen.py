@@ -3,14 +3,26 @@ from . import db
 
 class Dokumen(db.Model):
     __tablename__ = 'dokumen'
+    __table_args__ = (
+        # Memuat dokumen per karyawan (detail karyawan, hapus cascade)
+        db.Index('ix_dokumen_karyawan_id', 'karyawan_id'),
+        # Pemeriksaan foreign key saat baris blob_dokumen dihapus
+        db.Index('ix_dokumen_blob_sha256', 'blob_sha256'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     karyawan_id = db.Column(db.Integer, db.ForeignKey('karyawan.id'), nullable=False)
     jenis = db.Column(db.String(50), nullable=False) # CV, KTP, Kontrak, SK
     file_path = db.Column(db.String(255), nullable=False)
+    # Hash isi file di penyimpanan blob; NULL untuk file lama dan kontrak hasil generate
+    blob_sha256 = db.Column(db.String(64), db.ForeignKey('blob_dokumen.sha256'), nullable=True)
+    nama_file = db.Column(db.String(255), nullable=True)  # Nama file asli saat diunggah
     nomor_surat = db.Column(db.String(100), nullable=True) # Khusus untuk Kontrak/SK
     tanggal_upload = db.Column(db.Date, default=datetime.utcnow)
+    # Waktu perubahan terakhir (UTC), diisi otomatis saat INSERT/UPDATE
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
-        return f'<Dokumen {self.jenis} - {self.karyawan.nama}>'
+        # Jangan akses self.karyawan di sini: repr tidak boleh memicu query tambahan
+        return f'<Dokumen {self.id} {self.jenis} karyawan_id={self.karyawan_id}>'
 
@@ -0,0 +1,65 @@
+import json
+from datetime import datetime
+from . import db
+
+
+class Job(db.Model):
+    """Pekerjaan berat (impor Excel, generate kontrak) yang dijalankan oleh `flask worker`."""
+    __tablename__ = 'job'
+    __table_args__ = (
+        # Worker mencari job tertua dengan status 'antri'
+        db.Index('ix_job_status_id', 'status', 'id'),
+    )
+
+    STATUS_ANTRI = 'antri'
+    STATUS_BERJALAN = 'berjalan'
+    STATUS_SELESAI = 'selesai'
+    STATUS_GAGAL = 'gagal'
+
+    id = db.Column(db.Integer, primary_key=True)
+    jenis = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_ANTRI)
+    payload = db.Column(db.Text, nullable=True)  # JSON
+    progres = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    hasil = db.Column(db.Text, nullable=True)  # JSON
+    pesan_error = db.Column(db.Text, nullable=True)
+    worker = db.Column(db.String(100), nullable=True)
+    # Berapa kali job sudah diklaim worker; dibatasi JOB_MAX_ATTEMPTS
+    percobaan = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Diperbarui berkala oleh worker selama job berjalan; job tanpa heartbeat baru dianggap macet
+    heartbeat = db.Column(db.DateTime, nullable=True)
+    dibuat = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    mulai = db.Column(db.DateTime, nullable=True)
+    selesai = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def payload_data(self):
+        return json.loads(self.payload) if self.payload else {}
+
+    @property
+    def hasil_data(self):
+        return json.loads(self.hasil) if self.hasil else {}
+
+    @property
+    def sudah_selesai(self):
+        return self.status in (self.STATUS_SELESAI, self.STATUS_GAGAL)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'jenis': self.jenis,
+            'status': self.status,
+            'progres': self.progres,
+            'total': self.total,
+            'percobaan': self.percobaan,
+            'worker': self.worker,
+            'hasil': self.hasil_data,
+            'pesan_error': self.pesan_error,
+            'dibuat': self.dibuat.isoformat() if self.dibuat else None,
+            'mulai': self.mulai.isoformat() if self.mulai else None,
+            'selesai': self.selesai.isoformat() if self.selesai else None,
+        }
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.jenis} {self.status}>'
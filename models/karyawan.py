@@ -1,9 +1,33 @@
 from . import db
-from datetime import date
+from datetime import date, datetime
+
+
+# --- Daftar Status Tindak Lanjut Kontrak ---
+STATUS_TINDAK_LANJUT_OPTIONS = [
+    'Tidak perlu',
+    'Belum ditindaklanjuti',
+    'Telah dikonfirmasi ke cabang/unit kerja',
+    'Dalam proses perpanjangan kontrak',
+    'Tidak diperpanjang'
+]
 
 
 class Karyawan(db.Model):
     __tablename__ = 'karyawan'
+    __table_args__ = (
+        # Mendukung paginasi keyset ORDER BY nama, id
+        db.Index('ix_karyawan_nama_id', 'nama', 'id'),
+        # Daftar karyawan aktif di dashboard: WHERE status = 'Aktif' ORDER BY nama, id
+        db.Index('ix_karyawan_aktif_nama_id', 'nama', 'id',
+                 postgresql_where=db.text("status = 'Aktif'"),
+                 sqlite_where=db.text("status = 'Aktif'")),
+        # Kontrak akan habis: WHERE status = 'Aktif' AND tanggal_akhir_kontrak BETWEEN ... ORDER BY tanggal_akhir_kontrak
+        db.Index('ix_karyawan_status_akhir_kontrak', 'status', 'tanggal_akhir_kontrak'),
+        # Update status otomatis: WHERE tindak_lanjut_kontrak = ... AND tanggal_akhir_kontrak < / <= ...
+        db.Index('ix_karyawan_tindak_lanjut_akhir_kontrak', 'tindak_lanjut_kontrak', 'tanggal_akhir_kontrak'),
+        # Dropdown DISTINCT unit_kerja dan filter unit kerja
+        db.Index('ix_karyawan_unit_kerja', 'unit_kerja'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     nama = db.Column(db.String(150), nullable=False)
@@ -28,6 +52,8 @@ class Karyawan(db.Model):
         default='Tidak perlu',
         server_default='Tidak perlu'
     )
+    # Waktu perubahan terakhir (UTC), diisi otomatis saat INSERT/UPDATE (termasuk update massal Core)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     dokumen = db.relationship('Dokumen', backref='karyawan', lazy=True, cascade="all, delete-orphan")
 
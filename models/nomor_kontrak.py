@@ -0,0 +1,12 @@
+from . import db
+
+
+class NomorKontrakCounter(db.Model):
+    """Nomor urut kontrak terakhir yang sudah dialokasikan, satu baris per tahun."""
+    __tablename__ = 'nomor_kontrak_counter'
+
+    tahun = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    nilai = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<NomorKontrakCounter {self.tahun}: {self.nilai}>'
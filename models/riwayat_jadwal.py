@@ -0,0 +1,22 @@
+from datetime import datetime
+from . import db
+
+
+class RiwayatJadwal(db.Model):
+    """Catatan setiap eksekusi job terjadwal (sekaligus penanda last-run harian)."""
+    __tablename__ = 'riwayat_jadwal'
+    __table_args__ = (
+        # Satu job hanya boleh tercatat sekali per hari
+        db.UniqueConstraint('nama_job', 'tanggal', name='uq_riwayat_jadwal_job_tanggal'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    nama_job = db.Column(db.String(100), nullable=False)
+    tanggal = db.Column(db.Date, nullable=False)
+    mulai = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    durasi_ms = db.Column(db.Integer, nullable=True)
+    baris_terdampak = db.Column(db.Integer, nullable=True)
+    keterangan = db.Column(db.String(255), nullable=True)
+
+    def __repr__(self):
+        return f'<RiwayatJadwal {self.nama_job} {self.tanggal}>'
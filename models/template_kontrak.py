@@ -1,3 +1,4 @@
+from datetime import datetime
 from . import db
 
 class TemplateKontrak(db.Model):
@@ -6,6 +7,8 @@ class TemplateKontrak(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     nama_template = db.Column(db.String(150), nullable=False)
     file_path = db.Column(db.String(255), nullable=False)
+    # Waktu perubahan terakhir (UTC), diisi otomatis saat INSERT/UPDATE
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return f'<TemplateKontrak {self.nama_template}>'
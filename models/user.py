@@ -1,6 +1,22 @@
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import current_app, has_app_context
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
 from . import db # Menggunakan . untuk import relatif dari paket yang sama
 
+# Parameter default Werkzeug, agar 'scrypt' dan 'scrypt:32768:8:1' dianggap metode yang sama
+_DEFAULT_METODE = {
+    'scrypt': 'scrypt:32768:8:1',
+    'pbkdf2': f'pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}',
+    'pbkdf2:sha256': f'pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}',
+    'pbkdf2:sha512': f'pbkdf2:sha512:{DEFAULT_PBKDF2_ITERATIONS}',
+}
+
+
+def metode_hash_password():
+    """Metode hash dari PASSWORD_HASH_METHOD dalam format Werkzeug, lengkap dengan parameternya."""
+    metode = current_app.config['PASSWORD_HASH_METHOD'] if has_app_context() else 'scrypt'
+    return _DEFAULT_METODE.get(metode, metode)
+
+
 class User(db.Model):
     __tablename__ = 'user' # Sebaiknya nama tabel lowercase
 
@@ -9,10 +25,25 @@ class User(db.Model):
     password_hash = db.Column(db.String(256))
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, method=metode_hash_password())
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+    def perlu_rehash(self):
+        """True jika hash tersimpan dibuat dengan metode/parameter selain PASSWORD_HASH_METHOD saat ini."""
+        return self.password_hash.split('$', 1)[0] != metode_hash_password()
+
+    def verifikasi_password(self, password):
+        """
+        Seperti check_password(), dan jika cocok sekaligus membuat ulang hash dengan parameter
+        terbaru (perubahan ditulis saat sesi di-commit oleh pemanggil).
+        """
+        if not self.password_hash or not self.check_password(password):
+            return False
+        if self.perlu_rehash():
+            self.set_password(password)
+        return True
+
     def __repr__(self):
-        return f'<User {self.username}>'
\ No newline at end of file
+        return f'<User {self.username}>'
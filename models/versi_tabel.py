@@ -0,0 +1,12 @@
+from . import db
+
+
+class VersiTabel(db.Model):
+    """Penghitung perubahan per tabel; naik setiap ada INSERT/UPDATE/DELETE (lihat services.cache_halaman)."""
+    __tablename__ = 'versi_tabel'
+
+    nama = db.Column(db.String(64), primary_key=True)
+    versi = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<VersiTabel {self.nama}: {self.versi}>'
@@ -0,0 +1,51 @@
+from functools import wraps
+
+from flask import current_app, flash, redirect, request, session, url_for
+
+from services.antrian import enqueue, jalankan_langsung
+
+
+# --- Helper Functions & Decorators ---
+def login_required(f):
+    # Cukup memeriksa sesi (diisi saat login), tanpa query ke tabel user
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            flash('Silakan login untuk mengakses halaman ini.', 'warning')
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+def allowed_file(filename, extensions):
+    return '.' in filename and \
+        filename.rsplit('.', 1)[1].lower() in extensions
+
+
+def enqueue_job(jenis, payload):
+    """Memasukkan job ke antrian; dengan JOB_EAGER job langsung dijalankan di request ini."""
+    job = enqueue(jenis, payload)
+    if current_app.config['JOB_EAGER']:
+        job = jalankan_langsung(job)
+    return job
+
+
+def ingin_json():
+    """Klien meminta JSON (fetch dengan Accept: application/json atau ?format=json), bukan halaman HTML."""
+    return request.args.get('format') == 'json' or \
+        request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
+
+
+def get_per_page():
+    """Ukuran halaman dari ?per_page=, dibatasi oleh MAX_PER_PAGE."""
+    per_page = request.args.get('per_page', type=int) or current_app.config['PER_PAGE']
+    return max(1, min(per_page, current_app.config['MAX_PER_PAGE']))
+
+
+def daftarkan_blueprint(app):
+    """Mendaftarkan semua blueprint ke `app` (URL tetap sama, endpoint diberi awalan nama blueprint)."""
+    from routes import api, auth, dokumen, karyawan, kontrak, sistem
+
+    for modul in (auth, karyawan, dokumen, kontrak, sistem, api):
+        app.register_blueprint(modul.bp)
@@ -0,0 +1,213 @@
+import hmac
+from datetime import date, datetime, timezone
+from functools import wraps
+
+from flask import Blueprint, current_app, jsonify, request, session, url_for
+from werkzeug.exceptions import HTTPException
+
+from models import db
+from models.dokumen import Dokumen
+from models.karyawan import Karyawan
+from models.template_kontrak import TemplateKontrak
+from routes import get_per_page
+from services.batch_karyawan import GANTI, TAMBAH, UBAH, simpan_batch
+from services.paginasi import CursorTidakValid, paginate_keyset
+from services.pencarian import filter_karyawan
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Kolom yang bisa diminta lewat ?fields=; tanpa ?fields= semua kolom dikirim
+KOLOM_KARYAWAN = {kolom.key: getattr(Karyawan, kolom.key) for kolom in Karyawan.__table__.columns}
+KOLOM_DOKUMEN = {nama: getattr(Dokumen, nama) for nama in
+                 ('id', 'karyawan_id', 'jenis', 'nama_file', 'nomor_surat', 'tanggal_upload', 'updated_at')}
+KOLOM_TEMPLATE = {nama: getattr(TemplateKontrak, nama) for nama in ('id', 'nama_template', 'updated_at')}
+
+
+def _galat(status, pesan, **tambahan):
+    return jsonify({'error': pesan, **tambahan}), status
+
+
+def _token_valid(header):
+    jenis, _, token = (header or '').partition(' ')
+    if jenis.lower() != 'bearer' or not token:
+        return False
+    # Dibandingkan dengan semua token agar waktu pemeriksaan tidak bergantung pada token yang cocok
+    cocok = False
+    for valid in current_app.config['API_TOKENS']:
+        cocok |= hmac.compare_digest(token.encode(), valid.encode())
+    return cocok
+
+
+def api_login_required(f):
+    """Sesi login (browser) atau header `Authorization: Bearer <token>` dari API_TOKENS; selain itu 401 JSON."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session and not _token_valid(request.headers.get('Authorization')):
+            return (*_galat(401, 'Autentikasi dibutuhkan.'), {'WWW-Authenticate': 'Bearer'})
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+@bp.errorhandler(HTTPException)
+def galat_http(e):
+    return _galat(e.code, e.description)
+
+
+def _nilai_json(nilai):
+    if isinstance(nilai, (date, datetime)):
+        return nilai.isoformat()
+    return nilai
+
+
+def _kolom_diminta(tersedia, wajib=('id',)):
+    """Kolom dari ?fields=a,b (sparse fieldset) beserta kolom `wajib` untuk paginasi. Melempar ValueError."""
+    diminta = [nama.strip() for nama in request.args.get('fields', '').split(',') if nama.strip()]
+    asing = [nama for nama in diminta if nama not in tersedia]
+    if asing:
+        raise ValueError(f'Kolom tidak dikenal: {", ".join(asing)}. Pilihan: {", ".join(tersedia)}.')
+    dikirim = diminta or list(tersedia)
+    dimuat = list(dict.fromkeys(dikirim + list(wajib)))
+    return dikirim, [tersedia[nama] for nama in dimuat]
+
+
+def _daftar(query, kolom_kunci, dikirim, endpoint):
+    """Respons daftar berpaginasi keyset: {'data': [...], 'paging': {...}} dengan URL halaman berikut/sebelumnya."""
+    try:
+        halaman = paginate_keyset(query, kolom_kunci, get_per_page(), after=request.args.get('after'),
+                                  before=request.args.get('before'), ketat=True)
+    except CursorTidakValid:
+        return _galat(400, 'Cursor after/before tidak valid; gunakan URL dari paging.next atau paging.prev.')
+    args = {k: v for k, v in request.args.items() if k not in ('after', 'before')}
+    return jsonify({
+        'data': [{nama: _nilai_json(getattr(baris, nama)) for nama in dikirim} for baris in halaman],
+        'paging': {
+            'jumlah': len(halaman),
+            'next': url_for(endpoint, after=halaman.next_cursor, **args) if halaman.has_next else None,
+            'prev': url_for(endpoint, before=halaman.prev_cursor, **args) if halaman.has_prev else None,
+        },
+    })
+
+
+# --- Karyawan ---
+@bp.route('/karyawan')
+@api_login_required
+def daftar_karyawan():
+    """
+    Daftar karyawan terurut (nama, id) dengan cursor ?after=/?before= dan ?per_page=.
+
+    Filter sama dengan dashboard (search, unit_kerja, gaji_min, gaji_max), ditambah status
+    dan updated_since (ISO 8601, untuk sinkronisasi perubahan; tanpa offset dianggap UTC).
+    """
+    try:
+        dikirim, kolom = _kolom_diminta(KOLOM_KARYAWAN, wajib=('nama', 'id'))
+    except ValueError as e:
+        return _galat(400, str(e))
+    updated_since = request.args.get('updated_since')
+    if updated_since:
+        try:
+            updated_since = datetime.fromisoformat(updated_since)
+        except ValueError:
+            return _galat(400, 'updated_since harus berupa waktu ISO 8601, misalnya 2026-01-31T08:00:00.')
+        # updated_at disimpan sebagai UTC tanpa zona waktu; waktu tanpa offset dianggap sudah UTC
+        if updated_since.tzinfo is not None:
+            updated_since = updated_since.astimezone(timezone.utc).replace(tzinfo=None)
+    query, peringatan = filter_karyawan(db.session.query(*kolom), request.args)
+    if peringatan:
+        return _galat(400, ' '.join(peringatan))
+    if request.args.get('status'):
+        query = query.filter(Karyawan.status == request.args['status'])
+    if updated_since:
+        query = query.filter(Karyawan.updated_at >= updated_since)
+    return _daftar(query, (Karyawan.nama, Karyawan.id), dikirim, 'api.daftar_karyawan')
+
+
+@bp.route('/karyawan/<int:id>')
+@api_login_required
+def detail_karyawan(id):
+    try:
+        dikirim, kolom = _kolom_diminta(KOLOM_KARYAWAN)
+    except ValueError as e:
+        return _galat(400, str(e))
+    baris = db.session.query(*kolom).filter(Karyawan.id == id).first()
+    if baris is None:
+        return _galat(404, f'Karyawan dengan id {id} tidak ditemukan.')
+    return jsonify({'data': {nama: _nilai_json(getattr(baris, nama)) for nama in dikirim}})
+
+
+def _batch(mode, status_sukses):
+    """
+    Body JSON: daftar item atau {"data": [...]}, paling banyak API_BATCH_MAX item. Semua item
+    diproses dalam satu transaksi; ?atomik=1 membatalkan seluruh batch jika satu item gagal.
+
+    Status: `status_sukses` jika semua berhasil, 207 jika sebagian gagal, 422 jika tidak ada yang
+    tersimpan (500 jika karena error database).
+    """
+    if not request.is_json:
+        return _galat(415, 'Body harus berupa JSON (Content-Type: application/json).')
+    body = request.get_json(silent=True)
+    items = body.get('data') if isinstance(body, dict) else body
+    if not isinstance(items, list) or not items:
+        return _galat(400, 'Body harus berupa daftar item atau {"data": [...]} yang tidak kosong.')
+    batas = current_app.config['API_BATCH_MAX']
+    if len(items) > batas:
+        return _galat(413, f'Batch maksimal {batas} item.')
+
+    atomik = request.args.get('atomik', '').lower() in ('1', 'true', 'yes')
+    hasil = simpan_batch(items, mode, atomik=atomik)
+    if not hasil.jumlah_gagal:
+        status = status_sukses
+    elif hasil.jumlah_gagal == len(items) or atomik:
+        # Tidak ada yang tersimpan: 500 jika penyebabnya error database, bukan isi item
+        status = 500 if any(item['status'] >= 500 for item in hasil.hasil) else 422
+    else:
+        status = 207
+    return jsonify({**hasil.to_dict(), 'atomik': atomik}), status
+
+
+@bp.route('/karyawan', methods=['POST'])
+@api_login_required
+def tambah_karyawan():
+    """Menambah banyak karyawan; kolom sama dengan template impor Excel."""
+    return _batch(TAMBAH, 201)
+
+
+@bp.route('/karyawan', methods=['PUT'])
+@api_login_required
+def ganti_karyawan():
+    """Mengganti seluruh kolom banyak karyawan (setiap item membutuhkan id dan semua kolom wajib)."""
+    return _batch(GANTI, 200)
+
+
+@bp.route('/karyawan', methods=['PATCH'])
+@api_login_required
+def ubah_karyawan():
+    """Mengubah sebagian kolom banyak karyawan, misalnya [{"id": 1, "tindak_lanjut_kontrak": "..."}]."""
+    return _batch(UBAH, 200)
+
+
+# --- Dokumen dan Template ---
+@bp.route('/dokumen')
+@api_login_required
+def daftar_dokumen():
+    """Metadata dokumen terurut id, dengan filter ?karyawan_id= dan ?jenis=."""
+    try:
+        dikirim, kolom = _kolom_diminta(KOLOM_DOKUMEN)
+    except ValueError as e:
+        return _galat(400, str(e))
+    query = db.session.query(*kolom)
+    if request.args.get('karyawan_id', type=int):
+        query = query.filter(Dokumen.karyawan_id == request.args.get('karyawan_id', type=int))
+    if request.args.get('jenis'):
+        query = query.filter(Dokumen.jenis == request.args['jenis'])
+    return _daftar(query, (Dokumen.id,), dikirim, 'api.daftar_dokumen')
+
+
+@bp.route('/template')
+@api_login_required
+def daftar_template():
+    try:
+        dikirim, kolom = _kolom_diminta(KOLOM_TEMPLATE)
+    except ValueError as e:
+        return _galat(400, str(e))
+    return _daftar(db.session.query(*kolom), (TemplateKontrak.id,), dikirim, 'api.daftar_template')
@@ -0,0 +1,54 @@
+from flask import Blueprint, flash, redirect, render_template, request, session, url_for
+
+from models import db
+from models.user import User
+from services.pembatas_login import pembatas_login, pembatas_login_ip
+from services.sesi import ganti_id_sesi
+
+bp = Blueprint('auth', __name__)
+
+
+# --- Rute Autentikasi ---
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    # Jika sudah login, arahkan ke dashboard
+    if 'user_id' in session:
+        return redirect(url_for('karyawan.dashboard'))
+
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+
+        # Ditolak sebelum query dan hash password, agar tebakan beruntun tidak memakan CPU.
+        # remote_addr adalah IP klien asli jika PROXY_FIX_X_FOR diatur (di belakang nginx)
+        ip = request.remote_addr
+        kunci = (username.lower(), ip)
+        tunggu = max(pembatas_login.sisa_tunggu(kunci), pembatas_login_ip.sisa_tunggu(ip))
+        if tunggu:
+            flash(f'Terlalu banyak percobaan login gagal. Coba lagi dalam {tunggu} detik.', 'danger')
+            return render_template('login.html'), 429, {'Retry-After': str(tunggu)}
+
+        user = User.query.filter_by(username=username).first()
+        if user and user.verifikasi_password(password):
+            # Hash lama dibuat ulang dengan PASSWORD_HASH_METHOD saat ini (jika berubah)
+            db.session.commit()
+            pembatas_login.reset(kunci)
+            # Identitas disimpan di sesi (ID sesi di cookie yang ditandatangani); login_required
+            # tidak perlu query. ID sesi diganti agar ID dari sebelum login tidak bisa dipakai
+            ganti_id_sesi()
+            session['user_id'] = user.id
+            session['username'] = user.username
+            flash('Login berhasil!', 'success')
+            return redirect(url_for('karyawan.dashboard'))
+        else:
+            pembatas_login.catat_gagal(kunci)
+            pembatas_login_ip.catat_gagal(ip)
+            flash('Username atau password salah.', 'danger')
+    return render_template('login.html')
+
+
+@bp.route('/logout')
+def logout():
+    session.clear()
+    flash('Anda telah logout.', 'success')
+    return redirect(url_for('auth.login'))
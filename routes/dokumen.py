@@ -0,0 +1,82 @@
+import os
+from datetime import date
+
+from flask import Blueprint, current_app, flash, redirect, request, url_for
+
+from models import db
+from models.dokumen import Dokumen
+from models.karyawan import Karyawan
+from routes import allowed_file, login_required
+from services.penyimpanan import buang_blob_yatim, pastikan_blob, path_blob, simpan_blob
+from services.unduhan import kirim_file
+
+bp = Blueprint('dokumen', __name__)
+
+
+# --- Rute Dokumen ---
+@bp.route('/dokumen/upload/<int:karyawan_id>', methods=['POST'])
+@login_required
+def upload_dokumen(karyawan_id):
+    # Cukup pastikan karyawannya ada, tanpa memuat seluruh baris
+    db.session.query(Karyawan.id).filter_by(id=karyawan_id).first_or_404()
+    if 'file' not in request.files:
+        flash('Tidak ada file yang dipilih.', 'danger')
+        return redirect(url_for('karyawan.detail_karyawan', id=karyawan_id))
+
+    file = request.files['file']
+    jenis_dokumen = request.form.get('jenis_dokumen', 'Lainnya').strip()  # Default 'Lainnya' jika kosong
+
+    if not jenis_dokumen:
+        flash('Jenis dokumen wajib diisi.', 'danger')
+        return redirect(url_for('karyawan.detail_karyawan', id=karyawan_id))
+
+    if file.filename == '':
+        flash('Tidak ada file yang dipilih.', 'danger')
+        return redirect(url_for('karyawan.detail_karyawan', id=karyawan_id))
+
+    if file and allowed_file(file.filename, current_app.config['ALLOWED_EXTENSIONS_DOC']):
+        sha256 = None
+        try:
+            # File yang sama (misalnya scan KTP yang diunggah ulang) hanya disimpan sekali
+            sha256 = simpan_blob(file)
+            new_dokumen = Dokumen(
+                karyawan_id=karyawan_id,
+                jenis=jenis_dokumen,
+                file_path=path_blob(sha256),
+                blob_sha256=sha256,
+                nama_file=file.filename[:255],
+                tanggal_upload=date.today()  # Tambahkan tanggal upload
+            )
+            db.session.add(new_dokumen)
+            db.session.commit()
+            pastikan_blob(file, sha256)
+            flash('Dokumen berhasil diunggah.', 'success')
+        except Exception as e:
+            db.session.rollback()
+            # Hapus blob yang sudah tersimpan jika tidak ada dokumen lain yang memakainya
+            if sha256:
+                buang_blob_yatim(sha256)
+            flash(f'Gagal menyimpan dokumen. Error: {str(e)}', 'danger')
+    else:
+        allowed_ext_str = ", ".join(current_app.config['ALLOWED_EXTENSIONS_DOC'])
+        flash(f'Format file tidak diizinkan. Hanya izinkan: {allowed_ext_str}', 'warning')
+
+    return redirect(url_for('karyawan.detail_karyawan', id=karyawan_id))
+
+
+@bp.route('/dokumen/download/<int:dokumen_id>')
+@login_required
+def download_dokumen(dokumen_id):
+    dokumen = Dokumen.query.get_or_404(dokumen_id)
+    try:
+        # Cek apakah path file ada
+        if not dokumen.file_path or not os.path.exists(dokumen.file_path):
+            raise FileNotFoundError
+        # File blob dinamai dengan hash-nya; unduh dengan nama file asli. Isi blob tidak pernah
+        # berubah, sehingga hash-nya bisa langsung dipakai sebagai ETag
+        return kirim_file(dokumen.file_path,
+                          download_name=dokumen.nama_file or os.path.basename(dokumen.file_path),
+                          etag=dokumen.blob_sha256 or True)
+    except FileNotFoundError:
+        flash('File tidak ditemukan di server.', 'danger')
+        return redirect(url_for('karyawan.detail_karyawan', id=dokumen.karyawan_id))
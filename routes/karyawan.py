@@ -0,0 +1,411 @@
+import os
+from datetime import date, timedelta, datetime
+
+from flask import (Blueprint, current_app, render_template, request, redirect, url_for, flash,
+                   jsonify, Response, stream_with_context, abort, get_template_attribute)
+from sqlalchemy.orm import load_only, selectinload
+from werkzeug.utils import secure_filename
+
+from models import db
+from models.karyawan import STATUS_TINDAK_LANJUT_OPTIONS, Karyawan
+from models.template_kontrak import TemplateKontrak
+from routes import allowed_file, enqueue_job, get_per_page, ingin_json, login_required
+from services.batch_karyawan import ubah_tindak_lanjut
+from services.cache_halaman import halaman_bersyarat
+from services.ekspor import query_ekspor, stream_csv, stream_xlsx
+from services.impor_excel import BATAS_INTEGER
+from services.paginasi import paginate_keyset
+from services.pencarian import cari_karyawan, filter_karyawan
+from services.penyimpanan import hapus_beserta_dokumen, hapus_file
+from services.referensi import daftar_unit_kerja, invalidate_cache_karyawan
+from services.ringkasan import ringkasan_dashboard
+from services.unduhan import kirim_file, kirim_file_dari_folder
+
+bp = Blueprint('karyawan', __name__)
+
+
+# Kolom yang ditampilkan di tabel daftar karyawan (dashboard dan halaman karyawan). Daftar dimuat
+# sebagai Row ringan, bukan objek Karyawan lengkap, sehingga tidak mengisi identity map
+KOLOM_DAFTAR_KARYAWAN = (Karyawan.id, Karyawan.nama, Karyawan.nup, Karyawan.jabatan, Karyawan.unit_kerja,
+                         Karyawan.gaji_honorarium, Karyawan.status)
+
+
+# --- Rute Utama ---
+@bp.route('/')
+@login_required
+def index():
+    return redirect(url_for('karyawan.dashboard'))
+
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    # Status otomatis diperbarui oleh job terjadwal (flask run-scheduler),
+    # sehingga dashboard hanya membaca data.
+
+    # Ambil parameter filter dari URL
+    search_query = request.args.get('search', '').strip()
+    selected_unit_kerja = request.args.get('unit_kerja', '').strip()
+    gaji_min_str = request.args.get('gaji_min', '').strip()
+    gaji_max_str = request.args.get('gaji_max', '').strip()
+
+    # Angka ringkasan (jumlah per unit/status, gaji, kelompok kontrak akan habis) dari satu query GROUP BY
+    ringkasan = ringkasan_dashboard()
+
+    today = date.today()
+    ninety_days_later = today + timedelta(days=90)
+
+    # Ambil daftar karyawan yang kontraknya akan habis
+    kontrak_akan_habis = Karyawan.query.options(load_only(
+        Karyawan.id, Karyawan.nama, Karyawan.jabatan, Karyawan.tanggal_akhir_kontrak, Karyawan.tindak_lanjut_kontrak
+    )).filter(
+        Karyawan.tanggal_akhir_kontrak.isnot(None),
+        Karyawan.tanggal_akhir_kontrak <= ninety_days_later,
+        Karyawan.tanggal_akhir_kontrak >= today,
+        Karyawan.status == 'Aktif'  # Hanya tampilkan yang masih aktif
+    ).order_by(Karyawan.tanggal_akhir_kontrak).all()
+
+    # Ambil daftar unik unit kerja untuk dropdown filter
+    unit_kerja_options = daftar_unit_kerja()
+
+    # Query dasar untuk karyawan aktif, lalu filter pencarian, unit kerja, dan gaji
+    query, peringatan = filter_karyawan(
+        db.session.query(*KOLOM_DAFTAR_KARYAWAN).filter(Karyawan.status == 'Aktif'), request.args)
+    for pesan in peringatan:
+        flash(pesan, 'warning')
+
+    # Eksekusi query per halaman (keyset pada nama, id)
+    semua_karyawan_aktif = paginate_keyset(query, (Karyawan.nama, Karyawan.id), get_per_page(),
+                                           after=request.args.get('after'),
+                                           before=request.args.get('before'))
+
+    # Parameter filter yang dipertahankan pada tautan halaman berikut/sebelumnya
+    filter_args = {k: v for k, v in request.args.items() if k not in ('after', 'before') and v}
+
+    return render_template('dashboard.html',
+                           ringkasan=ringkasan,
+                           kontrak_akan_habis=kontrak_akan_habis,
+                           semua_karyawan_aktif=semua_karyawan_aktif,
+                           filter_args=filter_args,
+                           # Kirim nilai filter kembali ke template
+                           search_query=search_query,
+                           selected_unit_kerja=selected_unit_kerja,
+                           gaji_min=gaji_min_str,  # Kirim string asli untuk input
+                           gaji_max=gaji_max_str,  # Kirim string asli untuk input
+                           # Kirim data untuk dropdown
+                           unit_kerja_options=unit_kerja_options,
+                           templates=TemplateKontrak.query.all(),
+                           status_options=STATUS_TINDAK_LANJUT_OPTIONS)
+
+
+# --- Rute Karyawan ---
+@bp.route('/karyawan')
+@login_required
+@halaman_bersyarat('karyawan')
+def daftar():
+    semua_karyawan = paginate_keyset(db.session.query(*KOLOM_DAFTAR_KARYAWAN), (Karyawan.nama, Karyawan.id),
+                                     get_per_page(),
+                                     after=request.args.get('after'),
+                                     before=request.args.get('before'))
+    filter_args = {k: v for k, v in request.args.items() if k not in ('after', 'before') and v}
+    # Ambil daftar unik unit kerja untuk dropdown di form tambah
+    unit_kerja_options = daftar_unit_kerja()
+    return render_template('karyawan.html',
+                           semua_karyawan=semua_karyawan,
+                           filter_args=filter_args,
+                           unit_kerja_options=unit_kerja_options)
+
+
+@bp.route('/karyawan/export.<format_file>')
+@login_required
+def ekspor_karyawan(format_file):
+    """Ekspor daftar karyawan aktif dengan filter yang sama seperti dashboard, dikirim secara streaming."""
+    if format_file not in ('xlsx', 'csv'):
+        abort(404)
+    query, _ = filter_karyawan(query_ekspor().filter(Karyawan.status == 'Aktif'), request.args)
+    nama_file = f"karyawan_{datetime.now().strftime('%Y%m%d%H%M%S')}.{format_file}"
+    if format_file == 'xlsx':
+        isi = stream_xlsx(query)
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        isi = stream_csv(query)
+        mimetype = 'text/csv; charset=utf-8'
+    # stream_with_context menjaga sesi database tetap terbuka selama baris dikirim
+    return Response(stream_with_context(isi), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={nama_file}'})
+
+
+@bp.route('/karyawan/autocomplete')
+@login_required
+def autocomplete_karyawan():
+    """Saran karyawan untuk kotak pencarian, diurutkan dari yang paling relevan."""
+    term = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    status = request.args.get('status', '').strip() or None
+    if len(term) < 2:
+        return jsonify({'hasil': []})
+    return jsonify({'hasil': cari_karyawan(term, limit=limit, status=status)})
+
+
+@bp.route('/karyawan/tambah', methods=['POST'])
+@login_required
+def tambah_karyawan():
+    try:
+        # Validasi input tanggal
+        tanggal_lahir_str = request.form.get('tanggal_lahir')
+        tanggal_mulai_str = request.form.get('tanggal_mulai')
+        tanggal_akhir_str = request.form.get('tanggal_akhir_kontrak')
+
+        tanggal_lahir = datetime.strptime(tanggal_lahir_str, '%Y-%m-%d').date() if tanggal_lahir_str else None
+        tanggal_mulai = datetime.strptime(tanggal_mulai_str, '%Y-%m-%d').date() if tanggal_mulai_str else None
+        tanggal_akhir_kontrak = datetime.strptime(tanggal_akhir_str, '%Y-%m-%d').date() if tanggal_akhir_str else None
+
+        if not tanggal_lahir or not tanggal_mulai:
+            flash('Tanggal Lahir dan Tanggal Mulai wajib diisi.', 'danger')
+            return redirect(url_for('karyawan.daftar'))
+
+        new_karyawan = Karyawan(
+            nama=request.form['nama'],
+            jenis_kelamin=request.form['jenis_kelamin'],
+            nup=request.form['nup'],
+            tempat_lahir=request.form['tempat_lahir'],
+            tanggal_lahir=tanggal_lahir,
+            nik=request.form['nik'],
+            alamat=request.form.get('alamat'),
+            no_hp=request.form.get('no_hp'),
+            jabatan=request.form.get('jabatan'),
+            unit_kerja=request.form.get('unit_kerja'),
+            email=request.form.get('email'),
+            tanggal_mulai=tanggal_mulai,
+            tanggal_akhir_kontrak=tanggal_akhir_kontrak,
+            gaji_honorarium=int(request.form.get('gaji_honorarium')) if request.form.get('gaji_honorarium') else None,
+            # Izinkan NULL jika kosong
+            tunjangan_tetap=int(request.form.get('tunjangan_tetap')) if request.form.get('tunjangan_tetap') else None,
+            # Izinkan NULL jika kosong
+            status=request.form.get('status', 'Aktif')
+            # tindak_lanjut_kontrak diisi default oleh model
+        )
+        db.session.add(new_karyawan)
+        db.session.commit()
+        invalidate_cache_karyawan()
+        flash('Karyawan baru berhasil ditambahkan.', 'success')
+    except ValueError:
+        db.session.rollback()
+        flash('Format tanggal tidak valid. Gunakan format YYYY-MM-DD.', 'danger')
+    except Exception as e:
+        db.session.rollback()
+        # Periksa apakah error karena duplikasi NUP/NIK
+        error_str = str(e).lower()
+        if 'unique constraint' in error_str and 'nup' in error_str:
+            flash(f'Gagal menambahkan karyawan. NUP {request.form["nup"]} sudah digunakan.', 'danger')
+        elif 'unique constraint' in error_str and 'nik' in error_str:
+            flash(f'Gagal menambahkan karyawan. NIK {request.form["nik"]} sudah digunakan.', 'danger')
+        else:
+            flash(f'Gagal menambahkan karyawan. Error: {str(e)}', 'danger')
+    return redirect(url_for('karyawan.daftar'))
+
+
+# --- Rute untuk Unggah Massal ---
+@bp.route('/karyawan/upload_excel', methods=['POST'])
+@login_required
+def upload_excel():
+    if 'file' not in request.files:
+        flash('Tidak ada file yang dipilih.', 'danger')
+        return redirect(url_for('karyawan.daftar'))
+
+    file = request.files['file']
+
+    if file.filename == '':
+        flash('Tidak ada file yang dipilih.', 'danger')
+        return redirect(url_for('karyawan.daftar'))
+
+    if file and allowed_file(file.filename, {'xlsx'}):
+        # Simpan file ke folder antrian; parsing dan penyisipan dilakukan oleh worker
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        file_path = os.path.join(current_app.config['UPLOAD_FOLDER_ANTRIAN'],
+                                 secure_filename(f"impor_{timestamp}_{os.urandom(4).hex()}.xlsx"))
+        try:
+            file.save(file_path)
+            job = enqueue_job('impor_excel', {'path': file_path})
+        except Exception as e:
+            db.session.rollback()
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            flash(f'Gagal memproses file Excel. Error: {e}', 'danger')
+            return redirect(url_for('karyawan.daftar'))
+        flash(f'File sedang diproses (job #{job.id}).', 'success')
+        return redirect(url_for('sistem.status_job', id=job.id))
+    else:
+        flash('Format file tidak diizinkan. Harap unggah file .xlsx.', 'warning')
+
+    return redirect(url_for('karyawan.daftar'))
+
+
+@bp.route('/karyawan/upload_excel/laporan/<path:nama_file>')
+@login_required
+def download_laporan_impor(nama_file):
+    return kirim_file_dari_folder(current_app.config['UPLOAD_FOLDER_LAPORAN'], nama_file)
+
+
+@bp.route('/karyawan/download_template')
+@login_required
+def download_template_excel():
+    # Pastikan file template ada di static/
+    template_path = os.path.join(current_app.static_folder, 'template_karyawan.xlsx')
+    if not os.path.exists(template_path):
+        flash('File template tidak ditemukan di server.', 'danger')
+        return redirect(url_for('karyawan.daftar'))
+    return kirim_file(template_path)
+
+
+@bp.route('/karyawan/detail/<int:id>')
+@login_required
+@halaman_bersyarat('karyawan', 'dokumen', 'template_kontrak')
+def detail_karyawan(id):
+    # Dokumen ditampilkan di halaman ini; muat dalam satu query IN, bukan lazy load
+    karyawan = Karyawan.query.options(selectinload(Karyawan.dokumen)).get_or_404(id)
+    templates = TemplateKontrak.query.all()
+    # Ambil daftar unik unit kerja untuk dropdown edit
+    unit_kerja_options = daftar_unit_kerja()
+    return render_template('detail_karyawan.html',
+                           karyawan=karyawan,
+                           templates=templates,
+                           status_options=STATUS_TINDAK_LANJUT_OPTIONS,
+                           unit_kerja_options=unit_kerja_options)
+
+
+@bp.route('/karyawan/edit/<int:id>', methods=['POST'])
+@login_required
+def edit_karyawan(id):
+    karyawan_to_edit = Karyawan.query.get_or_404(id)
+    try:
+        # Validasi input tanggal
+        tanggal_lahir_str = request.form.get('tanggal_lahir')
+        tanggal_mulai_str = request.form.get('tanggal_mulai')
+        tanggal_akhir_str = request.form.get('tanggal_akhir_kontrak')
+
+        tanggal_lahir = datetime.strptime(tanggal_lahir_str, '%Y-%m-%d').date() if tanggal_lahir_str else None
+        tanggal_mulai = datetime.strptime(tanggal_mulai_str, '%Y-%m-%d').date() if tanggal_mulai_str else None
+        tanggal_akhir_kontrak = datetime.strptime(tanggal_akhir_str, '%Y-%m-%d').date() if tanggal_akhir_str else None
+
+        if not tanggal_lahir or not tanggal_mulai:
+            flash('Tanggal Lahir dan Tanggal Mulai wajib diisi.', 'danger')
+            return redirect(url_for('karyawan.detail_karyawan', id=id))
+
+        karyawan_to_edit.nama = request.form['nama']
+        karyawan_to_edit.jenis_kelamin = request.form['jenis_kelamin']
+        karyawan_to_edit.nup = request.form['nup']
+        karyawan_to_edit.tempat_lahir = request.form['tempat_lahir']
+        karyawan_to_edit.tanggal_lahir = tanggal_lahir
+        karyawan_to_edit.nik = request.form['nik']
+        karyawan_to_edit.alamat = request.form.get('alamat')
+        karyawan_to_edit.no_hp = request.form.get('no_hp')
+        karyawan_to_edit.jabatan = request.form.get('jabatan')
+        karyawan_to_edit.unit_kerja = request.form.get('unit_kerja')
+        karyawan_to_edit.email = request.form.get('email')
+        karyawan_to_edit.tanggal_mulai = tanggal_mulai
+        karyawan_to_edit.tanggal_akhir_kontrak = tanggal_akhir_kontrak
+        karyawan_to_edit.gaji_honorarium = int(request.form.get('gaji_honorarium')) if request.form.get(
+            'gaji_honorarium') else None
+        karyawan_to_edit.tunjangan_tetap = int(request.form.get('tunjangan_tetap')) if request.form.get(
+            'tunjangan_tetap') else None
+        karyawan_to_edit.status = request.form['status']
+        karyawan_to_edit.tindak_lanjut_kontrak = request.form['tindak_lanjut_kontrak']
+
+        db.session.commit()
+        invalidate_cache_karyawan()
+        flash('Data karyawan berhasil diperbarui.', 'success')
+    except ValueError:
+        db.session.rollback()
+        flash('Format tanggal tidak valid. Gunakan format YYYY-MM-DD.', 'danger')
+    except Exception as e:
+        db.session.rollback()
+        error_str = str(e).lower()
+        if 'unique constraint' in error_str and 'nup' in error_str:
+            flash(f'Gagal memperbarui data. NUP {request.form["nup"]} sudah digunakan oleh karyawan lain.', 'danger')
+        elif 'unique constraint' in error_str and 'nik' in error_str:
+            flash(f'Gagal memperbarui data. NIK {request.form["nik"]} sudah digunakan oleh karyawan lain.', 'danger')
+        else:
+            flash(f'Gagal memperbarui data. Error: {str(e)}', 'danger')
+    return redirect(url_for('karyawan.detail_karyawan', id=id))
+
+
+def _json_tindak_lanjut(ids, status, pesan):
+    # Pembaruan sebagian untuk dashboard: label status baru cukup dirender sekali untuk semua baris
+    badge = get_template_attribute('_tindak_lanjut.html', 'badge_tindak_lanjut')
+    return jsonify({'ids': ids, 'status': status, 'html': str(badge(status)).strip(), 'pesan': pesan})
+
+
+def _gagal_tindak_lanjut(pesan, status_http=400):
+    if ingin_json():
+        return jsonify({'error': pesan}), status_http
+    flash(pesan, 'danger')
+    return redirect(request.referrer or url_for('karyawan.dashboard'))
+
+
+@bp.route('/karyawan/update_tindak_lanjut/<int:id>', methods=['POST'])
+@login_required
+def update_tindak_lanjut(id):
+    karyawan = Karyawan.query.get_or_404(id)
+    new_status = request.form.get('status_tindak_lanjut')
+    if new_status not in STATUS_TINDAK_LANJUT_OPTIONS:
+        return _gagal_tindak_lanjut(f'Status "{new_status}" tidak valid.')
+    try:
+        karyawan.tindak_lanjut_kontrak = new_status
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return _gagal_tindak_lanjut(f'Gagal memperbarui status. Error: {str(e)}', 500)
+    pesan = f'Status tindak lanjut untuk {karyawan.nama} berhasil diperbarui.'
+    # Dari dashboard (fetch): hanya baris yang berubah diperbarui, tanpa memuat ulang halaman
+    if ingin_json():
+        return _json_tindak_lanjut([id], new_status, pesan)
+    flash(pesan, 'success')
+    # Kembali ke dashboard dengan filter yang sama (jika ada)
+    return redirect(request.referrer or url_for('karyawan.dashboard'))
+
+
+@bp.route('/karyawan/update_tindak_lanjut', methods=['POST'])
+@login_required
+def update_tindak_lanjut_massal():
+    """Mengubah status tindak lanjut karyawan yang dicentang di dashboard dengan satu UPDATE ... WHERE id IN."""
+    new_status = request.form.get('status_tindak_lanjut')
+    # Nilai yang bukan id (teks, negatif, atau di luar rentang kolom integer) diabaikan
+    ids = sorted({int(nilai) for nilai in request.form.getlist('ids')
+                  if nilai.isdecimal() and int(nilai) < BATAS_INTEGER})
+    if new_status not in STATUS_TINDAK_LANJUT_OPTIONS:
+        return _gagal_tindak_lanjut(f'Status "{new_status}" tidak valid.')
+    if not ids:
+        return _gagal_tindak_lanjut('Pilih minimal satu karyawan.')
+    try:
+        diubah = ubah_tindak_lanjut(ids, new_status)
+    except Exception as e:
+        db.session.rollback()
+        return _gagal_tindak_lanjut(f'Gagal memperbarui status. Error: {str(e)}', 500)
+    pesan = f'Status tindak lanjut {len(diubah)} karyawan diperbarui menjadi "{new_status}".'
+    if ingin_json():
+        return _json_tindak_lanjut(diubah, new_status, pesan)
+    flash(pesan, 'success')
+    return redirect(request.referrer or url_for('karyawan.dashboard'))
+
+
+@bp.route('/karyawan/hapus/<int:id>', methods=['POST'])
+@login_required
+def hapus_karyawan(id):
+    # Dokumen dibutuhkan untuk menghapus file fisik dan untuk cascade delete
+    karyawan_to_delete = Karyawan.query.options(selectinload(Karyawan.dokumen)).get_or_404(id)
+    try:
+        # Blob yang masih dipakai dokumen karyawan lain tidak ikut dihapus
+        file_dihapus = hapus_beserta_dokumen(karyawan_to_delete, karyawan_to_delete.dokumen)
+        db.session.commit()
+        invalidate_cache_karyawan()
+        # File fisik dihapus setelah commit, agar tidak hilang jika transaksi gagal
+        hapus_file(file_dihapus)
+        flash('Karyawan dan semua dokumen terkait berhasil dihapus.', 'success')
+        # Kembali ke halaman karyawan setelah hapus
+        return redirect(url_for('karyawan.daftar'))
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Gagal menghapus karyawan. Error: {str(e)}', 'danger')
+        # Kembali ke halaman detail jika gagal hapus
+        return redirect(url_for('karyawan.detail_karyawan', id=id))
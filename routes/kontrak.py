@@ -0,0 +1,157 @@
+import logging
+import os
+from datetime import datetime
+
+from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, url_for
+from werkzeug.utils import secure_filename
+
+from models import db
+from models.karyawan import Karyawan
+from models.template_kontrak import TemplateKontrak
+from routes import allowed_file, enqueue_job, login_required
+from services.cache_halaman import cache_fragmen, halaman_bersyarat
+from services.cache_template import template_cache
+from services.metrik import HASIL_CACHE_TEMPLATE, nilai_gabungan
+from services.unduhan import kirim_file_dari_folder
+
+bp = Blueprint('kontrak', __name__)
+logger = logging.getLogger(__name__)
+
+
+# --- Rute Template Kontrak ---
+@bp.route('/template')
+@login_required
+@halaman_bersyarat('template_kontrak')
+def template_kontrak():
+    templates = TemplateKontrak.query.all()
+    return render_template('template_kontrak.html', templates=templates)
+
+
+@bp.route('/template/upload', methods=['POST'])
+@login_required
+def upload_template():
+    if 'file' not in request.files:
+        flash('Tidak ada file yang dipilih.', 'danger')
+        return redirect(url_for('kontrak.template_kontrak'))
+
+    file = request.files['file']
+    nama_template = request.form.get('nama_template', '').strip()
+
+    if file.filename == '' or not nama_template:
+        flash('Nama template dan file tidak boleh kosong.', 'danger')
+        return redirect(url_for('kontrak.template_kontrak'))
+
+    if file and allowed_file(file.filename, {'docx'}):
+        # Buat nama file unik untuk menghindari tumpang tindih
+        base, ext = os.path.splitext(file.filename)
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        filename = secure_filename(f"{nama_template.replace(' ', '_')}_{timestamp}{ext}")
+        file_path = os.path.join(current_app.config['UPLOAD_FOLDER_TEMPLATE'], filename)
+
+        # Cek jika nama template sudah ada
+        if TemplateKontrak.query.filter_by(nama_template=nama_template).first():
+            flash(f'Nama template "{nama_template}" sudah digunakan.', 'warning')
+            return redirect(url_for('kontrak.template_kontrak'))
+
+        try:
+            file.save(file_path)
+            new_template = TemplateKontrak(nama_template=nama_template, file_path=file_path)
+            db.session.add(new_template)
+            db.session.commit()
+            flash('Template berhasil diunggah.', 'success')
+        except Exception as e:
+            db.session.rollback()
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            flash(f'Gagal menyimpan template. Error: {str(e)}', 'danger')
+    else:
+        flash('Format file tidak diizinkan. Harap unggah file .docx', 'warning')
+
+    return redirect(url_for('kontrak.template_kontrak'))
+
+
+@bp.route('/template/cache')
+@login_required
+def statistik_cache_template():
+    """
+    Statistik cache template .docx dan cache HTML halaman, untuk pemantauan.
+
+    hits/misses dijumlahkan dari semua proses yang merender kontrak (proses web ini dan
+    snapshot metrik worker antrian di METRICS_DIR); `proses_web` hanya proses web ini.
+    """
+    config = current_app.config
+    hasil = nilai_gabungan(HASIL_CACHE_TEMPLATE, config['METRICS_DIR'], config['METRICS_SNAPSHOT_MAX_AGE'])
+    return jsonify({
+        'hits': hasil.get(('hit',), 0),
+        'misses': hasil.get(('miss',), 0),
+        'proses_web': template_cache.statistik(),
+        'fragmen_html': cache_fragmen.statistik(),
+    })
+
+
+@bp.route('/template/hapus/<int:id>', methods=['POST'])
+@login_required
+def hapus_template(id):
+    template_to_delete = TemplateKontrak.query.get_or_404(id)
+    try:
+        # Hapus file fisik
+        if template_to_delete.file_path and os.path.exists(template_to_delete.file_path):
+            try:
+                os.remove(template_to_delete.file_path)
+            except OSError as e:
+                logger.warning('Gagal menghapus file template %s: %s', template_to_delete.file_path, e)
+
+        db.session.delete(template_to_delete)
+        db.session.commit()
+        flash('Template berhasil dihapus.', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Gagal menghapus template. Error: {str(e)}', 'danger')
+    return redirect(url_for('kontrak.template_kontrak'))
+
+
+@bp.route('/kontrak/generate/<int:karyawan_id>', methods=['POST'])
+@login_required
+def generate_kontrak(karyawan_id):
+    karyawan = Karyawan.query.get_or_404(karyawan_id)
+    template_id = request.form.get('template_id')
+    if not template_id:
+        flash('Silakan pilih template kontrak.', 'danger')
+        return redirect(url_for('karyawan.detail_karyawan', id=karyawan_id))
+
+    template = TemplateKontrak.query.get_or_404(template_id)
+
+    # Pastikan file template ada
+    if not template.file_path or not os.path.exists(template.file_path):
+        flash(f'File template "{template.nama_template}" tidak ditemukan di server.', 'danger')
+        return redirect(url_for('karyawan.detail_karyawan', id=karyawan_id))
+
+    # Rendering .docx dijalankan oleh worker
+    job = enqueue_job('generate_kontrak', {'karyawan_id': karyawan.id, 'template_id': template.id})
+    flash(f'Kontrak untuk {karyawan.nama} sedang dibuat (job #{job.id}).', 'success')
+    return redirect(url_for('sistem.status_job', id=job.id))
+
+
+@bp.route('/kontrak/generate_batch', methods=['POST'])
+@login_required
+def generate_kontrak_batch():
+    template_id = request.form.get('template_id', type=int)
+    if not template_id:
+        flash('Silakan pilih template kontrak.', 'danger')
+        return redirect(request.referrer or url_for('karyawan.dashboard'))
+
+    template = TemplateKontrak.query.get_or_404(template_id)
+    job = enqueue_job('generate_kontrak_batch', {
+        'template_id': template.id,
+        'unit_kerja': request.form.get('unit_kerja', '').strip() or None,
+        'akan_habis': bool(request.form.get('akan_habis')),
+        'zip': bool(request.form.get('zip')),
+    })
+    flash(f'Generate kontrak massal sedang diproses (job #{job.id}).', 'success')
+    return redirect(url_for('sistem.status_job', id=job.id))
+
+
+@bp.route('/kontrak/batch/<path:nama_file>')
+@login_required
+def download_kontrak_batch(nama_file):
+    return kirim_file_dari_folder(current_app.config['UPLOAD_FOLDER_KONTRAK'], nama_file)
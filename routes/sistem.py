@@ -0,0 +1,48 @@
+import hmac
+
+from flask import Blueprint, Response, abort, current_app, jsonify, render_template, request, session
+
+from models.job import Job
+from routes import ingin_json, login_required
+from services.metrik import render_prometheus
+
+bp = Blueprint('sistem', __name__)
+
+
+@bp.route('/metrics')
+def metrics():
+    """
+    Metrik format Prometheus: proses web ini ditambah snapshot worker antrian di METRICS_DIR.
+
+    Tanpa login agar bisa di-scrape; jika METRICS_TOKEN diisi, scraper harus mengirim
+    header `Authorization: Bearer <token>`.
+    """
+    config = current_app.config
+    if not config['METRICS_ENABLED']:
+        abort(404)
+    if config['METRICS_TOKEN']:
+        skema, _, token = request.headers.get('Authorization', '').partition(' ')
+        if skema.lower() != 'bearer' or not hmac.compare_digest(token.strip().encode(),
+                                                                config['METRICS_TOKEN'].encode()):
+            return Response('Token metrik tidak valid.\n', 401, {'WWW-Authenticate': 'Bearer'},
+                            content_type='text/plain; charset=utf-8')
+    teks = render_prometheus(config['METRICS_DIR'], config['METRICS_SNAPSHOT_MAX_AGE'])
+    return Response(teks, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# --- Rute Job ---
+@bp.route('/jobs/<int:id>')
+@login_required
+def status_job(id):
+    job = Job.query.get_or_404(id)
+    if ingin_json():
+        return jsonify(job.to_dict())
+    return render_template('job.html', job=job)
+
+
+# --- Pesan flash yang diringkas ---
+@bp.route('/pesan')
+@login_required
+def pesan_tersembunyi():
+    """Isi pesan flash yang digabung menjadi ringkasan (lihat FLASH_MAX_PER_CATEGORY)."""
+    return render_template('pesan_flash.html', laporan=session.get('_flash_laporan', {}))
@@ -0,0 +1 @@
+# Paket layanan: logika bisnis yang dipakai bersama oleh rute web dan perintah CLI.
@@ -0,0 +1,262 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select, update
+
+from models import db
+from models.job import Job
+from services.metrik import hapus_snapshot_lama, simpan_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Daftar handler dan pembersih per jenis job, diisi lewat dekorator @tugas
+HANDLERS = {}
+PEMBERSIH = {}
+
+
+def tugas(jenis, bersihkan=None):
+    """
+    Mendaftarkan fungsi `handler(payload, laporkan_progres) -> dict` untuk jenis job tertentu.
+
+    `bersihkan(payload)` (opsional) dipanggil sekali saat job berakhir, yaitu selesai atau gagal
+    tanpa dicoba lagi, misalnya untuk menghapus file unggahan. Tidak dipanggil jika worker berhenti
+    di tengah job, karena job itu akan dipulihkan dan dijalankan ulang dengan payload yang sama.
+    """
+    def decorator(f):
+        HANDLERS[jenis] = f
+        if bersihkan is not None:
+            PEMBERSIH[jenis] = bersihkan
+        return f
+    return decorator
+
+
+def _bersihkan(jenis, payload):
+    pembersih = PEMBERSIH.get(jenis)
+    if pembersih is None:
+        return
+    try:
+        pembersih(json.loads(payload) if payload else {})
+    except Exception:
+        logger.exception('Gagal membersihkan sisa job %s', jenis)
+
+
+def enqueue(jenis, payload=None):
+    """Menyimpan job baru dengan status 'antri' dan mengembalikan objek Job."""
+    if jenis not in HANDLERS:
+        raise ValueError(f'Jenis job tidak dikenal: {jenis}')
+    job = Job(jenis=jenis, payload=json.dumps(payload or {}), status=Job.STATUS_ANTRI)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def _set_progres(job_id, progres, total=None):
+    # Koneksi terpisah agar progres terlihat tanpa meng-commit transaksi milik handler
+    nilai = {'progres': progres}
+    if total is not None:
+        nilai['total'] = total
+    with db.engine.begin() as conn:
+        conn.execute(update(Job).where(Job.id == job_id).values(**nilai))
+
+
+def nama_proses():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def klaim_job(nama_worker):
+    """
+    Mengambil satu job 'antri' tertua secara atomik.
+
+    Klaim dilakukan dengan UPDATE bersyarat (status masih 'antri'), sehingga aman
+    dijalankan oleh banyak proses worker sekaligus. Setiap klaim menambah `percobaan`.
+    Mengembalikan Job atau None.
+    """
+    while True:
+        job_id = db.session.execute(
+            select(Job.id).where(Job.status == Job.STATUS_ANTRI).order_by(Job.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            db.session.rollback()
+            return None
+        sekarang = datetime.utcnow()
+        hasil = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == Job.STATUS_ANTRI)
+            .values(status=Job.STATUS_BERJALAN, mulai=sekarang, heartbeat=sekarang, worker=nama_worker,
+                    percobaan=Job.percobaan + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        if hasil.rowcount == 1:
+            return db.session.get(Job, job_id)
+        # Job sudah diambil worker lain; coba job berikutnya
+
+
+def jalankan_langsung(job):
+    """
+    Menjalankan `job` di proses ini tanpa worker (JOB_EAGER), dengan penanda mulai yang sama seperti klaim.
+
+    Heartbeat tetap dikirim selama job berjalan, agar worker yang hidup tidak menganggap job yang
+    lama ini macet lalu menjalankannya dua kali.
+    """
+    job.status = Job.STATUS_BERJALAN
+    job.mulai = job.heartbeat = datetime.utcnow()
+    job.worker = f'{nama_proses()} (langsung)'
+    job.percobaan += 1
+    db.session.commit()
+    with _heartbeat(job.id):
+        return jalankan_job(job)
+
+
+def pulihkan_job_macet(batas_detik, maks_percobaan):
+    """
+    Mengembalikan job 'berjalan' yang heartbeat-nya lebih tua dari `batas_detik` ke antrian.
+
+    Worker yang mati (OOM, deploy, mesin mati) meninggalkan job dalam status 'berjalan' tanpa
+    heartbeat baru. Job yang sudah diklaim `maks_percobaan` kali ditandai gagal agar job yang
+    selalu mematikan worker tidak diulang terus. Mengembalikan (jumlah diantrikan ulang, jumlah gagal).
+    """
+    sekarang = datetime.utcnow()
+    macet = (Job.status == Job.STATUS_BERJALAN,
+             func.coalesce(Job.heartbeat, Job.mulai, Job.dibuat) < sekarang - timedelta(seconds=batas_detik))
+    with db.engine.begin() as conn:
+        gagal = conn.execute(
+            update(Job).where(*macet, Job.percobaan >= maks_percobaan)
+            .values(status=Job.STATUS_GAGAL, selesai=sekarang,
+                    pesan_error=f'Worker berhenti saat menjalankan job ini ({maks_percobaan} kali percobaan).')
+            .returning(Job.jenis, Job.payload)
+        ).all()
+        diantrikan = conn.execute(
+            update(Job).where(*macet, Job.percobaan < maks_percobaan)
+            .values(status=Job.STATUS_ANTRI, worker=None, progres=0)
+        ).rowcount
+    # Job yang gagal permanen tidak akan diulang lagi
+    for jenis, payload in gagal:
+        _bersihkan(jenis, payload)
+    if diantrikan or gagal:
+        logger.warning('%s job macet dikembalikan ke antrian, %s ditandai gagal.', diantrikan, len(gagal),
+                       extra={'diantrikan': diantrikan, 'gagal': len(gagal)})
+    return diantrikan, len(gagal)
+
+
+def _kirim_heartbeat(engine, job_id, interval, berhenti):
+    # Thread terpisah: handler job boleh berjalan lama tanpa melaporkan progres
+    while not berhenti.wait(interval):
+        try:
+            with engine.begin() as conn:
+                conn.execute(update(Job).where(Job.id == job_id, Job.status == Job.STATUS_BERJALAN)
+                             .values(heartbeat=datetime.utcnow()))
+        except Exception:
+            logger.exception('Gagal memperbarui heartbeat job #%s', job_id)
+
+
+@contextmanager
+def _heartbeat(job_id):
+    """Memperbarui heartbeat `job_id` setiap JOB_HEARTBEAT_INTERVAL detik selama blok berjalan."""
+    berhenti = threading.Event()
+    detak = threading.Thread(target=_kirim_heartbeat, daemon=True,
+                             args=(db.engine, job_id, current_app.config['JOB_HEARTBEAT_INTERVAL'], berhenti))
+    detak.start()
+    try:
+        yield
+    finally:
+        berhenti.set()
+        detak.join()
+
+
+def jalankan_job(job):
+    """
+    Menjalankan handler untuk `job` dan menyimpan hasil atau pesan error-nya.
+
+    Jika selama berjalan job diambil alih worker lain (heartbeat dianggap macet), hasil dari
+    proses ini tidak disimpan dan pembersih job tidak dipanggil (pemilik baru masih memerlukannya).
+    """
+    handler = HANDLERS.get(job.jenis)
+    job_id = job.id
+    pemilik = (job.worker, job.percobaan)
+    try:
+        if handler is None:
+            raise ValueError(f'Jenis job tidak dikenal: {job.jenis}')
+        hasil = handler(job.payload_data, lambda progres, total=None: _set_progres(job_id, progres, total))
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Error saat menjalankan job #%s (%s)', job_id, job.jenis,
+                         extra={'job_id': job_id, 'jenis': job.jenis})
+        job = db.session.get(Job, job_id)
+        if (job.worker, job.percobaan) != pemilik:
+            return job
+        job.status = Job.STATUS_GAGAL
+        job.pesan_error = str(e)
+        job.selesai = datetime.utcnow()
+        db.session.commit()
+        _bersihkan(job.jenis, job.payload)
+        return job
+
+    job = db.session.get(Job, job_id, populate_existing=True)
+    if (job.worker, job.percobaan) != pemilik:
+        logger.warning('Job #%s sudah diambil alih worker lain; hasil dari %s diabaikan.', job_id, pemilik[0],
+                       extra={'job_id': job_id})
+        return job
+    job.status = Job.STATUS_SELESAI
+    job.hasil = json.dumps(hasil or {})
+    if job.total:
+        job.progres = job.total
+    job.selesai = datetime.utcnow()
+    db.session.commit()
+    _bersihkan(job.jenis, job.payload)
+    return job
+
+
+def _simpan_metrik(config, nama_worker):
+    if not config['METRICS_ENABLED']:
+        return
+    try:
+        simpan_snapshot(config['METRICS_DIR'], nama_worker)
+    except OSError:
+        logger.warning('Gagal menulis snapshot metrik ke %s.', config['METRICS_DIR'], exc_info=True)
+
+
+def worker_loop(interval=2.0, sekali=False):
+    """
+    Mengambil dan menjalankan job secara berulang. Dengan `sekali`, berhenti saat antrian kosong.
+
+    Selama job berjalan, heartbeat-nya diperbarui setiap JOB_HEARTBEAT_INTERVAL detik. Job macet
+    (heartbeat lebih tua dari JOB_STALE_TIMEOUT) dikembalikan ke antrian saat worker mulai dan
+    setiap JOB_HEARTBEAT_INTERVAL detik sesudahnya.
+
+    Metrik worker (misalnya durasi render .docx) ditulis ke METRICS_DIR setelah setiap job dan
+    setiap JOB_HEARTBEAT_INTERVAL detik, agar ikut dijumlahkan di /metrics proses web.
+    """
+    config = current_app.config
+    nama_worker = nama_proses()
+    logger.info('Worker %s siap.', nama_worker)
+    if config['METRICS_ENABLED']:
+        hapus_snapshot_lama(config['METRICS_DIR'], config['METRICS_SNAPSHOT_MAX_AGE'])
+    terakhir_dipulihkan = None
+    while True:
+        if terakhir_dipulihkan is None or time.monotonic() - terakhir_dipulihkan >= config['JOB_HEARTBEAT_INTERVAL']:
+            pulihkan_job_macet(config['JOB_STALE_TIMEOUT'], config['JOB_MAX_ATTEMPTS'])
+            _simpan_metrik(config, nama_worker)
+            terakhir_dipulihkan = time.monotonic()
+
+        job = klaim_job(nama_worker)
+        if job is not None:
+            mulai = time.perf_counter()
+            with _heartbeat(job.id):
+                job = jalankan_job(job)
+            durasi = time.perf_counter() - mulai
+            logger.info('Job #%s (%s) %s dalam %.2f detik.', job.id, job.jenis, job.status, durasi,
+                        extra={'job_id': job.id, 'jenis': job.jenis, 'status': job.status,
+                               'durasi_ms': round(durasi * 1000, 1)})
+            _simpan_metrik(config, nama_worker)
+            continue
+        if sekali:
+            return
+        time.sleep(interval)
@@ -0,0 +1,270 @@
+import logging
+from datetime import date
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from models import db
+from models.karyawan import STATUS_TINDAK_LANJUT_OPTIONS, Karyawan
+from services.impor_excel import EXPECTED_HEADER, UKURAN_CHUNK_IN
+from services.referensi import invalidate_cache_karyawan
+
+# Kolom yang boleh diisi lewat API (sama dengan template impor, ditambah status tindak lanjut)
+KOLOM_TULIS = EXPECTED_HEADER + ['tindak_lanjut_kontrak']
+KOLOM_UNIK = ('nup', 'nik', 'email')
+# Nilai untuk kolom yang dikosongkan saat menambah (POST) atau mengganti (PUT) karyawan
+NILAI_BAWAAN = {'status': 'Aktif', 'tindak_lanjut_kontrak': 'Tidak perlu'}
+
+TAMBAH, GANTI, UBAH = 'tambah', 'ganti', 'ubah'
+
+logger = logging.getLogger(__name__)
+
+
+class ItemTidakValid(ValueError):
+    """Satu item batch tidak valid (kolom tidak dikenal, tipe salah, atau kolom wajib kosong)."""
+
+
+class HasilBatch:
+    """Hasil per item sebuah batch API: status HTTP, id karyawan, dan pesan kesalahan."""
+
+    def __init__(self, jumlah):
+        self.hasil = [None] * jumlah
+
+    def sukses(self, indeks, status, id):
+        self.hasil[indeks] = {'indeks': indeks, 'status': status, 'id': id}
+
+    def gagal(self, indeks, status, pesan, id=None):
+        self.hasil[indeks] = {'indeks': indeks, 'status': status, 'id': id, 'error': pesan}
+
+    @property
+    def jumlah_gagal(self):
+        return sum(1 for item in self.hasil if item is not None and 'error' in item)
+
+    def batalkan(self, valid, status=424, pesan='Dibatalkan karena item lain gagal.'):
+        """Menandai item `valid` yang tidak gagal sebagai dibatalkan (transaksi di-rollback)."""
+        for indeks, data in valid:
+            item = self.hasil[indeks]
+            if item is None or 'error' not in item:
+                self.gagal(indeks, status, pesan, id=data.get('id'))
+
+    def to_dict(self):
+        gagal = self.jumlah_gagal
+        return {'berhasil': len(self.hasil) - gagal, 'gagal': gagal, 'hasil': self.hasil}
+
+
+def _ubah_nilai(nama, nilai):
+    """Memeriksa dan mengonversi nilai JSON untuk kolom `nama` sesuai tipe kolomnya."""
+    kolom = Karyawan.__table__.c[nama]
+    if nilai is None or nilai == '':
+        if not kolom.nullable:
+            raise ItemTidakValid(f'{nama} wajib diisi.')
+        return None
+
+    if isinstance(kolom.type, db.Date):
+        try:
+            return date.fromisoformat(nilai)
+        except (TypeError, ValueError):
+            raise ItemTidakValid(f'{nama} harus berupa tanggal YYYY-MM-DD.')
+
+    if isinstance(kolom.type, db.Integer):
+        if isinstance(nilai, bool) or not isinstance(nilai, int):
+            raise ItemTidakValid(f'{nama} harus berupa bilangan bulat.')
+        return nilai
+
+    # NUP, NIK, dan no HP boleh dikirim sebagai angka, seperti pada impor Excel
+    if isinstance(nilai, int) and not isinstance(nilai, bool):
+        nilai = str(nilai)
+    if not isinstance(nilai, str):
+        raise ItemTidakValid(f'{nama} harus berupa teks.')
+    if kolom.type.length and len(nilai) > kolom.type.length:
+        raise ItemTidakValid(f'{nama} maksimal {kolom.type.length} karakter.')
+    if nama == 'tindak_lanjut_kontrak' and nilai not in STATUS_TINDAK_LANJUT_OPTIONS:
+        raise ItemTidakValid(f'Status tindak lanjut "{nilai}" tidak valid.')
+    return nilai
+
+
+def validasi_item(item, mode):
+    """
+    Mengubah satu item JSON menjadi dict kolom tabel karyawan. Melempar ItemTidakValid.
+
+    TAMBAH dan GANTI (PUT) membutuhkan semua kolom wajib; kolom yang tidak dikirim diisi
+    NILAI_BAWAAN atau NULL. UBAH (PATCH) hanya memuat kolom yang dikirim. GANTI dan UBAH
+    membutuhkan `id`.
+    """
+    if not isinstance(item, dict):
+        raise ItemTidakValid('Item harus berupa objek JSON.')
+    data = dict(item)
+    id_karyawan = data.pop('id', None)
+    if mode == TAMBAH:
+        if id_karyawan is not None:
+            raise ItemTidakValid('id tidak boleh diisi saat menambah karyawan.')
+    elif isinstance(id_karyawan, bool) or not isinstance(id_karyawan, int):
+        raise ItemTidakValid('id wajib diisi (bilangan bulat).')
+
+    asing = sorted(set(data) - set(KOLOM_TULIS))
+    if asing:
+        raise ItemTidakValid(f'Kolom tidak dikenal atau tidak dapat diubah: {", ".join(asing)}.')
+
+    if mode == UBAH:
+        if not data:
+            raise ItemTidakValid('Tidak ada kolom yang diubah.')
+        hasil = {nama: _ubah_nilai(nama, nilai) for nama, nilai in data.items()}
+    else:
+        hasil = {}
+        for nama in KOLOM_TULIS:
+            nilai = data.get(nama)
+            if nilai in (None, '') and nama in NILAI_BAWAAN:
+                nilai = NILAI_BAWAAN[nama]
+            hasil[nama] = _ubah_nilai(nama, nilai)
+    if mode != TAMBAH:
+        hasil['id'] = id_karyawan
+    return hasil
+
+
+def _pemilik_nilai(kolom, nilai):
+    """{nilai: id karyawan} untuk nilai `kolom` yang sudah ada di database, dengan klausa IN per chunk."""
+    nilai = list(nilai)
+    pemilik = {}
+    for i in range(0, len(nilai), UKURAN_CHUNK_IN):
+        chunk = nilai[i:i + UKURAN_CHUNK_IN]
+        pemilik.update(db.session.execute(select(kolom, Karyawan.id).where(kolom.in_(chunk))).all())
+    return pemilik
+
+
+def _saring_id(valid, hasil):
+    """Item GANTI/UBAH dengan id ganda dalam batch (422) atau id yang tidak ada (404) dikeluarkan."""
+    ada = set(_pemilik_nilai(Karyawan.id, {data['id'] for _, data in valid}))
+    terlihat = set()
+    tersisa = []
+    for indeks, data in valid:
+        if data['id'] in terlihat:
+            hasil.gagal(indeks, 422, f"id {data['id']} muncul lebih dari sekali dalam batch.", id=data['id'])
+        elif data['id'] not in ada:
+            hasil.gagal(indeks, 404, f"Karyawan dengan id {data['id']} tidak ditemukan.", id=data['id'])
+        else:
+            terlihat.add(data['id'])
+            tersisa.append((indeks, data))
+    return tersisa
+
+
+def _saring_bentrok_unik(valid, hasil):
+    """Item yang NUP/NIK/email-nya sudah dipakai karyawan lain atau item sebelumnya dikeluarkan (409)."""
+    pemilik = {nama: _pemilik_nilai(getattr(Karyawan, nama), {data[nama] for _, data in valid if data.get(nama)})
+               for nama in KOLOM_UNIK}
+    terlihat = {nama: set() for nama in KOLOM_UNIK}
+    tersisa = []
+    for indeks, data in valid:
+        bentrok = [nama for nama in KOLOM_UNIK
+                   if data.get(nama) and (pemilik[nama].get(data[nama], data.get('id')) != data.get('id')
+                                          or data[nama] in terlihat[nama])]
+        if bentrok:
+            hasil.gagal(indeks, 409, f'{", ".join(nama.upper() for nama in bentrok)} sudah digunakan.',
+                        id=data.get('id'))
+            continue
+        for nama in KOLOM_UNIK:
+            if data.get(nama):
+                terlihat[nama].add(data[nama])
+        tersisa.append((indeks, data))
+    return tersisa
+
+
+def _tulis(valid, mode, hasil):
+    if mode == TAMBAH:
+        # executemany dengan RETURNING berurutan: id hasil INSERT dipasangkan ke item sesuai urutan
+        stmt = insert(Karyawan).returning(Karyawan.id, sort_by_parameter_order=True)
+        ids = db.session.execute(stmt, [data for _, data in valid]).scalars().all()
+        for (indeks, _), id_baru in zip(valid, ids):
+            hasil.sukses(indeks, 201, id_baru)
+        return
+
+    # UPDATE per primary key; item dengan kumpulan kolom yang sama dikirim sebagai satu executemany
+    per_kolom = {}
+    for indeks, data in valid:
+        per_kolom.setdefault(frozenset(data), []).append((indeks, data))
+    for kelompok in per_kolom.values():
+        db.session.execute(update(Karyawan), [data for _, data in kelompok])
+        for indeks, data in kelompok:
+            hasil.sukses(indeks, 200, data['id'])
+
+
+def ubah_tindak_lanjut(ids, status):
+    """
+    Mengubah status tindak lanjut banyak karyawan dengan satu
+    UPDATE karyawan SET tindak_lanjut_kontrak = ... WHERE id IN (...). `status` harus sudah
+    divalidasi terhadap STATUS_TINDAK_LANJUT_OPTIONS. Mengembalikan id yang benar-benar diubah.
+    """
+    tabel = Karyawan.__table__
+    diubah = db.session.execute(
+        update(tabel).where(tabel.c.id.in_(ids)).values(tindak_lanjut_kontrak=status).returning(tabel.c.id)
+    ).scalars().all()
+    db.session.commit()
+    return sorted(diubah)
+
+
+def _mulai_transaksi():
+    """
+    Memastikan transaksi database sudah dimulai sebelum savepoint pertama.
+
+    Driver sqlite3 baru mengirim BEGIN sebelum INSERT/UPDATE. SAVEPOINT yang dikirim lebih dulu
+    membuka transaksinya sendiri dan RELEASE-nya langsung meng-commit, sehingga rollback batch
+    (mode atomik atau commit yang gagal) tidak lagi membatalkan item yang sudah ditulis.
+    """
+    conn = db.session.connection()
+    if conn.dialect.name == 'sqlite' and not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql('BEGIN')
+
+
+def simpan_batch(items, mode, atomik=False):
+    """
+    Menambah (TAMBAH), mengganti (GANTI), atau mengubah sebagian (UBAH) banyak karyawan dalam
+    satu transaksi, dengan hasil per item (lihat HasilBatch).
+
+    Validasi, pengecekan id, dan keunikan NUP/NIK/email dilakukan untuk seluruh batch dengan
+    beberapa query IN; item yang lolos ditulis dengan executemany. Jika tulis massal tetap
+    bentrok (data diubah proses lain di antara pengecekan dan tulis), item ditulis ulang satu
+    per satu dalam savepoint agar item yang bentrok (409) atau gagal karena error database
+    lain (500) diketahui. Dengan `atomik`, satu item gagal membatalkan seluruh batch.
+    """
+    hasil = HasilBatch(len(items))
+    valid = []
+    for indeks, item in enumerate(items):
+        try:
+            valid.append((indeks, validasi_item(item, mode)))
+        except ItemTidakValid as e:
+            hasil.gagal(indeks, 422, str(e), id=item.get('id') if isinstance(item, dict) else None)
+
+    if valid and mode != TAMBAH:
+        valid = _saring_id(valid, hasil)
+    if valid:
+        valid = _saring_bentrok_unik(valid, hasil)
+
+    if valid and not (atomik and hasil.jumlah_gagal):
+        _mulai_transaksi()
+        try:
+            with db.session.begin_nested():
+                _tulis(valid, mode, hasil)
+        except SQLAlchemyError:
+            for indeks, data in valid:
+                try:
+                    with db.session.begin_nested():
+                        _tulis([(indeks, data)], mode, hasil)
+                except IntegrityError:
+                    hasil.gagal(indeks, 409, 'NUP, NIK, atau email sudah digunakan.', id=data.get('id'))
+                except SQLAlchemyError:
+                    logger.warning('Gagal menulis item %s batch karyawan (%s).', indeks, mode, exc_info=True)
+                    hasil.gagal(indeks, 500, 'Gagal menyimpan item ke database.', id=data.get('id'))
+
+    if atomik and hasil.jumlah_gagal:
+        db.session.rollback()
+        hasil.batalkan(valid)
+        return hasil
+    try:
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception('Commit batch karyawan (%s) gagal.', mode)
+        hasil.batalkan(valid, 500, 'Transaksi gagal di-commit; item tidak tersimpan.')
+        return hasil
+    if len(hasil.hasil) > hasil.jumlah_gagal:
+        invalidate_cache_karyawan()
+    return hasil
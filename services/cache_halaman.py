@@ -0,0 +1,276 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+
+from flask import current_app, get_flashed_messages, make_response, request, session
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.sql.dml import UpdateBase
+
+from models import db
+from models.versi_tabel import VersiTabel
+from services.metrik import HASIL_CACHE_HALAMAN
+
+logger = logging.getLogger(__name__)
+
+# Tabel yang perubahannya dihitung di versi_tabel
+TABEL_DILACAK = frozenset({'karyawan', 'dokumen', 'template_kontrak'})
+
+# Folder yang isinya menentukan HTML yang dihasilkan; ikut membentuk ETag agar deploy baru tidak menjawab 304
+_FOLDER_TAMPILAN = ('templates', 'routes', 'services')
+
+# Nama tabel yang ditulis di transaksi yang sedang berjalan, dan yang sudah di-commit tetapi
+# versinya belum dinaikkan (per koneksi)
+_INFO_DITULIS = 'versi_tabel_ditulis'
+_INFO_SIAP = 'versi_tabel_siap'
+
+
+class CacheFragmen:
+    """
+    Cache LRU HTML hasil render per pengguna, dibatasi jumlah entri per pengguna dan total ukuran.
+
+    Kunci entri adalah ETag halaman, yang sudah memuat versi tabel; setelah data berubah entri lama
+    tidak pernah cocok lagi. invalidate() membebaskan memorinya lebih awal dan dipanggil otomatis
+    saat transaksi yang mengubah tabel terkait di-commit di proses ini.
+    """
+
+    def __init__(self, maks_byte=32 * 1024 * 1024, maks_per_user=20):
+        self.maks_byte = maks_byte
+        self.maks_per_user = maks_per_user
+        self._entri = OrderedDict()  # (user_id, etag) -> (html, tabel)
+        self._ukuran = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id, kunci):
+        with self._lock:
+            entri = self._entri.get((user_id, kunci))
+            if entri is None:
+                self.misses += 1
+                return None
+            self._entri.move_to_end((user_id, kunci))
+            self.hits += 1
+            return entri[0]
+
+    def set(self, user_id, kunci, html, tabel):
+        if len(html) > self.maks_byte:
+            return
+        with self._lock:
+            if (user_id, kunci) in self._entri:
+                self._buang((user_id, kunci))
+            self._entri[(user_id, kunci)] = (html, frozenset(tabel))
+            self._ukuran += len(html)
+            milik_user = [k for k in self._entri if k[0] == user_id]
+            for k in milik_user[:-self.maks_per_user]:
+                self._buang(k)
+            while self._ukuran > self.maks_byte:
+                self._buang(next(iter(self._entri)))
+
+    def _buang(self, kunci):
+        html, _ = self._entri.pop(kunci)
+        self._ukuran -= len(html)
+
+    def invalidate(self, tabel=None):
+        """Membuang entri yang bergantung pada salah satu `tabel` (semua entri jika None)."""
+        with self._lock:
+            dibuang = [k for k, (_, t) in self._entri.items() if tabel is None or t & tabel]
+            for k in dibuang:
+                self._buang(k)
+            self.invalidations += len(dibuang)
+
+    def statistik(self):
+        with self._lock:
+            return {
+                'entri': len(self._entri),
+                'byte': self._ukuran,
+                'maks_byte': self.maks_byte,
+                'maks_per_user': self.maks_per_user,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+            }
+
+
+cache_fragmen = CacheFragmen()
+
+
+# --- Versi tabel ---
+# Tabel yang ditulis dicatat dari event engine, sehingga semua jalur tulis ikut tercatat: ORM flush,
+# update massal Core (impor Excel, status otomatis), job worker, dan CLI. DELETE juga tercatat,
+# berbeda dengan watermark MAX(updated_at). versi_tabel tidak ikut diubah di dalam transaksi bisnis
+# (baris penghitung yang sama akan mengantrekan semua penulis dan rawan deadlock di PostgreSQL):
+# versinya dinaikkan setelah commit, dalam transaksi pendek tersendiri di koneksi yang sama, saat
+# koneksi itu dikembalikan ke pool (langsung sesudah commit untuk Session dan engine.begin()). Transaksi yang di-rollback tidak
+# menaikkan apa pun. Selama jeda singkat antara commit dan kenaikan, ETag lama masih bisa dijawab 304.
+
+def _catat_tulis(conn, clauseelement, multiparams, params, execution_options, result):
+    if not isinstance(clauseelement, UpdateBase):
+        return
+    nama = getattr(getattr(clauseelement, 'table', None), 'name', None)
+    if nama in TABEL_DILACAK:
+        conn.info.setdefault(_INFO_DITULIS, set()).add(nama)
+
+
+def _tandai_siap(conn):
+    # Event commit terjadi sesaat sebelum COMMIT ke database; kenaikannya menunggu koneksi dilepas
+    ditulis = conn.info.pop(_INFO_DITULIS, None)
+    if ditulis:
+        conn.info.setdefault(_INFO_SIAP, set()).update(ditulis)
+
+
+def _lupakan_tulis(conn):
+    conn.info.pop(_INFO_DITULIS, None)
+
+
+def _jalankan_dbapi(cursor, dialect, statement):
+    compiled = statement.compile(dialect=dialect)
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[nama] for nama in compiled.positiontup)
+    cursor.execute(compiled.string, params)
+    return cursor.rowcount
+
+
+def naikkan_versi(dbapi_connection, dialect, tabel):
+    """
+    Menaikkan versi `tabel` dalam satu transaksi pendek di koneksi DBAPI yang sedang menganggur.
+
+    Memakai koneksi yang dikembalikan ke pool (bukan checkout koneksi baru), sehingga tidak
+    menunggu pool yang sedang penuh. Nama tabel diproses berurutan agar penulis tidak saling kunci.
+    """
+    kolom = VersiTabel.__table__
+    cursor = dbapi_connection.cursor()
+    try:
+        for nama in sorted(tabel):
+            diubah = _jalankan_dbapi(cursor, dialect, update(kolom).where(kolom.c.nama == nama)
+                                     .values(versi=kolom.c.versi + 1))
+            if diubah == 0:
+                # Database yang dibuat tanpa migrasi (db.create_all) belum memiliki barisnya
+                _jalankan_dbapi(cursor, dialect, insert(kolom).values(nama=nama, versi=1))
+        dbapi_connection.commit()
+    except Exception:
+        dbapi_connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def _penaik_versi(dialect):
+    def koneksi_kembali_ke_pool(dbapi_connection, connection_record):
+        connection_record.info.pop(_INFO_DITULIS, None)
+        siap = connection_record.info.pop(_INFO_SIAP, None)
+        if not siap:
+            return
+        try:
+            if dbapi_connection is not None:
+                naikkan_versi(dbapi_connection, dialect, siap)
+        except Exception:
+            logger.warning('Gagal menaikkan versi_tabel %s; ETag halaman bisa basi sampai tulis berikutnya.',
+                           sorted(siap), exc_info=True)
+        cache_fragmen.invalidate(siap)
+    return koneksi_kembali_ke_pool
+
+
+def baca_versi(tabel):
+    """Versi terkini `tabel` sebagai tuple ((nama, versi), ...) dalam satu query."""
+    kolom = VersiTabel.__table__.c
+    return tuple(sorted(db.session.execute(select(kolom.nama, kolom.versi).where(kolom.nama.in_(tabel))).all()))
+
+
+def _hitung_versi_tampilan(app):
+    # Hash isi file (bukan mtime) agar sama di semua worker dan host yang menjalankan kode yang sama
+    h = hashlib.sha1(app.config['ETAG_SALT'].encode())
+    for folder in _FOLDER_TAMPILAN:
+        for root, dirs, files in sorted(os.walk(os.path.join(app.root_path, folder))):
+            dirs[:] = [d for d in dirs if d != '__pycache__']
+            for nama in sorted(files):
+                with open(os.path.join(root, nama), 'rb') as f:
+                    h.update(nama.encode())
+                    h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def _buat_etag(tabel):
+    data = (
+        current_app.extensions['versi_tampilan'],
+        session.get('user_id'),
+        session.get('username'),
+        request.full_path,
+        baca_versi(tabel),
+        # Sisa hari kontrak dan sejenisnya berubah setiap hari tanpa perubahan data
+        date.today().isoformat(),
+    )
+    return hashlib.sha1(repr(data).encode()).hexdigest()
+
+
+def halaman_bersyarat(*tabel):
+    """
+    Decorator view GET yang hasilnya hanya bergantung pada isi `tabel` dan query string.
+
+    ETag dibentuk dari versi tabel, pengguna, URL, tanggal, dan versi kode; If-None-Match yang cocok
+    dijawab 304 tanpa query data maupun render. HTML yang dirender disimpan di cache_fragmen per
+    pengguna. Request dengan pesan flash tertunda selalu dirender ulang dan tidak disimpan.
+    """
+    tabel = frozenset(tabel)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            endpoint = request.endpoint
+            if not current_app.config['HTTP_CACHE_ENABLED'] or '_flashes' in session:
+                HASIL_CACHE_HALAMAN.inc(endpoint=endpoint, hasil='lewati')
+                return view(*args, **kwargs)
+
+            user_id = session.get('user_id')
+            etag = _buat_etag(tabel)
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+                hasil = '304'
+            else:
+                html = cache_fragmen.get(user_id, etag)
+                if html is not None:
+                    response = current_app.response_class(html, mimetype='text/html')
+                    hasil = 'hit'
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    # Halaman yang ikut menampilkan pesan flash tidak boleh diputar ulang
+                    if response.status_code != 200 or '_flashes' in session or get_flashed_messages():
+                        HASIL_CACHE_HALAMAN.inc(endpoint=endpoint, hasil='lewati')
+                        return response
+                    cache_fragmen.set(user_id, etag, response.get_data(), tabel)
+                    hasil = 'miss'
+
+            response.set_etag(etag)
+            # Browser selalu bertanya ulang (no-cache) dan tidak boleh disimpan proxy bersama (private)
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.add('Cookie')
+            HASIL_CACHE_HALAMAN.inc(endpoint=endpoint, hasil=hasil)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def pasang_cache_halaman(app, db):
+    """
+    Memasang pencatat tulis dan penaik versi_tabel pada engine dan mengatur cache_fragmen dari config.
+
+    Penghitung selalu aktif (juga untuk CLI dan worker), sehingga ETag tetap benar
+    walaupun HTTP_CACHE_ENABLED baru dinyalakan belakangan.
+    """
+    cache_fragmen.maks_byte = app.config['FRAGMENT_CACHE_MAX_BYTES']
+    cache_fragmen.maks_per_user = app.config['FRAGMENT_CACHE_PER_USER']
+    app.extensions['versi_tampilan'] = _hitung_versi_tampilan(app)
+
+    with app.app_context():
+        event.listen(db.engine, 'after_execute', _catat_tulis)
+        event.listen(db.engine, 'commit', _tandai_siap)
+        event.listen(db.engine, 'rollback', _lupakan_tulis)
+        event.listen(db.engine.pool, 'checkin', _penaik_versi(db.engine.dialect))
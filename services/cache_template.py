@@ -0,0 +1,110 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from jinja2 import Environment
+
+from services.metrik import HASIL_CACHE_TEMPLATE
+
+
+class _EnvironmentTersimpan(Environment):
+    """
+    Environment Jinja2 yang mengingat hasil kompilasi from_string.
+
+    docxtpl mengompilasi ulang seluruh XML dokumen menjadi template Jinja2 pada
+    setiap render; bagian inilah yang paling mahal. Untuk satu file template,
+    sumber XML yang dikompilasi selalu sama, jadi hasil kompilasinya bisa dipakai ulang.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._kompilasi = {}
+        self._lock = threading.Lock()
+
+    def from_string(self, source, globals=None, template_class=None):
+        if globals or template_class:
+            return super().from_string(source, globals, template_class)
+        template = self._kompilasi.get(source)
+        if template is None:
+            template = super().from_string(source)
+            with self._lock:
+                self._kompilasi[source] = template
+        return template
+
+
+class _EntriTemplate:
+    def __init__(self, kunci, data):
+        self.kunci = kunci  # (template_id, path, inode, mtime_ns, ukuran)
+        self.data = data  # isi file .docx
+        self.env = _EnvironmentTersimpan()
+
+
+class TemplateCache:
+    """
+    Cache LRU template kontrak yang sudah dimuat, dikunci dengan (id, path, inode, mtime, ukuran file).
+
+    Template yang diganti, dihapus, atau ID yang dipakai ulang untuk file lain terdeteksi dari
+    kuncinya saat render berikutnya, sehingga setiap proses (web, worker antrian, pool render)
+    tidak perlu diberi tahu untuk membuang entrinya. Hit/miss juga dicatat ke metrik
+    HASIL_CACHE_TEMPLATE agar terlihat di /metrics.
+    """
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self._entri = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _muat(self, template_id, file_path):
+        stat = os.stat(file_path)
+        kunci = (template_id, os.path.abspath(file_path), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entri = self._entri.get(template_id)
+            if entri is not None and entri.kunci == kunci:
+                self._entri.move_to_end(template_id)
+                self.hits += 1
+                HASIL_CACHE_TEMPLATE.inc(hasil='hit')
+                return entri
+            self.misses += 1
+            HASIL_CACHE_TEMPLATE.inc(hasil='miss')
+
+        # Baca file di luar lock; file yang berubah otomatis menggantikan entri lama
+        with open(file_path, 'rb') as f:
+            entri = _EntriTemplate(kunci, f.read())
+        with self._lock:
+            self._entri[template_id] = entri
+            self._entri.move_to_end(template_id)
+            while len(self._entri) > max(self.maxsize, 1):
+                self._entri.popitem(last=False)
+        return entri
+
+    def siapkan(self, template_id, file_path):
+        """
+        Mengembalikan (DocxTemplate baru, Environment) untuk satu kali render.
+
+        DocxTemplate dibuat dari salinan di memori (tanpa membaca ZIP dari disk),
+        dan Environment menyimpan hasil kompilasi Jinja2 untuk template ini.
+        Gunakan: doc.render(context, jinja_env=env).
+        """
+        # docxtpl (python-docx, lxml) baru diimpor saat kontrak pertama dirender,
+        # bukan saat aplikasi web atau perintah CLI lain dimulai
+        from docxtpl import DocxTemplate
+
+        entri = self._muat(template_id, file_path)
+        return DocxTemplate(io.BytesIO(entri.data)), entri.env
+
+    def statistik(self):
+        """Statistik cache di proses ini saja."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entri),
+                'maxsize': self.maxsize,
+            }
+
+
+# Satu cache per proses; ukurannya diatur dari DOCX_TEMPLATE_CACHE_SIZE saat aplikasi dibuat
+template_cache = TemplateCache()
@@ -0,0 +1,187 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import date
+from xml.sax.saxutils import escape
+
+from sqlalchemy import select
+
+from models import db
+from models.karyawan import Karyawan
+from services.impor_excel import EXPECTED_HEADER
+
+# Kolom ekspor sama dengan template impor, sehingga file hasil ekspor bisa diunggah kembali
+KOLOM_EKSPOR = [getattr(Karyawan, nama) for nama in EXPECTED_HEADER]
+
+# Jumlah baris yang diambil dari cursor server sekaligus
+UKURAN_YIELD = 1000
+# Jumlah baris per potongan respons
+UKURAN_POTONGAN = 500
+
+
+def query_ekspor():
+    """SELECT kolom ekspor (tanpa memuat objek ORM), terurut nama, id. Tambahkan filter dengan .filter()."""
+    return select(*KOLOM_EKSPOR).order_by(Karyawan.nama, Karyawan.id)
+
+
+def _baris(query):
+    # yield_per mengaktifkan stream_results: PostgreSQL memakai cursor server-side,
+    # sehingga baris dibaca bertahap dan memori tetap datar berapa pun jumlah hasilnya
+    hasil = db.session.execute(query.execution_options(yield_per=UKURAN_YIELD))
+    for partisi in hasil.partitions():
+        yield from partisi
+
+
+def stream_csv(query):
+    """Generator potongan CSV (UTF-8 dengan BOM agar terbaca benar di Excel)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(EXPECTED_HEADER)
+    yield buffer.getvalue().encode('utf-8')
+
+    jumlah = 0
+    buffer.seek(0)
+    buffer.truncate()
+    for baris in _baris(query):
+        writer.writerow(['' if nilai is None else nilai for nilai in baris])
+        jumlah += 1
+        if jumlah % UKURAN_POTONGAN == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+# --- XLSX streaming ---
+# openpyxl (termasuk mode write_only) baru menulis arsip .xlsx saat save(), setelah semua
+# baris terkumpul. Di sini arsip ditulis langsung ke stream: sheet ditulis per potongan
+# baris, sehingga byte pertama terkirim sebelum query selesai.
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{nama_sheet}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Gaya 0: default, gaya 1: tanggal (format bawaan 14)
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_AWAL_SHEET = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_AKHIR_SHEET = '</sheetData></worksheet>'
+
+_EPOCH_EXCEL = date(1899, 12, 30)
+# Karakter kontrol yang tidak boleh ada di XML
+_KARAKTER_ILEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class _Penampung(io.RawIOBase):
+    """Tujuan tulis ZipFile yang tidak bisa di-seek; isinya diambil per potongan."""
+
+    def __init__(self):
+        self._potongan = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._potongan.append(bytes(data))
+        return len(data)
+
+    def ambil(self):
+        data = b''.join(self._potongan)
+        self._potongan.clear()
+        return data
+
+
+def _sel(nilai):
+    if nilai is None:
+        return '<c/>'
+    if isinstance(nilai, bool):
+        return f'<c t="b"><v>{int(nilai)}</v></c>'
+    if isinstance(nilai, (int, float)):
+        return f'<c><v>{nilai}</v></c>'
+    if isinstance(nilai, date):
+        return f'<c s="1"><v>{(nilai - _EPOCH_EXCEL).days}</v></c>'
+    teks = escape(_KARAKTER_ILEGAL.sub('', str(nilai)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{teks}</t></is></c>'
+
+
+def _baris_xml(nilai_baris):
+    return '<row>' + ''.join(_sel(nilai) for nilai in nilai_baris) + '</row>'
+
+
+def stream_xlsx(query, nama_sheet='Karyawan'):
+    """Generator potongan file .xlsx berisi header dan hasil `query`."""
+    penampung = _Penampung()
+    with zipfile.ZipFile(penampung, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        zf.writestr('_rels/.rels', _RELS)
+        zf.writestr('xl/workbook.xml', _WORKBOOK.format(nama_sheet=escape(nama_sheet)))
+        zf.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        zf.writestr('xl/styles.xml', _STYLES)
+
+        with zf.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((_AWAL_SHEET + _baris_xml(EXPECTED_HEADER)).encode('utf-8'))
+            yield penampung.ambil()
+
+            potongan = []
+            for baris in _baris(query):
+                potongan.append(_baris_xml(baris))
+                if len(potongan) == UKURAN_POTONGAN:
+                    sheet.write(''.join(potongan).encode('utf-8'))
+                    potongan.clear()
+                    data = penampung.ambil()
+                    if data:
+                        yield data
+            sheet.write((''.join(potongan) + _AKHIR_SHEET).encode('utf-8'))
+    yield penampung.ambil()
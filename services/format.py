@@ -0,0 +1,12 @@
+def format_rupiah(value):
+    if value is None:
+        return "0"
+    # Format tanpa desimal
+    return "{:,.0f}".format(value).replace(',', '.')
+
+
+def format_tanggal(value):
+    if value is None:
+        return "-"
+    # Format: 19 Oktober 2025
+    return value.strftime("%d %B %Y")
@@ -0,0 +1,284 @@
+import csv
+import os
+import uuid
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import Integer, insert, select
+
+from models import db
+from models.karyawan import Karyawan
+from services.antrian import tugas
+from services.referensi import invalidate_cache_karyawan
+
+EXPECTED_HEADER = ['nama', 'jenis_kelamin', 'nup', 'tempat_lahir', 'tanggal_lahir', 'nik', 'alamat',
+                   'no_hp', 'jabatan', 'unit_kerja', 'email', 'tanggal_mulai', 'tanggal_akhir_kontrak',
+                   'gaji_honorarium', 'tunjangan_tetap', 'status']
+
+# Jumlah baris per executemany INSERT
+UKURAN_BATCH_INSERT = 1000
+# Jumlah nilai per klausa IN saat memeriksa data yang sudah ada
+UKURAN_CHUNK_IN = 500
+# Kolom Integer (gaji, tunjangan) adalah INTEGER 32-bit di PostgreSQL
+BATAS_INTEGER = 2 ** 31
+
+
+class HeaderTidakValid(ValueError):
+    """Header file Excel tidak sesuai dengan template."""
+
+
+class HasilImpor:
+    """Ringkasan hasil impor beserta daftar kesalahan per baris."""
+
+    def __init__(self):
+        self.berhasil = 0
+        self.duplikat = 0
+        self.tidak_valid = 0
+        self.kesalahan = []  # (nomor baris, nup, nik, pesan)
+
+    def catat(self, baris, nup, nik, pesan, duplikat=False):
+        self.kesalahan.append((baris, nup, nik, pesan))
+        if duplikat:
+            self.duplikat += 1
+        else:
+            self.tidak_valid += 1
+
+    def ringkasan(self):
+        return (f'Proses unggah selesai. {self.berhasil} karyawan berhasil ditambahkan. '
+                f'{self.duplikat} data duplikat dilewati. '
+                f'{self.tidak_valid} data tidak lengkap/valid dilewati.')
+
+    def to_dict(self):
+        return {'berhasil': self.berhasil, 'duplikat': self.duplikat,
+                'tidak_valid': self.tidak_valid, 'jumlah_kesalahan': len(self.kesalahan)}
+
+
+def _parse_tanggal(raw):
+    # Tangani tanggal dari Excel (bisa jadi datetime atau string)
+    if not raw:
+        return None
+    if isinstance(raw, datetime):
+        return raw.date()
+    return datetime.strptime(str(raw).split()[0], '%Y-%m-%d').date()
+
+
+def _kosong(nilai):
+    return nilai is None or (isinstance(nilai, str) and not nilai.strip())
+
+
+def _cek_batas_kolom(data):
+    """
+    Menolak nilai yang akan ditolak database (teks terlalu panjang, angka di luar INTEGER).
+
+    Satu baris seperti itu di dalam INSERT batch akan menggagalkan seluruh impor, jadi
+    diperiksa per baris di sini agar masuk ke laporan kesalahan.
+    """
+    for nama, nilai in data.items():
+        if nilai is None:
+            continue
+        tipe = Karyawan.__table__.c[nama].type
+        panjang = getattr(tipe, 'length', None)
+        if panjang and isinstance(nilai, str) and len(nilai) > panjang:
+            raise ValueError(f'Kolom {nama} lebih dari {panjang} karakter.')
+        if isinstance(tipe, Integer) and not -BATAS_INTEGER <= nilai < BATAS_INTEGER:
+            raise ValueError(f'Nilai {nama} terlalu besar.')
+
+
+def _baris_ke_mapping(row):
+    """Mengubah satu baris Excel menjadi dict kolom tabel karyawan. Melempar ValueError jika tidak valid."""
+    (nama, jk, nup, tmpt_lhr, tgl_lhr_raw, nik, almt, nohp, jbtn, unit, eml,
+     tgl_mli_raw, tgl_akhr_raw, gaji_raw, tunj_raw, stat) = row
+
+    # --- Validasi Data Penting (semua kolom NOT NULL tanpa default) ---
+    if any(_kosong(v) for v in (nama, jk, nup, tmpt_lhr, tgl_lhr_raw, nik, tgl_mli_raw)):
+        raise ValueError('Data tidak lengkap (Nama, Jenis Kelamin, NUP, Tempat Lahir, Tgl Lahir, NIK, '
+                         'Tgl Mulai wajib diisi).')
+
+    # --- Konversi dan Validasi Tipe Data ---
+    try:
+        tgl_lhr = _parse_tanggal(tgl_lhr_raw)
+        tgl_mli = _parse_tanggal(tgl_mli_raw)
+        tgl_akhr = _parse_tanggal(tgl_akhr_raw)
+        gaji = int(gaji_raw) if gaji_raw is not None else None
+        tunj = int(tunj_raw) if tunj_raw is not None else None
+    except (ValueError, TypeError) as ve:
+        raise ValueError(f'Format data salah (tanggal/angka). Error: {ve}.')
+
+    if not tgl_lhr or not tgl_mli:
+        raise ValueError('Tgl Lahir atau Tgl Mulai tidak valid setelah konversi.')
+
+    data = {
+        'nama': nama,
+        'jenis_kelamin': jk,
+        'nup': str(nup),
+        'tempat_lahir': tmpt_lhr,
+        'tanggal_lahir': tgl_lhr,
+        'nik': str(nik),
+        'alamat': almt,
+        'no_hp': str(nohp) if nohp else None,
+        'jabatan': jbtn,
+        'unit_kerja': unit,
+        'email': eml or None,
+        'tanggal_mulai': tgl_mli,
+        'tanggal_akhir_kontrak': tgl_akhr,
+        'gaji_honorarium': gaji,
+        'tunjangan_tetap': tunj,
+        'status': stat or 'Aktif',  # Default 'Aktif' jika kosong
+        'tindak_lanjut_kontrak': 'Tidak perlu',
+    }
+    _cek_batas_kolom(data)
+    return data
+
+
+def _nilai_yang_sudah_ada(kolom, nilai):
+    """Mengambil nilai `kolom` yang sudah ada di database, dengan klausa IN per chunk."""
+    nilai = list(nilai)
+    ada = set()
+    for i in range(0, len(nilai), UKURAN_CHUNK_IN):
+        chunk = nilai[i:i + UKURAN_CHUNK_IN]
+        ada.update(db.session.execute(select(kolom).where(kolom.in_(chunk))).scalars())
+    return ada
+
+
+def _insert_statement():
+    """INSERT yang mengabaikan konflik unik di PostgreSQL/SQLite, INSERT biasa di dialek lain."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        stmt = pg_insert(Karyawan.__table__).on_conflict_do_nothing()
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        stmt = sqlite_insert(Karyawan.__table__).on_conflict_do_nothing()
+    else:
+        stmt = insert(Karyawan.__table__)
+    return stmt.returning(Karyawan.__table__.c.id)
+
+
+def impor_karyawan_excel(file, laporkan_progres=None):
+    """
+    Mengimpor karyawan dari file .xlsx (path atau file-like) secara set-based.
+
+    Baris dibaca secara streaming (read_only), duplikat dalam file dan terhadap
+    database diperiksa dengan beberapa query IN, lalu data disisipkan per batch
+    dalam satu transaksi. `laporkan_progres(baris_dibaca, total_baris)` dipanggil
+    berkala selama pembacaan file. Mengembalikan HasilImpor.
+    """
+    # openpyxl hanya dibutuhkan worker yang memproses impor, tidak oleh proses web
+    import openpyxl
+
+    hasil = HasilImpor()
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        total_baris = sheet.max_row - 1 if sheet.max_row else None
+        rows = sheet.iter_rows(values_only=True)
+
+        # Validasi Header
+        header = list(next(rows, None) or [])[:len(EXPECTED_HEADER)]
+        if header != EXPECTED_HEADER:
+            raise HeaderTidakValid(
+                f"Header file Excel tidak sesuai. Harap gunakan template yang disediakan. "
+                f"Header yang diharapkan: {', '.join(EXPECTED_HEADER)}")
+
+        kandidat = []  # (nomor baris, mapping)
+        nup_terlihat, nik_terlihat, email_terlihat = set(), set(), set()
+        for index, row in enumerate(rows, start=2):
+            if laporkan_progres and index % UKURAN_BATCH_INSERT == 0:
+                laporkan_progres(index - 1, total_baris)
+
+            # Lewati baris kosong (semua sel None); mode read_only bisa mengembalikan baris yang lebih pendek
+            row = (tuple(row) + (None,) * len(EXPECTED_HEADER))[:len(EXPECTED_HEADER)]
+            if all(cell is None for cell in row):
+                continue
+
+            try:
+                data = _baris_ke_mapping(row)
+            except ValueError as e:
+                hasil.catat(index, row[2], row[5], f'{e} Data dilewati.')
+                continue
+
+            # De-duplikasi di dalam file
+            if (data['nup'] in nup_terlihat or data['nik'] in nik_terlihat
+                    or (data['email'] and data['email'] in email_terlihat)):
+                hasil.catat(index, data['nup'], data['nik'],
+                            'NUP, NIK, atau email sudah muncul di baris sebelumnya pada file ini. Data dilewati.',
+                            duplikat=True)
+                continue
+            nup_terlihat.add(data['nup'])
+            nik_terlihat.add(data['nik'])
+            if data['email']:
+                email_terlihat.add(data['email'])
+            kandidat.append((index, data))
+    finally:
+        workbook.close()
+
+    # Cek Duplikasi NUP/NIK/email terhadap database
+    nup_ada = _nilai_yang_sudah_ada(Karyawan.nup, nup_terlihat)
+    nik_ada = _nilai_yang_sudah_ada(Karyawan.nik, nik_terlihat)
+    email_ada = _nilai_yang_sudah_ada(Karyawan.email, email_terlihat)
+
+    baru = []
+    for index, data in kandidat:
+        if data['nup'] in nup_ada or data['nik'] in nik_ada or (data['email'] and data['email'] in email_ada):
+            hasil.catat(index, data['nup'], data['nik'],
+                        f"Karyawan dengan NUP {data['nup']}, NIK {data['nik']}, atau email tersebut sudah ada. "
+                        f"Data dilewati.", duplikat=True)
+            continue
+        baru.append(data)
+
+    # Sisipkan per batch dalam satu transaksi
+    try:
+        stmt = _insert_statement()
+        for i in range(0, len(baru), UKURAN_BATCH_INSERT):
+            batch = baru[i:i + UKURAN_BATCH_INSERT]
+            # executemany dengan RETURNING: statement dikompilasi sekali, dan hanya baris
+            # yang benar-benar disisipkan yang dikembalikan
+            disisipkan = len(db.session.execute(stmt, batch).all())
+            hasil.berhasil += disisipkan
+            # Baris yang bentrok dengan data yang disisipkan proses lain di antara pengecekan dan INSERT
+            if disisipkan < len(batch):
+                bentrok = len(batch) - disisipkan
+                hasil.duplikat += bentrok
+                hasil.kesalahan.append((None, None, None,
+                                        f'{bentrok} baris pada batch {i // UKURAN_BATCH_INSERT + 1} dilewati '
+                                        f'karena bentrok dengan data yang sudah ada.'))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return hasil
+
+
+def simpan_laporan_kesalahan(hasil, folder):
+    """Menyimpan daftar kesalahan impor sebagai CSV di `folder`. Mengembalikan nama file, atau None."""
+    if not hasil.kesalahan:
+        return None
+    os.makedirs(folder, exist_ok=True)
+    nama_file = f"laporan_impor_{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}.csv"
+    with open(os.path.join(folder, nama_file), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['baris', 'nup', 'nik', 'pesan'])
+        # Urut nomor baris (duplikat terhadap database baru diketahui setelah seluruh file dibaca);
+        # catatan tanpa nomor baris (bentrok saat INSERT) di akhir
+        for baris, nup, nik, pesan in sorted(hasil.kesalahan, key=lambda k: (k[0] is None, k[0] or 0)):
+            writer.writerow([baris or '', nup or '', nik or '', pesan])
+    return nama_file
+
+
+def _hapus_unggahan(payload):
+    # Dihapus saat job berakhir, bukan di handler: job yang dipulihkan setelah worker mati
+    # dijalankan ulang dan masih membutuhkan file ini
+    if os.path.exists(payload['path']):
+        os.remove(payload['path'])
+
+
+@tugas('impor_excel', bersihkan=_hapus_unggahan)
+def job_impor_excel(payload, laporkan_progres):
+    hasil = impor_karyawan_excel(payload['path'], laporkan_progres)
+    if hasil.berhasil:
+        invalidate_cache_karyawan()
+    laporan = simpan_laporan_kesalahan(hasil, current_app.config['UPLOAD_FOLDER_LAPORAN'])
+    data = hasil.to_dict()
+    data.update({'pesan': hasil.ringkasan(), 'laporan': laporan})
+    return data
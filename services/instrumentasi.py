@@ -0,0 +1,154 @@
+import json
+import logging
+import sys
+import time
+
+from flask import before_render_template, g, has_request_context, request, template_rendered
+from flask.logging import default_handler
+from sqlalchemy import event
+
+from services.metrik import (DURASI_QUERY, DURASI_RENDER_TEMPLATE, DURASI_REQUEST, JUMLAH_QUERY,
+                             QUERY_PER_REQUEST)
+
+logger_request = logging.getLogger('hr.request')
+
+# Atribut LogRecord bawaan; selain ini dianggap field tambahan dari `extra=`
+_ATRIBUT_BAWAAN = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def _field_tambahan(record):
+    return {k: v for k, v in vars(record).items() if k not in _ATRIBUT_BAWAAN and not k.startswith('_')}
+
+
+class FormatterJSON(logging.Formatter):
+    """Satu objek JSON per baris log; field dari `extra=` ikut disertakan."""
+
+    def format(self, record):
+        data = {
+            'waktu': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'pesan': record.getMessage(),
+        }
+        data.update(_field_tambahan(record))
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class FormatterTeks(logging.Formatter):
+    """Format teks biasa, field dari `extra=` ditambahkan sebagai key=value."""
+
+    def format(self, record):
+        teks = super().format(record)
+        tambahan = _field_tambahan(record)
+        if tambahan:
+            teks += ' ' + ' '.join(f'{k}={v}' for k, v in tambahan.items())
+        return teks
+
+
+def konfigurasi_logging(app):
+    """Mengatur root logger sesuai LOG_FORMAT ('text' atau 'json') dan LOG_LEVEL."""
+    handler = logging.StreamHandler(sys.stderr)
+    if app.config['LOG_FORMAT'] == 'json':
+        handler.setFormatter(FormatterJSON())
+    else:
+        handler.setFormatter(FormatterTeks('[%(asctime)s] %(levelname)s %(name)s: %(message)s'))
+
+    root = logging.getLogger()
+    for lama in list(root.handlers):
+        root.removeHandler(lama)
+    root.addHandler(handler)
+    root.setLevel(app.config['LOG_LEVEL'])
+    # Log Flask (app.logger) diteruskan ke root logger, tanpa handler bawaannya
+    app.logger.removeHandler(default_handler)
+
+
+class TerlaluBanyakQuery(RuntimeError):
+    """Satu request menjalankan lebih banyak query SQL daripada SQL_QUERY_LIMIT (kemungkinan N+1)."""
+
+
+def _endpoint():
+    if has_request_context():
+        return request.endpoint or 'tidak_dikenal'
+    return 'di_luar_request'
+
+
+def _sebelum_query(conn, cursor, statement, parameters, context, executemany):
+    conn.info['mulai_query'] = time.perf_counter()
+
+
+def _setelah_query(conn, cursor, statement, parameters, context, executemany):
+    durasi = time.perf_counter() - conn.info.pop('mulai_query', time.perf_counter())
+    endpoint = _endpoint()
+    JUMLAH_QUERY.inc(endpoint=endpoint)
+    DURASI_QUERY.observe(durasi, endpoint=endpoint)
+    if has_request_context():
+        g.jumlah_query = g.get('jumlah_query', 0) + 1
+        g.waktu_sql = g.get('waktu_sql', 0.0) + durasi
+
+
+def _sebelum_render_template(sender, template, context, **extra):
+    if has_request_context():
+        g.setdefault('mulai_render', []).append(time.perf_counter())
+
+
+def _setelah_render_template(sender, template, context, **extra):
+    if has_request_context() and g.get('mulai_render'):
+        DURASI_RENDER_TEMPLATE.observe(time.perf_counter() - g.mulai_render.pop(),
+                                       template=template.name or 'tanpa_nama')
+
+
+def jumlah_query_request():
+    """Jumlah statement SQL yang sudah dijalankan oleh request saat ini."""
+    return g.get('jumlah_query', 0)
+
+
+def pasang_instrumentasi(app, db):
+    """
+    Mencatat durasi request, query SQL, dan render template ke metrik (lihat services.metrik).
+
+    Setiap request juga dicatat ke logger 'hr.request'. Jika SQL_QUERY_LIMIT > 0,
+    jumlah query dikirim di header X-Query-Count dan request yang melebihi batas
+    dicatat sebagai warning, atau menimbulkan TerlaluBanyakQuery jika
+    SQL_QUERY_LIMIT_RAISE aktif (agar tes gagal).
+    """
+    batas = app.config['SQL_QUERY_LIMIT']
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _sebelum_query)
+        event.listen(db.engine, 'after_cursor_execute', _setelah_query)
+    before_render_template.connect(_sebelum_render_template, app)
+    template_rendered.connect(_setelah_render_template, app)
+
+    @app.before_request
+    def mulai_request():
+        g.mulai_request = time.perf_counter()
+        # `g` bisa dipakai bersama beberapa request jika app context sudah aktif sebelumnya
+        # (misalnya di tes), jadi penghitung selalu dimulai dari nol
+        g.jumlah_query = 0
+        g.waktu_sql = 0.0
+
+    @app.after_request
+    def catat_request(response):
+        durasi = time.perf_counter() - g.get('mulai_request', time.perf_counter())
+        endpoint = _endpoint()
+        jumlah = jumlah_query_request()
+        DURASI_REQUEST.observe(durasi, endpoint=endpoint, method=request.method, status=response.status_code)
+        QUERY_PER_REQUEST.observe(jumlah, endpoint=endpoint)
+        logger_request.info('%s %s %s', request.method, request.path, response.status_code, extra={
+            'endpoint': endpoint,
+            'durasi_ms': round(durasi * 1000, 1),
+            'jumlah_query': jumlah,
+            'waktu_sql_ms': round(g.get('waktu_sql', 0.0) * 1000, 1),
+        })
+
+        if batas:
+            response.headers['X-Query-Count'] = str(jumlah)
+            if jumlah > batas:
+                pesan = (f'{request.method} {request.path} menjalankan {jumlah} query SQL '
+                         f'(batas {batas}); kemungkinan N+1.')
+                if app.config['SQL_QUERY_LIMIT_RAISE']:
+                    raise TerlaluBanyakQuery(pesan)
+                app.logger.warning(pesan)
+        return response
@@ -0,0 +1,323 @@
+import logging
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import secure_filename
+
+from models import db
+from models.dokumen import Dokumen
+from models.karyawan import Karyawan
+from models.nomor_kontrak import NomorKontrakCounter
+from models.template_kontrak import TemplateKontrak
+from services.antrian import tugas
+from services.cache_template import template_cache
+from services.format import format_rupiah, format_tanggal
+from services.metrik import DURASI_RENDER_DOCX, HASIL_CACHE_TEMPLATE
+
+logger = logging.getLogger(__name__)
+
+
+class KontrakError(Exception):
+    """Kontrak tidak dapat dibuat; pesan siap ditampilkan ke pengguna."""
+
+
+def format_nomor_kontrak(nomor_urut, year):
+    nomor_urut_str = f"{nomor_urut:03d}"  # 001, 002, ..., 065
+    # Sesuaikan 'KR/BKI' dengan kode perusahaan Anda jika perlu
+    return f"SPK.{nomor_urut_str}/KR/BKI-{year}"
+
+
+def _tambah_counter(conn, tahun, jumlah):
+    """Menaikkan counter tahun `tahun` sebesar `jumlah`; mengembalikan nilai baru atau None jika belum ada."""
+    tabel = NomorKontrakCounter.__table__
+    stmt = update(tabel).where(tabel.c.tahun == tahun).values(nilai=tabel.c.nilai + jumlah)
+    if conn.dialect.update_returning:
+        return conn.execute(stmt.returning(tabel.c.nilai)).scalar()
+    # SQLite lama tanpa RETURNING: UPDATE sudah memegang write lock, jadi SELECT berikutnya tetap atomik
+    if conn.execute(stmt).rowcount == 0:
+        return None
+    return conn.execute(select(tabel.c.nilai).where(tabel.c.tahun == tahun)).scalar()
+
+
+def alokasi_nomor_kontrak(jumlah=1):
+    """
+    Mengalokasikan `jumlah` nomor kontrak berurutan untuk tahun berjalan.
+
+    Blok nomor diambil dengan satu UPDATE ... RETURNING pada tabel
+    nomor_kontrak_counter di transaksi pendek tersendiri, sehingga tidak
+    menahan lock selama kontrak dirender. Nomor yang sudah dialokasikan tidak
+    dipakai ulang meskipun pembuatan kontrak kemudian gagal.
+    """
+    now = datetime.now()
+    year = now.strftime('%y')  # '25' untuk 2025
+
+    with db.engine.begin() as conn:
+        akhir = _tambah_counter(conn, now.year, jumlah)
+        if akhir is None:
+            # Kontrak pertama tahun ini: buat baris counter
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(NomorKontrakCounter.__table__).values(tahun=now.year, nilai=jumlah))
+                akhir = jumlah
+            except IntegrityError:
+                # Proses lain membuat baris yang sama lebih dulu
+                akhir = _tambah_counter(conn, now.year, jumlah)
+
+    awal = akhir - jumlah + 1
+    return [format_nomor_kontrak(nomor_urut, year) for nomor_urut in range(awal, akhir + 1)]
+
+
+def generate_nomor_kontrak():
+    """Menghasilkan nomor kontrak baru yang berurutan per tahun."""
+    try:
+        return alokasi_nomor_kontrak(1)[0]
+    except Exception:
+        logger.exception('Error saat generate nomor kontrak')
+        # Return nomor sementara jika gagal query
+        now = datetime.now()
+        return f"TEMP.{now.strftime('%Y%m%d%H%M%S')}-{now.strftime('%y')}"
+
+
+def buat_konteks_kontrak(karyawan, nomor_surat):
+    """Data yang diisikan ke tag Jinja2 di template .docx."""
+    return {
+        'nama': karyawan.nama or '',
+        'nup': karyawan.nup or '',
+        'nik': karyawan.nik or '',
+        'jenis_kelamin': karyawan.jenis_kelamin or '',
+        'tempat_lahir': karyawan.tempat_lahir or '',
+        'tanggal_lahir': format_tanggal(karyawan.tanggal_lahir),
+        'alamat': karyawan.alamat or '',
+        'jabatan': karyawan.jabatan or '',
+        'unit_kerja': karyawan.unit_kerja or '',
+        'no_hp': karyawan.no_hp or '-',
+        'gaji': format_rupiah(karyawan.gaji_honorarium),
+        'tunjangan': format_rupiah(karyawan.tunjangan_tetap),
+        'tanggal_mulai': format_tanggal(karyawan.tanggal_mulai),
+        'tanggal_akhir': format_tanggal(karyawan.tanggal_akhir_kontrak),
+        'nomor_surat': nomor_surat
+    }
+
+
+def path_output_kontrak(nama_karyawan, folder, terpakai=()):
+    """Nama file output yang bersih dan belum dipakai di `folder` (maupun di `terpakai`)."""
+    nama_file_aman = "".join(c if c.isalnum() else "_" for c in nama_karyawan)
+    timestamp = date.today().strftime("%Y%m%d")
+    output_filename = f"Kontrak_{nama_file_aman}_{timestamp}.docx"
+    output_path = os.path.join(folder, secure_filename(output_filename))
+
+    # Handle jika file dengan nama sama sudah ada (jarang terjadi tapi mungkin)
+    counter = 1
+    original_output_path = output_path
+    while os.path.exists(output_path) or output_path in terpakai:
+        base, ext = os.path.splitext(original_output_path)
+        output_path = f"{base}_{counter}{ext}"
+        counter += 1
+    return output_path
+
+
+def buat_kontrak(karyawan, template):
+    """Merender kontrak untuk satu karyawan dan menyimpan record Dokumen-nya."""
+    # Pastikan file template ada
+    if not template.file_path or not os.path.exists(template.file_path):
+        raise KontrakError(f'File template "{template.nama_template}" tidak ditemukan di server.')
+
+    try:
+        doc, jinja_env = template_cache.siapkan(template.id, template.file_path)
+    except Exception as e:
+        raise KontrakError(f'Gagal memuat file template. Error: {e}')
+
+    nomor_surat_baru = generate_nomor_kontrak()
+    context = buat_konteks_kontrak(karyawan, nomor_surat_baru)
+
+    output_path = None
+    try:
+        mulai = time.perf_counter()
+        doc.render(context, jinja_env=jinja_env)
+        output_path = path_output_kontrak(karyawan.nama, current_app.config['UPLOAD_FOLDER_KONTRAK'])
+        doc.save(output_path)
+        DURASI_RENDER_DOCX.observe(time.perf_counter() - mulai, template_id=template.id)
+
+        # Simpan record dokumen ke DB
+        new_kontrak = Dokumen(
+            karyawan_id=karyawan.id,
+            jenis='Kontrak',
+            file_path=output_path,
+            nomor_surat=nomor_surat_baru,
+            tanggal_upload=date.today()
+        )
+        db.session.add(new_kontrak)
+        db.session.commit()
+        return new_kontrak
+    except Exception as e:
+        db.session.rollback()
+        # Jika gagal simpan/render, hapus file yang mungkin terbuat
+        if output_path and os.path.exists(output_path):
+            os.remove(output_path)
+        raise KontrakError(f'Gagal membuat atau menyimpan kontrak. Periksa template dan data karyawan. '
+                           f'Error: {str(e)}')
+
+
+@tugas('generate_kontrak')
+def job_generate_kontrak(payload, laporkan_progres):
+    karyawan = db.session.get(Karyawan, payload['karyawan_id'])
+    template = db.session.get(TemplateKontrak, payload['template_id'])
+    if karyawan is None or template is None:
+        raise KontrakError('Karyawan atau template tidak ditemukan.')
+    laporkan_progres(0, 1)
+    kontrak = buat_kontrak(karyawan, template)
+    laporkan_progres(1, 1)
+    return {
+        'pesan': f'Kontrak untuk {karyawan.nama} berhasil dibuat.',
+        'karyawan_id': karyawan.id,
+        'dokumen_id': kontrak.id,
+        'nomor_surat': kontrak.nomor_surat,
+    }
+
+
+# --- Generate kontrak massal ---
+# (id, path) template yang dirender oleh proses worker pool ini
+_template_worker = None
+
+
+def _init_worker_render(template_id, template_path):
+    """Initializer ProcessPoolExecutor: template yang dirender proses ini (dimuat saat render pertama)."""
+    global _template_worker
+    _template_worker = (template_id, template_path)
+
+
+def _render_worker(tugas_render):
+    """
+    Merender satu kontrak memakai template milik proses ini.
+
+    Mengembalikan (pesan error atau None, durasi render dalam detik, hit cache template).
+    Durasi dan hit/miss dicatat ke metrik oleh proses induk, karena metrik di proses pool
+    tidak ikut diekspor.
+    """
+    context, output_path = tugas_render
+    mulai = time.perf_counter()
+    hits_awal = template_cache.hits
+    try:
+        doc, jinja_env = template_cache.siapkan(*_template_worker)
+        hit = template_cache.hits > hits_awal
+        doc.render(context, jinja_env=jinja_env)
+        doc.save(output_path)
+        return None, time.perf_counter() - mulai, hit
+    except Exception as e:
+        return str(e), None, None
+
+
+def pilih_karyawan_batch(unit_kerja=None, akan_habis=False):
+    """Karyawan aktif yang akan dibuatkan kontrak, opsional per unit kerja / kontrak akan habis."""
+    query = Karyawan.query.filter(Karyawan.status == 'Aktif')
+    if unit_kerja:
+        query = query.filter(Karyawan.unit_kerja == unit_kerja)
+    if akan_habis:
+        # Sama dengan daftar "kontrak akan habis" di dashboard
+        today = date.today()
+        query = query.filter(
+            Karyawan.tanggal_akhir_kontrak.isnot(None),
+            Karyawan.tanggal_akhir_kontrak <= today + timedelta(days=90),
+            Karyawan.tanggal_akhir_kontrak >= today
+        )
+    return query.order_by(Karyawan.nama, Karyawan.id).all()
+
+
+def buat_kontrak_batch(karyawan_list, template, buat_zip=False, processes=None, laporkan_progres=None):
+    """
+    Membuat kontrak untuk banyak karyawan sekaligus.
+
+    Nomor surat dialokasikan dalam satu langkah, rendering dijalankan paralel di
+    ProcessPoolExecutor (template dimuat dan dikompilasi sekali per proses, saat render pertamanya), lalu semua record
+    Dokumen disimpan dalam satu transaksi. Mengembalikan dict ringkasan.
+    """
+    if not template.file_path or not os.path.exists(template.file_path):
+        raise KontrakError(f'File template "{template.nama_template}" tidak ditemukan di server.')
+    if not karyawan_list:
+        return {'berhasil': 0, 'gagal': 0, 'kesalahan': [], 'zip': None,
+                'pesan': 'Tidak ada karyawan yang cocok dengan kriteria.'}
+
+    folder = current_app.config['UPLOAD_FOLDER_KONTRAK']
+    nomor_list = alokasi_nomor_kontrak(len(karyawan_list))
+
+    tugas_render = []
+    terpakai = set()
+    for karyawan, nomor_surat in zip(karyawan_list, nomor_list):
+        output_path = path_output_kontrak(karyawan.nama, folder, terpakai)
+        terpakai.add(output_path)
+        tugas_render.append((buat_konteks_kontrak(karyawan, nomor_surat), output_path))
+
+    processes = processes or current_app.config['KONTRAK_BATCH_PROCESSES']
+    processes = max(1, min(processes, len(tugas_render)))
+    if processes == 1:
+        _init_worker_render(template.id, template.file_path)
+        hasil_render = map(_render_worker, tugas_render)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker_render,
+                                       initargs=(template.id, template.file_path))
+        hasil_render = executor.map(_render_worker, tugas_render,
+                                    chunksize=max(1, len(tugas_render) // (processes * 4)))
+
+    dokumen_baru, kesalahan, file_dibuat = [], [], []
+    try:
+        for i, (karyawan, nomor_surat, (_, output_path), (error, durasi, hit)) in enumerate(
+                zip(karyawan_list, nomor_list, tugas_render, hasil_render), start=1):
+            if executor is not None and hit is not None:
+                # Tanpa executor, render berjalan di proses ini dan sudah tercatat oleh template_cache
+                HASIL_CACHE_TEMPLATE.inc(hasil='hit' if hit else 'miss')
+            if error:
+                kesalahan.append(f'{karyawan.nama}: {error}')
+            else:
+                DURASI_RENDER_DOCX.observe(durasi, template_id=template.id)
+                file_dibuat.append(output_path)
+                dokumen_baru.append(Dokumen(karyawan_id=karyawan.id, jenis='Kontrak', file_path=output_path,
+                                            nomor_surat=nomor_surat, tanggal_upload=date.today()))
+            if laporkan_progres and (i % 10 == 0 or i == len(tugas_render)):
+                laporkan_progres(i, len(tugas_render))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    try:
+        # Simpan semua record dokumen dalam satu transaksi
+        db.session.add_all(dokumen_baru)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        for path in file_dibuat:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    nama_zip = None
+    if buat_zip and file_dibuat:
+        nama_zip = f"Kontrak_batch_{datetime.now().strftime('%Y%m%d%H%M%S')}.zip"
+        with zipfile.ZipFile(os.path.join(folder, nama_zip), 'w', zipfile.ZIP_DEFLATED) as zf:
+            for path in file_dibuat:
+                zf.write(path, arcname=os.path.basename(path))
+
+    return {
+        'berhasil': len(dokumen_baru),
+        'gagal': len(kesalahan),
+        'kesalahan': kesalahan[:100],
+        'zip': nama_zip,
+        'pesan': f'{len(dokumen_baru)} kontrak berhasil dibuat. {len(kesalahan)} gagal.',
+    }
+
+
+@tugas('generate_kontrak_batch')
+def job_generate_kontrak_batch(payload, laporkan_progres):
+    template = db.session.get(TemplateKontrak, payload['template_id'])
+    if template is None:
+        raise KontrakError('Template tidak ditemukan.')
+    karyawan_list = pilih_karyawan_batch(payload.get('unit_kerja'), payload.get('akan_habis', False))
+    laporkan_progres(0, len(karyawan_list))
+    return buat_kontrak_batch(karyawan_list, template, buat_zip=payload.get('zip', False),
+                              laporkan_progres=laporkan_progres)
@@ -0,0 +1,230 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+
+# Batas bucket default histogram durasi (detik)
+BUCKET_DURASI = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Semua metrik yang dibuat, sesuai urutan pendaftaran
+_registry = []
+
+
+def _escape_label(nilai):
+    return str(nilai).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_label(nama_label, nilai_label, tambahan=()):
+    pasangan = list(zip(nama_label, nilai_label)) + list(tambahan)
+    if not pasangan:
+        return ''
+    return '{' + ','.join(f'{nama}="{_escape_label(nilai)}"' for nama, nilai in pasangan) + '}'
+
+
+def _format_angka(nilai):
+    if nilai == math.inf:
+        return '+Inf'
+    return repr(float(nilai)) if isinstance(nilai, float) else str(nilai)
+
+
+class _Metrik:
+    jenis = None
+
+    def __init__(self, nama, bantuan, label=()):
+        self.nama = nama
+        self.bantuan = bantuan
+        self.label = tuple(label)
+        self._nilai = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _kunci(self, label):
+        return tuple(str(label[nama]) for nama in self.label)
+
+    def _gabung(self, a, b):
+        raise NotImplementedError
+
+    def _baris(self, nilai):
+        raise NotImplementedError
+
+    def snapshot(self):
+        """Salinan nilai saat ini yang bisa ditulis sebagai JSON: [[label..., nilai], ...]."""
+        with self._lock:
+            return json.loads(json.dumps([[list(kunci), nilai] for kunci, nilai in self._nilai.items()]))
+
+    def nilai(self, snapshot_lain=()):
+        """{label: nilai} proses ini, ditambah nilai dari `snapshot_lain` (snapshot proses lain)."""
+        nilai = {tuple(kunci): isi for kunci, isi in self.snapshot()}
+        for snapshot in snapshot_lain:
+            for kunci, isi in snapshot:
+                kunci = tuple(kunci)
+                if len(kunci) != len(self.label):
+                    continue
+                nilai[kunci] = isi if kunci not in nilai else self._gabung(nilai[kunci], isi)
+        return nilai
+
+    def render(self, snapshot_lain=()):
+        """Baris teks Prometheus; nilai dari `snapshot_lain` (proses lain) dijumlahkan."""
+        baris = [f'# HELP {self.nama} {self.bantuan}', f'# TYPE {self.nama} {self.jenis}']
+        baris.extend(self._baris(self.nilai(snapshot_lain)))
+        return baris
+
+
+class Counter(_Metrik):
+    """Nilai yang hanya bertambah (misalnya jumlah query)."""
+    jenis = 'counter'
+
+    def inc(self, jumlah=1, **label):
+        kunci = self._kunci(label)
+        with self._lock:
+            self._nilai[kunci] = self._nilai.get(kunci, 0) + jumlah
+
+    def _gabung(self, a, b):
+        return a + b
+
+    def _baris(self, nilai):
+        for kunci, nilai in sorted(nilai.items()):
+            yield f'{self.nama}{_format_label(self.label, kunci)} {_format_angka(nilai)}'
+
+
+class Histogram(_Metrik):
+    """Distribusi nilai (misalnya durasi) dalam bucket kumulatif, beserta jumlah dan total."""
+    jenis = 'histogram'
+
+    def __init__(self, nama, bantuan, label=(), bucket=BUCKET_DURASI):
+        super().__init__(nama, bantuan, label)
+        self.bucket = tuple(sorted(bucket)) + (math.inf,)
+
+    def observe(self, nilai, **label):
+        kunci = self._kunci(label)
+        with self._lock:
+            data = self._nilai.get(kunci)
+            if data is None:
+                data = self._nilai[kunci] = [[0] * len(self.bucket), 0.0, 0]
+            for i, batas in enumerate(self.bucket):
+                if nilai <= batas:
+                    data[0][i] += 1
+            data[1] += nilai
+            data[2] += 1
+
+    def _gabung(self, a, b):
+        if len(a[0]) != len(b[0]):
+            # Bucket berbeda (snapshot dari versi kode lain): tidak bisa dijumlahkan
+            return a
+        return [[x + y for x, y in zip(a[0], b[0])], a[1] + b[1], a[2] + b[2]]
+
+    def _baris(self, nilai):
+        for kunci, (jumlah_bucket, total, jumlah) in sorted(nilai.items()):
+            for batas, n in zip(self.bucket, jumlah_bucket):
+                label = _format_label(self.label, kunci, [('le', _format_angka(float(batas)))])
+                yield f'{self.nama}_bucket{label} {n}'
+            label = _format_label(self.label, kunci)
+            yield f'{self.nama}_sum{label} {_format_angka(total)}'
+            yield f'{self.nama}_count{label} {jumlah}'
+
+
+def _nama_file_snapshot(nama_proses):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', nama_proses) + '.json'
+
+
+def simpan_snapshot(folder, nama_proses):
+    """
+    Menulis nilai semua metrik proses ini ke `folder`/<nama_proses>.json.
+
+    Dipakai proses yang tidak melayani /metrics (worker antrian), agar metriknya
+    (misalnya durasi render .docx) ikut tampil di /metrics proses web. File ditulis
+    ke file sementara lalu di-rename, sehingga pembaca tidak melihat file setengah jadi.
+    """
+    os.makedirs(folder, exist_ok=True)
+    data = {'proses': nama_proses, 'waktu': time.time(),
+            'metrik': {metrik.nama: metrik.snapshot() for metrik in _registry}}
+    tujuan = os.path.join(folder, _nama_file_snapshot(nama_proses))
+    sementara = f'{tujuan}.{os.getpid()}.tmp'
+    with open(sementara, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(sementara, tujuan)
+
+
+def _file_snapshot(folder):
+    if not folder or not os.path.isdir(folder):
+        return []
+    return [os.path.join(folder, nama) for nama in sorted(os.listdir(folder)) if nama.endswith('.json')]
+
+
+def baca_snapshot(folder, maks_umur=None):
+    """
+    Semua snapshot di `folder` (lihat simpan_snapshot); file rusak atau hilang dilewati.
+
+    Snapshot yang lebih tua dari `maks_umur` detik (proses yang sudah berhenti) diabaikan.
+    """
+    hasil = []
+    for path in _file_snapshot(folder):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if maks_umur is None or time.time() - data.get('waktu', 0) <= maks_umur:
+            hasil.append(data)
+    return hasil
+
+
+def hapus_snapshot_lama(folder, maks_umur):
+    """Menghapus snapshot yang tidak diperbarui lebih dari `maks_umur` detik."""
+    for path in _file_snapshot(folder):
+        try:
+            if time.time() - os.path.getmtime(path) > maks_umur:
+                os.remove(path)
+        except OSError:
+            continue
+
+
+def render_prometheus(folder_snapshot=None, maks_umur=None):
+    """
+    Semua metrik dalam format teks Prometheus (text/plain; version=0.0.4).
+
+    Jika `folder_snapshot` diberikan, nilai dari snapshot proses lain di folder itu
+    (yang tidak lebih tua dari `maks_umur` detik) dijumlahkan ke nilai proses ini.
+    """
+    snapshot = [data.get('metrik', {}) for data in baca_snapshot(folder_snapshot, maks_umur)]
+    baris = []
+    for metrik in _registry:
+        baris.extend(metrik.render([s[metrik.nama] for s in snapshot if metrik.nama in s]))
+    return '\n'.join(baris) + '\n'
+
+
+def nilai_gabungan(metrik, folder_snapshot=None, maks_umur=None):
+    """{label: nilai} satu metrik dari proses ini ditambah snapshot di `folder_snapshot`."""
+    snapshot = [data.get('metrik', {}) for data in baca_snapshot(folder_snapshot, maks_umur)]
+    return metrik.nilai([s[metrik.nama] for s in snapshot if metrik.nama in s])
+
+
+# --- Metrik aplikasi ---
+# Label endpoint memakai nama endpoint Flask (bukan path), sehingga jumlah seri tetap terbatas
+
+DURASI_REQUEST = Histogram(
+    'hr_http_request_duration_seconds', 'Durasi request HTTP per endpoint.',
+    label=('endpoint', 'method', 'status'))
+QUERY_PER_REQUEST = Histogram(
+    'hr_http_request_sql_queries', 'Jumlah statement SQL per request.',
+    label=('endpoint',), bucket=(1, 2, 5, 10, 20, 50, 100))
+JUMLAH_QUERY = Counter(
+    'hr_sql_queries_total', 'Jumlah statement SQL yang dijalankan.',
+    label=('endpoint',))
+DURASI_QUERY = Histogram(
+    'hr_sql_query_duration_seconds', 'Durasi eksekusi statement SQL.',
+    label=('endpoint',))
+DURASI_RENDER_TEMPLATE = Histogram(
+    'hr_template_render_duration_seconds', 'Durasi render template HTML Jinja2.',
+    label=('template',))
+HASIL_CACHE_HALAMAN = Counter(
+    'hr_page_cache_total', 'Hasil cache halaman: 304 (ETag cocok), hit/miss cache HTML, atau lewati.',
+    label=('endpoint', 'hasil'))
+DURASI_RENDER_DOCX = Histogram(
+    'hr_docx_render_duration_seconds', 'Durasi render dan simpan kontrak .docx (DocxTemplate).',
+    label=('template_id',))
+HASIL_CACHE_TEMPLATE = Counter(
+    'hr_docx_template_cache_total', 'Hasil cache template .docx per render kontrak: hit atau miss.',
+    label=('hasil',))
@@ -0,0 +1,122 @@
+import base64
+import binascii
+import json
+
+from sqlalchemy import tuple_
+
+
+class Halaman:
+    """Satu halaman hasil paginasi keyset beserta cursor navigasinya."""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(nilai):
+    """Mengubah tuple nilai kunci urut menjadi string aman untuk URL."""
+    data = json.dumps(list(nilai), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+class CursorTidakValid(ValueError):
+    """Cursor ?after=/?before= rusak atau nilainya tidak cocok dengan tipe kolom kunci."""
+
+
+# Rentang BIGINT; nilai di luar rentang ini ditolak driver database (OverflowError)
+_INT_MIN, _INT_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _nilai_cocok(nilai, kolom):
+    try:
+        tipe = kolom.type.python_type
+    except NotImplementedError:
+        return False
+    if tipe is int:
+        return isinstance(nilai, int) and not isinstance(nilai, bool) and _INT_MIN <= nilai <= _INT_MAX
+    if tipe is str:
+        panjang = getattr(kolom.type, 'length', None)
+        return isinstance(nilai, str) and (panjang is None or len(nilai) <= panjang)
+    # encode_cursor hanya menghasilkan teks dan bilangan bulat
+    return False
+
+
+def decode_cursor(cursor, kolom_kunci):
+    """
+    Kebalikan dari encode_cursor. Mengembalikan None jika cursor kosong.
+
+    Nilai dari URL langsung menjadi parameter perbandingan tuple, jadi setiap nilai harus
+    bertipe sama dengan kolom kuncinya (teks atau bilangan bulat 64-bit); selain itu
+    CursorTidakValid dilempar.
+    """
+    if not cursor:
+        return None
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        nilai = json.loads(base64.urlsafe_b64decode(cursor + padding).decode('utf-8'))
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise CursorTidakValid('Cursor tidak valid.')
+    if not isinstance(nilai, list) or len(nilai) != len(kolom_kunci) or \
+            not all(_nilai_cocok(v, kolom) for v, kolom in zip(nilai, kolom_kunci)):
+        raise CursorTidakValid('Cursor tidak valid.')
+    return tuple(nilai)
+
+
+def _decode_atau_abaikan(cursor, kolom_kunci, ketat):
+    try:
+        return decode_cursor(cursor, kolom_kunci)
+    except CursorTidakValid:
+        if ketat:
+            raise
+        return None
+
+
+def paginate_keyset(query, kolom_kunci, per_page, after=None, before=None, ketat=False):
+    """
+    Paginasi keyset (seek) berdasarkan kolom_kunci, misalnya (Karyawan.nama, Karyawan.id).
+
+    Kolom terakhir harus unik agar urutan stabil. `after`/`before` adalah cursor
+    dari halaman sebelumnya; jika keduanya kosong, halaman pertama dikembalikan.
+    Query tidak boleh sudah memiliki order_by. Cursor yang tidak valid dianggap kosong
+    (halaman pertama), atau melempar CursorTidakValid jika `ketat`.
+    """
+    kunci_after = _decode_atau_abaikan(after, kolom_kunci, ketat)
+    kunci_before = _decode_atau_abaikan(before, kolom_kunci, ketat) if kunci_after is None else None
+
+    def ambil_kunci(item):
+        return tuple(getattr(item, kolom.key) for kolom in kolom_kunci)
+
+    if kunci_before is not None:
+        # Mundur: ambil baris sebelum cursor dengan urutan terbalik, lalu balikkan lagi
+        rows = (query.filter(tuple_(*kolom_kunci) < tuple_(*kunci_before))
+                .order_by(*[kolom.desc() for kolom in kolom_kunci])
+                .limit(per_page + 1).all())
+        ada_sebelumnya = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        next_cursor = encode_cursor(ambil_kunci(items[-1])) if items else None
+        prev_cursor = encode_cursor(ambil_kunci(items[0])) if items and ada_sebelumnya else None
+        return Halaman(items, next_cursor=next_cursor, prev_cursor=prev_cursor)
+
+    if kunci_after is not None:
+        query = query.filter(tuple_(*kolom_kunci) > tuple_(*kunci_after))
+    rows = query.order_by(*kolom_kunci).limit(per_page + 1).all()
+    ada_berikutnya = len(rows) > per_page
+    items = rows[:per_page]
+    next_cursor = encode_cursor(ambil_kunci(items[-1])) if items and ada_berikutnya else None
+    prev_cursor = encode_cursor(ambil_kunci(items[0])) if items and kunci_after is not None else None
+    return Halaman(items, next_cursor=next_cursor, prev_cursor=prev_cursor)
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class PembatasPercobaan:
+    """
+    Pembatas percobaan login gagal per kunci (misalnya username + alamat IP) dalam jendela waktu bergeser.
+
+    Disimpan di memori proses: dengan beberapa worker Gunicorn, batas efektifnya dikalikan
+    jumlah worker. Jumlah kunci dibatasi `maks_kunci` (yang paling lama tidak aktif dibuang),
+    sehingga tebakan dengan banyak username acak tidak menghabiskan memori.
+    """
+
+    def __init__(self, batas=10, jendela=300, maks_kunci=10000):
+        self.batas = batas
+        self.jendela = jendela
+        self.maks_kunci = maks_kunci
+        self._gagal = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bersihkan(self, percobaan, sekarang):
+        while percobaan and percobaan[0] <= sekarang - self.jendela:
+            percobaan.popleft()
+
+    def sisa_tunggu(self, kunci):
+        """Detik sampai `kunci` boleh mencoba lagi, atau 0 jika belum mencapai batas."""
+        if self.batas <= 0:
+            return 0
+        sekarang = time.monotonic()
+        with self._lock:
+            percobaan = self._gagal.get(kunci)
+            if not percobaan:
+                return 0
+            self._bersihkan(percobaan, sekarang)
+            if len(percobaan) < self.batas:
+                return 0
+            return max(1, int(percobaan[0] + self.jendela - sekarang + 1))
+
+    def catat_gagal(self, kunci):
+        if self.batas <= 0:
+            return
+        sekarang = time.monotonic()
+        with self._lock:
+            percobaan = self._gagal.get(kunci)
+            if percobaan is None:
+                percobaan = self._gagal[kunci] = deque(maxlen=self.batas)
+            self._gagal.move_to_end(kunci)
+            self._bersihkan(percobaan, sekarang)
+            percobaan.append(sekarang)
+            while len(self._gagal) > self.maks_kunci:
+                self._gagal.popitem(last=False)
+
+    def reset(self, kunci=None):
+        """Menghapus riwayat gagal satu kunci (setelah login berhasil), atau semua kunci."""
+        with self._lock:
+            if kunci is None:
+                self._gagal.clear()
+            else:
+                self._gagal.pop(kunci, None)
+
+
+# Satu pembatas per proses; batas dan jendelanya diatur dari LOGIN_RATE_LIMIT saat aplikasi dibuat.
+# pembatas_login dikunci (username, IP), sehingga pihak lain tidak bisa mengunci akun seseorang dari
+# IP-nya sendiri; pembatas_login_ip dikunci IP saja (LOGIN_RATE_LIMIT_IP) untuk tebakan ke banyak akun
+pembatas_login = PembatasPercobaan()
+pembatas_login_ip = PembatasPercobaan(batas=50)
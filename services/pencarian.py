@@ -0,0 +1,138 @@
+import re
+
+from sqlalchemy import case, column, func, literal_column, or_, select, table, text
+
+from models import db
+from models.karyawan import Karyawan
+
+# Tabel FTS5 (khusus SQLite) yang dibuat oleh migrasi, disinkronkan dengan trigger
+karyawan_fts = table('karyawan_fts', column('rowid'), column('rank'))
+
+BACKEND_FTS5 = 'fts5'
+BACKEND_TRIGRAM = 'trigram'
+BACKEND_LIKE = 'like'
+
+# Backend per URL database; dicek sekali per proses
+_backend_cache = {}
+
+
+def backend_pencarian():
+    """
+    Backend pencarian yang tersedia di database aktif.
+
+    - PostgreSQL dengan ekstensi pg_trgm: ILIKE dipercepat index GIN trigram, hasil diurutkan dengan similarity.
+    - SQLite dengan tabel karyawan_fts: MATCH FTS5 dengan pencocokan awalan, diurutkan dengan bm25.
+    - Selain itu: ILIKE biasa.
+    """
+    engine = db.engine
+    kunci = str(engine.url)
+    if kunci not in _backend_cache:
+        backend = BACKEND_LIKE
+        with engine.connect() as conn:
+            if engine.dialect.name == 'postgresql':
+                if conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).scalar():
+                    backend = BACKEND_TRIGRAM
+            elif engine.dialect.name == 'sqlite':
+                if conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'karyawan_fts'")).scalar():
+                    backend = BACKEND_FTS5
+        _backend_cache[kunci] = backend
+    return _backend_cache[kunci]
+
+
+def _query_fts(term):
+    """Mengubah input pengguna menjadi query FTS5: setiap kata dicocokkan sebagai awalan, digabung AND."""
+    kata = re.findall(r'\w+', term)
+    return ' '.join(f'"{k}"*' for k in kata)
+
+
+def _kondisi_ilike(term):
+    pola = f'%{term}%'
+    return or_(Karyawan.nama.ilike(pola), Karyawan.nup.ilike(pola), Karyawan.jabatan.ilike(pola))
+
+
+def filter_pencarian(query, term):
+    """Menerapkan pencarian teks pada nama, NUP, dan jabatan ke query Karyawan."""
+    term = (term or '').strip()
+    if not term:
+        return query
+    if backend_pencarian() == BACKEND_FTS5:
+        query_fts = _query_fts(term)
+        if query_fts:
+            cocok = select(karyawan_fts.c.rowid).where(literal_column('karyawan_fts').op('MATCH')(query_fts))
+            return query.filter(Karyawan.id.in_(cocok))
+    return query.filter(_kondisi_ilike(term))
+
+
+def filter_karyawan(query, args):
+    """
+    Menerapkan filter daftar karyawan dari parameter URL dashboard.
+
+    Parameter: search, unit_kerja, gaji_min, gaji_max. Dipakai oleh dashboard
+    dan ekspor agar hasilnya sama. Mengembalikan (query, daftar pesan peringatan).
+    """
+    peringatan = []
+
+    # Terapkan filter pencarian teks (FTS5 / trigram jika tersedia)
+    query = filter_pencarian(query, args.get('search', ''))
+
+    # Terapkan filter unit kerja
+    unit_kerja = args.get('unit_kerja', '').strip()
+    if unit_kerja:
+        query = query.filter(Karyawan.unit_kerja == unit_kerja)
+
+    # Konversi gaji ke integer (abaikan jika kosong atau tidak valid)
+    gaji_min_str = args.get('gaji_min', '').strip()
+    gaji_max_str = args.get('gaji_max', '').strip()
+    try:
+        gaji_min = int(gaji_min_str) if gaji_min_str else None
+    except ValueError:
+        gaji_min = None
+        peringatan.append('Gaji minimum tidak valid.')
+    try:
+        gaji_max = int(gaji_max_str) if gaji_max_str else None
+    except ValueError:
+        gaji_max = None
+        peringatan.append('Gaji maksimum tidak valid.')
+
+    # Terapkan filter gaji minimum
+    if gaji_min is not None:
+        query = query.filter(Karyawan.gaji_honorarium >= gaji_min)
+
+    # Terapkan filter gaji maksimum
+    if gaji_max is not None:
+        query = query.filter(Karyawan.gaji_honorarium <= gaji_max)
+
+    return query, peringatan
+
+
+def cari_karyawan(term, limit=10, status=None):
+    """
+    Karyawan yang cocok dengan `term`, diurutkan dari yang paling relevan (untuk autocomplete).
+
+    Kecocokan awalan pada nama/NUP didahulukan, lalu skor bm25 (FTS5) atau
+    similarity trigram (PostgreSQL), lalu nama.
+    """
+    term = (term or '').strip()
+    if not term:
+        return []
+
+    query = select(Karyawan.id, Karyawan.nama, Karyawan.nup, Karyawan.jabatan, Karyawan.unit_kerja)
+    if status:
+        query = query.where(Karyawan.status == status)
+
+    awalan = case((or_(Karyawan.nama.ilike(f'{term}%'), Karyawan.nup.ilike(f'{term}%')), 0), else_=1)
+    backend = backend_pencarian()
+    query_fts = _query_fts(term) if backend == BACKEND_FTS5 else None
+    if query_fts:
+        query = (query.join(karyawan_fts, karyawan_fts.c.rowid == Karyawan.id)
+                 .where(literal_column('karyawan_fts').op('MATCH')(query_fts))
+                 .order_by(awalan, karyawan_fts.c.rank, Karyawan.nama))
+    elif backend == BACKEND_TRIGRAM:
+        skor = func.greatest(func.word_similarity(term, Karyawan.nama),
+                             func.similarity(term, Karyawan.nup),
+                             func.word_similarity(term, Karyawan.jabatan))
+        query = query.where(_kondisi_ilike(term)).order_by(awalan, skor.desc(), Karyawan.nama)
+    else:
+        query = query.where(_kondisi_ilike(term)).order_by(awalan, Karyawan.nama)
+
+    return [dict(baris._mapping) for baris in db.session.execute(query.limit(limit))]
@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+
+from flask import Request, current_app
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db
+from models.blob_dokumen import BlobDokumen
+
+logger = logging.getLogger(__name__)
+
+UKURAN_POTONGAN = 1024 * 1024
+
+
+def folder_blob():
+    return current_app.config['UPLOAD_FOLDER_BLOB']
+
+
+def path_blob(sha256):
+    """Lokasi file blob: <UPLOAD_FOLDER_BLOB>/ab/cd/<sha256>."""
+    return os.path.join(folder_blob(), sha256[:2], sha256[2:4], sha256)
+
+
+class FileTerhash:
+    """
+    File sementara yang menghitung SHA-256 dan ukuran isinya selama ditulis.
+
+    Dipakai Werkzeug sebagai tujuan setiap file dalam body multipart (lihat RequestUnggahan),
+    sehingga unggahan ditulis ke disk per potongan dan di-hash dalam satu kali baca.
+    """
+
+    def __init__(self, folder):
+        os.makedirs(folder, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=folder, prefix='unggah-')
+        self._hash = hashlib.sha256()
+        self.ukuran = 0
+
+    @property
+    def name(self):
+        return self._file.name
+
+    def write(self, data):
+        self._hash.update(data)
+        self.ukuran += len(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def __getattr__(self, nama):
+        # read, seek, tell, flush, close, ... diteruskan ke file sementara
+        return getattr(self._file, nama)
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+class RequestUnggahan(Request):
+    """Request Flask yang menulis file unggahan ke FileTerhash di folder blob, bukan SpooledTemporaryFile."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return FileTerhash(os.path.join(folder_blob(), 'tmp'))
+
+
+def _hash_stream(stream):
+    """Menyalin `stream` ke FileTerhash (untuk unggahan yang tidak lewat RequestUnggahan)."""
+    tujuan = FileTerhash(os.path.join(folder_blob(), 'tmp'))
+    shutil.copyfileobj(stream, tujuan, UKURAN_POTONGAN)
+    return tujuan
+
+
+def _tempatkan(sumber, sha256):
+    """Membuat file blob dari file sementara `sumber` jika belum ada (hard link, atau salin)."""
+    tujuan = path_blob(sha256)
+    if os.path.exists(tujuan):
+        return
+    os.makedirs(os.path.dirname(tujuan), exist_ok=True)
+    sumber.flush()
+    sementara = f'{tujuan}.{os.urandom(4).hex()}.tmp'
+    try:
+        os.link(sumber.name, sementara)
+    except OSError:
+        shutil.copyfile(sumber.name, sementara)
+    # Isi file ditentukan oleh hash-nya, jadi penimpaan oleh proses lain tetap aman
+    os.replace(sementara, tujuan)
+
+
+def _tambah_referensi(sha256, ukuran):
+    tabel = BlobDokumen.__table__
+    naikkan = update(tabel).where(tabel.c.sha256 == sha256).values(jumlah_referensi=tabel.c.jumlah_referensi + 1)
+    if db.session.execute(naikkan).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(tabel).values(sha256=sha256, ukuran=ukuran, jumlah_referensi=1))
+    except IntegrityError:
+        # Proses lain menyimpan blob yang sama lebih dulu
+        db.session.execute(naikkan)
+
+
+def simpan_blob(file):
+    """
+    Menyimpan isi FileStorage `file` ke penyimpanan blob dan menambah jumlah referensinya.
+
+    File yang isinya sudah pernah diunggah tidak disimpan ulang. Referensi ditambahkan di
+    transaksi sesi saat ini (commit oleh pemanggil); panggil pastikan_blob() setelah commit
+    dan buang_blob_yatim() jika transaksi dibatalkan. Mengembalikan hash SHA-256.
+    """
+    stream = file.stream if isinstance(file.stream, FileTerhash) else _hash_stream(file.stream)
+    return _simpan(stream)
+
+
+def simpan_blob_dari_path(path):
+    """Seperti simpan_blob(), untuk file yang sudah ada di disk (migrasi dokumen lama)."""
+    with open(path, 'rb') as f:
+        stream = _hash_stream(f)
+    try:
+        return _simpan(stream)
+    finally:
+        stream.close()
+
+
+def _simpan(stream):
+    sha256 = stream.hexdigest()
+    _tempatkan(stream, sha256)
+    _tambah_referensi(sha256, stream.ukuran)
+    return sha256
+
+
+def pastikan_blob(file, sha256):
+    """
+    Dipanggil setelah commit: membuat ulang file blob jika dihapus oleh proses lain yang
+    melepas referensi terakhirnya tepat sebelum unggahan ini tercatat.
+    """
+    if isinstance(file.stream, FileTerhash) and not os.path.exists(path_blob(sha256)):
+        _tempatkan(file.stream, sha256)
+
+
+def buang_blob_yatim(sha256):
+    """Dipanggil setelah rollback: menghapus file blob yang tidak punya baris referensi."""
+    if db.session.get(BlobDokumen, sha256) is None:
+        hapus_file([path_blob(sha256)])
+
+
+def hapus_beserta_dokumen(objek, daftar_dokumen):
+    """
+    Menghapus `objek` (misalnya karyawan; dokumennya ikut terhapus lewat cascade) dan
+    melepas referensi blob milik `daftar_dokumen`, di transaksi sesi saat ini.
+
+    Mengembalikan path file yang harus dihapus setelah commit: blob yang referensinya
+    habis, dan file lama yang tidak disimpan sebagai blob.
+    """
+    tabel = BlobDokumen.__table__
+    path_dihapus, dilepas = [], []
+    for dokumen in daftar_dokumen:
+        if dokumen.blob_sha256 is None:
+            if dokumen.file_path:
+                path_dihapus.append(dokumen.file_path)
+            continue
+        db.session.execute(
+            update(tabel).where(tabel.c.sha256 == dokumen.blob_sha256)
+            .values(jumlah_referensi=tabel.c.jumlah_referensi - 1)
+        )
+        dilepas.append(dokumen.blob_sha256)
+
+    db.session.delete(objek)
+    # Record dokumen dihapus lebih dulu agar foreign key ke blob tidak menghalangi
+    db.session.flush()
+    for sha256 in dict.fromkeys(dilepas):
+        habis = db.session.execute(
+            delete(tabel).where(tabel.c.sha256 == sha256, tabel.c.jumlah_referensi <= 0)
+        )
+        if habis.rowcount:
+            path_dihapus.append(path_blob(sha256))
+    return path_dihapus
+
+
+def hapus_file(daftar_path):
+    """Menghapus file fisik; kegagalan hanya dicatat ke log."""
+    for path in daftar_path:
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            logger.warning('Gagal menghapus file %s: %s', path, e)
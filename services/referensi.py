@@ -0,0 +1,72 @@
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import distinct, select
+
+from models import db
+from models.karyawan import Karyawan
+
+
+class CacheReferensi:
+    """
+    Cache nilai referensi kecil (misalnya pilihan dropdown) dengan masa berlaku.
+
+    Cache berlaku per proses: perubahan dari proses lain (worker, instance web
+    lain) baru terlihat setelah TTL habis, kecuali proses tersebut memanggil invalidate().
+    """
+
+    def __init__(self, loader, nama_config_ttl):
+        self._loader = loader
+        self._nama_config_ttl = nama_config_ttl
+        self._nilai = None
+        self._kedaluwarsa = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        sekarang = time.monotonic()
+        with self._lock:
+            if self._nilai is not None and sekarang < self._kedaluwarsa:
+                return self._nilai
+        nilai = self._loader()
+        with self._lock:
+            self._nilai = nilai
+            self._kedaluwarsa = sekarang + current_app.config[self._nama_config_ttl]
+        return nilai
+
+    def invalidate(self):
+        with self._lock:
+            self._nilai = None
+            self._kedaluwarsa = 0.0
+
+
+def _muat_unit_kerja():
+    hasil = db.session.execute(
+        select(distinct(Karyawan.unit_kerja)).where(Karyawan.unit_kerja.isnot(None)).order_by(Karyawan.unit_kerja)
+    ).scalars()
+    return tuple(hasil)
+
+
+# Cache yang diturunkan dari tabel karyawan; semuanya dibuang setiap kali data karyawan berubah
+_cache_karyawan = []
+
+
+def cache_data_karyawan(loader, nama_config_ttl):
+    """Membuat CacheReferensi yang ikut dibuang oleh invalidate_cache_karyawan()."""
+    cache = CacheReferensi(loader, nama_config_ttl)
+    _cache_karyawan.append(cache)
+    return cache
+
+
+def invalidate_cache_karyawan():
+    """Dipanggil setelah data karyawan ditambah, diubah, diimpor, atau dihapus."""
+    for cache in _cache_karyawan:
+        cache.invalidate()
+
+
+_unit_kerja = cache_data_karyawan(_muat_unit_kerja, 'UNIT_KERJA_CACHE_TTL')
+
+
+def daftar_unit_kerja():
+    """Daftar unik unit kerja (terurut) untuk dropdown, dari cache."""
+    return _unit_kerja.get()
@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+
+from sqlalchemy import case, func, select
+
+from models import db
+from models.karyawan import Karyawan
+from services.referensi import cache_data_karyawan
+
+# Kelompok sisa hari kontrak, sama dengan warna di tabel "Kontrak Akan Habis" pada dashboard:
+# (batas atas sisa hari, eksklusif; label)
+KELOMPOK_SISA_KONTRAK = [
+    (30, '< 30 hari'),
+    (45, '30–44 hari'),
+    (61, '45–60 hari'),
+    (91, '61–90 hari'),
+]
+
+
+class RingkasanKaryawan:
+    """Angka agregat dashboard: jumlah per unit kerja dan status, total gaji/tunjangan, kontrak akan habis."""
+
+    def __init__(self, tanggal):
+        self.tanggal = tanggal
+        self.total = 0
+        self.per_status = {}
+        self.per_unit = {}
+        self.total_gaji = 0  # karyawan aktif
+        self.total_tunjangan = 0  # karyawan aktif
+        self.kontrak_akan_habis = [0] * len(KELOMPOK_SISA_KONTRAK)  # karyawan aktif
+
+    def _unit(self, unit_kerja):
+        if unit_kerja not in self.per_unit:
+            self.per_unit[unit_kerja] = {'unit_kerja': unit_kerja, 'aktif': 0, 'nonaktif': 0, 'total': 0,
+                                         'gaji': 0, 'tunjangan': 0}
+        return self.per_unit[unit_kerja]
+
+    def catat(self, unit_kerja, status, kelompok, jumlah, gaji, tunjangan):
+        self.total += jumlah
+        self.per_status[status] = self.per_status.get(status, 0) + jumlah
+        unit = self._unit(unit_kerja or '-')
+        unit['total'] += jumlah
+        if status == 'Aktif':
+            unit['aktif'] += jumlah
+            unit['gaji'] += gaji or 0
+            unit['tunjangan'] += tunjangan or 0
+            self.total_gaji += gaji or 0
+            self.total_tunjangan += tunjangan or 0
+            if kelompok is not None:
+                self.kontrak_akan_habis[kelompok] += jumlah
+        else:
+            unit['nonaktif'] += jumlah
+
+    @property
+    def daftar_unit(self):
+        return sorted(self.per_unit.values(), key=lambda u: u['unit_kerja'])
+
+    @property
+    def kelompok_kontrak(self):
+        return [(label, jumlah) for (_, label), jumlah in zip(KELOMPOK_SISA_KONTRAK, self.kontrak_akan_habis)]
+
+    @property
+    def total_kontrak_akan_habis(self):
+        return sum(self.kontrak_akan_habis)
+
+
+def hitung_ringkasan(today=None):
+    """Menghitung semua angka ringkasan dengan satu query GROUP BY (unit kerja, status, kelompok sisa kontrak)."""
+    today = today or date.today()
+    ringkasan = RingkasanKaryawan(today)
+
+    kondisi = [(Karyawan.tanggal_akhir_kontrak < today, None)]
+    for indeks, (batas, _) in enumerate(KELOMPOK_SISA_KONTRAK):
+        kondisi.append((Karyawan.tanggal_akhir_kontrak < today + timedelta(days=batas), indeks))
+    kelompok = case(*kondisi, else_=None).label('kelompok')
+
+    query = (
+        select(Karyawan.unit_kerja, Karyawan.status, kelompok, func.count(Karyawan.id),
+               func.sum(Karyawan.gaji_honorarium), func.sum(Karyawan.tunjangan_tetap))
+        .group_by(Karyawan.unit_kerja, Karyawan.status, kelompok)
+    )
+    for baris in db.session.execute(query):
+        ringkasan.catat(*baris)
+    return ringkasan
+
+
+_ringkasan = cache_data_karyawan(hitung_ringkasan, 'RINGKASAN_CACHE_TTL')
+
+
+def ringkasan_dashboard():
+    """Ringkasan untuk dashboard, dari cache (dihitung ulang setelah TTL atau saat data karyawan berubah)."""
+    ringkasan = _ringkasan.get()
+    if ringkasan.tanggal != date.today():
+        # Kelompok sisa kontrak bergantung pada tanggal hari ini
+        _ringkasan.invalidate()
+        ringkasan = _ringkasan.get()
+    return ringkasan
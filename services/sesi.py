@@ -0,0 +1,323 @@
+import copy
+import hashlib
+import logging
+import os
+import random
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask import session, url_for
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SessionInterface
+from itsdangerous import BadSignature, Signer
+from markupsafe import Markup
+
+logger = logging.getLogger(__name__)
+
+# Peluang satu penyimpanan sesi ikut membersihkan sesi kedaluwarsa
+PELUANG_PEMBERSIHAN = 0.01
+# Masa berlaku sesi yang hanya dibaca (tidak disimpan ulang) diperpanjang paling sering sekali
+# per interval ini (detik), agar pengguna yang aktif tidak logout tanpa menulis di setiap request
+INTERVAL_PERPANJANG = 60
+# Jumlah pesan flash tersembunyi yang disimpan per kategori untuk halaman /pesan (jumlahnya tetap tepat)
+MAKS_PESAN_TERSEMBUNYI = 200
+
+
+def _kunci(sid):
+    # Yang disimpan hanya hash ID sesi: isi folder/database sesi tidak bisa dipakai sebagai cookie
+    return hashlib.sha256(sid.encode()).hexdigest()
+
+
+class PenyimpananSesiFile:
+    """
+    Satu file per sesi di `folder`; kedaluwarsa dihitung dari mtime file, yaitu waktu tulis
+    terakhir yang dimajukan (os.utime) saat sesi dibaca.
+    """
+
+    def __init__(self, folder, umur):
+        self.folder = folder
+        self.umur = umur
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, sid):
+        return os.path.join(self.folder, _kunci(sid))
+
+    def baca(self, sid):
+        path = self._path(sid)
+        sekarang = time.time()
+        try:
+            diubah = os.path.getmtime(path)
+            if diubah + self.umur < sekarang:
+                os.remove(path)
+                return None
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if sekarang - diubah > INTERVAL_PERPANJANG:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return data
+
+    def simpan(self, sid, data):
+        path = self._path(sid)
+        sementara = f'{path}.{os.urandom(4).hex()}.tmp'
+        with open(sementara, 'wb') as f:
+            f.write(data)
+        os.replace(sementara, path)
+
+    def hapus(self, sid):
+        try:
+            os.remove(self._path(sid))
+        except OSError:
+            pass
+
+    def bersihkan(self):
+        batas = time.time() - self.umur
+        with os.scandir(self.folder) as daftar:
+            for entri in daftar:
+                try:
+                    if entri.stat().st_mtime < batas:
+                        os.remove(entri.path)
+                except OSError:
+                    pass
+
+
+class PenyimpananSesiSQLite:
+    """Tabel sesi di file SQLite tersendiri (WAL), aman dipakai beberapa proses worker di satu host."""
+
+    def __init__(self, path, umur):
+        self.path = path
+        self.umur = umur
+        self._lokal = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._koneksi() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS sesi ('
+                         'id TEXT PRIMARY KEY, data BLOB NOT NULL, kedaluwarsa REAL NOT NULL)')
+
+    def _koneksi(self):
+        # Satu koneksi per thread; koneksi milik proses induk tidak dipakai setelah fork
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is None or self._lokal.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._lokal.conn, self._lokal.pid = conn, os.getpid()
+        return conn
+
+    def baca(self, sid):
+        kunci, sekarang = _kunci(sid), time.time()
+        baris = self._koneksi().execute('SELECT data, kedaluwarsa FROM sesi WHERE id = ? AND kedaluwarsa > ?',
+                                        (kunci, sekarang)).fetchone()
+        if baris is None:
+            return None
+        data, kedaluwarsa = baris
+        # Sesi yang hanya dibaca tidak disimpan ulang: masa berlakunya diperpanjang di sini
+        if kedaluwarsa - sekarang < self.umur - INTERVAL_PERPANJANG:
+            with self._koneksi() as conn:
+                conn.execute('UPDATE sesi SET kedaluwarsa = ? WHERE id = ?', (sekarang + self.umur, kunci))
+        return data
+
+    def simpan(self, sid, data):
+        with self._koneksi() as conn:
+            conn.execute('INSERT INTO sesi (id, data, kedaluwarsa) VALUES (?, ?, ?) '
+                         'ON CONFLICT (id) DO UPDATE SET data = excluded.data, kedaluwarsa = excluded.kedaluwarsa',
+                         (_kunci(sid), data, time.time() + self.umur))
+
+    def hapus(self, sid):
+        with self._koneksi() as conn:
+            conn.execute('DELETE FROM sesi WHERE id = ?', (_kunci(sid),))
+
+    def bersihkan(self):
+        with self._koneksi() as conn:
+            conn.execute('DELETE FROM sesi WHERE kedaluwarsa <= ?', (time.time(),))
+
+
+class SesiServer(SecureCookieSession):
+    """Sesi yang isinya disimpan di server; cookie hanya berisi ID sesi yang ditandatangani."""
+
+    def __init__(self, initial=None, sid=None):
+        super().__init__(initial)
+        self.sid = sid
+        self.new = sid is None
+        self.ganti_id = False
+
+
+class SessionInterfaceServer(SessionInterface):
+    """
+    Session interface Flask dengan isi sesi di `penyimpanan` (PenyimpananSesiFile/SQLite).
+
+    Ukuran cookie selalu sama (ID acak 256-bit + tanda tangan), berapa pun isi sesinya.
+    """
+
+    serializer = TaggedJSONSerializer()
+    session_class = SesiServer
+
+    def __init__(self, penyimpanan):
+        self.penyimpanan = penyimpanan
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='sesi-server', key_derivation='hmac', digest_method=hashlib.sha256)
+
+    def open_session(self, app, request):
+        if not app.secret_key:
+            return None
+        nilai = request.cookies.get(self.get_cookie_name(app))
+        if nilai:
+            try:
+                sid = self._signer(app).unsign(nilai).decode()
+            except BadSignature:
+                sid = None
+            data = self.penyimpanan.baca(sid) if sid else None
+            if data is not None:
+                try:
+                    return self.session_class(self.serializer.loads(data.decode()), sid=sid)
+                except ValueError:
+                    pass
+        return self.session_class()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        partitioned = self.get_cookie_partitioned(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if session.ganti_id and session.sid:
+            self.penyimpanan.hapus(session.sid)
+            session.sid = None
+
+        # Sesi yang dikosongkan (logout): hapus data di server dan cookie-nya
+        if not session:
+            if session.modified and session.sid:
+                self.penyimpanan.hapus(session.sid)
+            if session.modified:
+                response.delete_cookie(name, domain=domain, path=path, secure=secure, partitioned=partitioned,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add('Cookie')
+            return
+
+        sid_baru = session.sid is None
+        perbarui_cookie = sid_baru or (session.permanent and app.config['SESSION_REFRESH_EACH_REQUEST'])
+        if not (session.modified or perbarui_cookie):
+            return
+
+        if sid_baru:
+            session.sid = secrets.token_urlsafe(32)
+        self.penyimpanan.simpan(session.sid, self.serializer.dumps(dict(session)).encode())
+        if random.random() < PELUANG_PEMBERSIHAN:
+            self.penyimpanan.bersihkan()
+
+        if perbarui_cookie:
+            response.set_cookie(name, self._signer(app).sign(session.sid).decode(),
+                                expires=self.get_expiration_time(app, session), httponly=httponly,
+                                domain=domain, path=path, secure=secure, partitioned=partitioned,
+                                samesite=samesite)
+            response.vary.add('Cookie')
+
+
+def ganti_id_sesi():
+    """Memberi sesi ID baru saat disimpan (panggil saat login, mencegah session fixation)."""
+    if isinstance(session._get_current_object(), SesiServer):
+        session.ganti_id = True
+
+
+def ringkas_pesan_flash(pesan, maks, tersembunyi, teks_ringkasan, simpan_isi=True):
+    """
+    Membatasi daftar flash [(kategori, pesan), ...] menjadi paling banyak `maks` pesan per kategori.
+
+    Untuk kategori yang melebihi batas, `maks - 1` pesan terbaru dipertahankan dan sisanya
+    diganti satu pesan ringkasan `teks_ringkasan(kategori, jumlah)` di depannya. Pesan yang
+    disembunyikan dicatat ke `tersembunyi` ({kategori: {'jumlah', 'pesan', 'teks'}}, diubah di
+    tempat; isi pesan hanya jika `simpan_isi`) dan ke log. Ringkasan sebelumnya dikenali dari
+    `tersembunyi[kategori]['teks']`, sehingga jumlahnya tetap tepat walau diringkas berulang.
+    Mengembalikan None jika tidak ada yang perlu diringkas.
+    """
+    per_kategori = {}
+    for kategori, teks in pesan:
+        per_kategori.setdefault(kategori, []).append(teks)
+    if all(len(daftar) <= maks for daftar in per_kategori.values()):
+        return None
+
+    hasil = []
+    for kategori, daftar in per_kategori.items():
+        if len(daftar) <= maks:
+            hasil.extend((kategori, teks) for teks in daftar)
+            continue
+        data = tersembunyi.setdefault(kategori, {'jumlah': 0, 'pesan': [], 'teks': None})
+        # Ringkasan lama diganti yang baru; pesan yang diwakilinya sudah dihitung di `data`
+        daftar = [teks for teks in daftar if teks != data['teks']]
+        batas = len(daftar) - (maks - 1)
+        dibuang, disimpan = daftar[:batas], daftar[batas:]
+        data['jumlah'] += len(dibuang)
+        if simpan_isi:
+            data['pesan'] = (data['pesan'] + dibuang)[-MAKS_PESAN_TERSEMBUNYI:]
+        data['teks'] = teks_ringkasan(kategori, data['jumlah'])
+        hasil.append((kategori, data['teks']))
+        hasil.extend((kategori, teks) for teks in disimpan)
+        logger.info('%s pesan flash %s diringkas', len(dibuang), kategori,
+                    extra={'kategori': kategori, 'pesan': dibuang})
+    return hasil
+
+
+def pasang_sesi(app):
+    """
+    Memasang backend sesi sesuai SESSION_BACKEND ('cookie', 'filesystem', atau 'sqlite') dan
+    pembatas jumlah pesan flash yang tertunda (FLASH_MAX_PER_CATEGORY) untuk semua backend.
+    """
+    backend = app.config['SESSION_BACKEND']
+    umur = int(app.permanent_session_lifetime.total_seconds())
+    if backend == 'filesystem':
+        app.session_interface = SessionInterfaceServer(PenyimpananSesiFile(app.config['SESSION_FOLDER'], umur))
+    elif backend == 'sqlite':
+        app.session_interface = SessionInterfaceServer(
+            PenyimpananSesiSQLite(app.config['SESSION_SQLITE_PATH'], umur))
+    elif backend != 'cookie':
+        raise ValueError(f'SESSION_BACKEND tidak dikenal: {backend}')
+
+    maks = app.config['FLASH_MAX_PER_CATEGORY']
+    # Dengan sesi di cookie, isi pesan yang disembunyikan tidak disimpan (hanya jumlahnya dan log),
+    # agar cookie tidak membesar lagi
+    simpan_isi = backend != 'cookie'
+
+    def teks_ringkasan(kategori, jumlah):
+        if not simpan_isi:
+            return f'{jumlah} pesan sebelumnya tidak ditampilkan.'
+        return Markup('{} pesan sebelumnya tidak ditampilkan (<a href="{}" class="underline">lihat semua</a>).'
+                      ).format(jumlah, url_for('sistem.pesan_tersembunyi'))
+
+    @app.after_request
+    def ringkas_flash(response):
+        # Dijalankan sebelum sesi disimpan; `in` tidak menandai sesi sebagai diakses (Vary: Cookie)
+        if maks <= 0 or ('_flashes' not in session and '_flash_tersembunyi' not in session):
+            return response
+
+        pesan = session.get('_flashes', [])
+        tersembunyi_awal = session.get('_flash_tersembunyi', {})
+        tersembunyi = copy.deepcopy(tersembunyi_awal)
+        # Ringkasan yang sudah ditampilkan (diambil get_flashed_messages) menjadi laporan di /pesan
+        for kategori, data in list(tersembunyi.items()):
+            if (kategori, data['teks']) not in pesan:
+                del tersembunyi[kategori]
+                if simpan_isi:
+                    session['_flash_laporan'] = {**session.get('_flash_laporan', {}),
+                                                 kategori: {'jumlah': data['jumlah'], 'pesan': data['pesan']}}
+
+        ringkas = ringkas_pesan_flash(pesan, maks, tersembunyi, teks_ringkasan, simpan_isi)
+        if ringkas is not None:
+            session['_flashes'] = ringkas
+        if tersembunyi != tersembunyi_awal:
+            if tersembunyi:
+                session['_flash_tersembunyi'] = tersembunyi
+            else:
+                session.pop('_flash_tersembunyi', None)
+        return response
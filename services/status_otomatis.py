@@ -0,0 +1,114 @@
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from models import db
+from models.karyawan import Karyawan
+from models.riwayat_jadwal import RiwayatJadwal
+from services.referensi import invalidate_cache_karyawan
+
+NAMA_JOB_UPDATE_STATUS = 'update_status_karyawan'
+
+
+def check_and_update_statuses(today=None):
+    """
+    Memeriksa dan memperbarui status karyawan secara otomatis.
+
+    Kedua transisi dijalankan sebagai satu UPDATE ... WHERE masing-masing,
+    tanpa memuat objek ORM. Mengembalikan jumlah baris yang berubah.
+    """
+    today = today or date.today()
+    ninety_days_later = today + timedelta(days=90)
+
+    try:
+        # 1. Nonaktifkan karyawan yang kontraknya habis dan tidak diperpanjang
+        hasil_nonaktif = db.session.execute(
+            update(Karyawan)
+            .where(
+                Karyawan.tindak_lanjut_kontrak == 'Tidak diperpanjang',
+                Karyawan.tanggal_akhir_kontrak < today,
+                Karyawan.status == 'Aktif'
+            )
+            .values(status='Nonaktif')
+            .execution_options(synchronize_session=False)
+        )
+
+        # 2. Ubah status tindak lanjut untuk kontrak yang akan habis
+        hasil_tindak_lanjut = db.session.execute(
+            update(Karyawan)
+            .where(
+                Karyawan.tanggal_akhir_kontrak.isnot(None),
+                Karyawan.tanggal_akhir_kontrak <= ninety_days_later,
+                Karyawan.tindak_lanjut_kontrak == 'Tidak perlu'
+            )
+            .values(tindak_lanjut_kontrak='Belum ditindaklanjuti')
+            .execution_options(synchronize_session=False)
+        )
+
+        db.session.commit()
+        invalidate_cache_karyawan()
+        return {
+            'dinonaktifkan': hasil_nonaktif.rowcount,
+            'ditindaklanjuti': hasil_tindak_lanjut.rowcount,
+        }
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def jalankan_update_status_harian(today=None, paksa=False):
+    """
+    Menjalankan check_and_update_statuses paling banyak sekali per hari.
+
+    Penanda last-run disimpan di tabel riwayat_jadwal dengan unique
+    (nama_job, tanggal), sehingga beberapa proses scheduler yang berjalan
+    bersamaan tidak akan mengeksekusi job yang sama dua kali.
+    Mengembalikan objek RiwayatJadwal, atau None jika job sudah berjalan hari ini.
+
+    Jika update gagal, klaim yang dibuat oleh pemanggilan ini dilepas; baris yang sudah ada
+    (run ulang dengan `paksa`) tetap disimpan dengan catatan kegagalan di keterangan.
+    """
+    today = today or date.today()
+
+    riwayat = RiwayatJadwal.query.filter_by(nama_job=NAMA_JOB_UPDATE_STATUS, tanggal=today).first()
+    if riwayat and not paksa:
+        return None
+
+    klaim_baru = riwayat is None
+    if klaim_baru:
+        # Klaim slot hari ini terlebih dahulu
+        riwayat = RiwayatJadwal(nama_job=NAMA_JOB_UPDATE_STATUS, tanggal=today, mulai=datetime.utcnow())
+        db.session.add(riwayat)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Proses lain sudah mengklaim job hari ini
+            db.session.rollback()
+            return None
+    else:
+        riwayat.mulai = datetime.utcnow()
+
+    mulai = time.perf_counter()
+    try:
+        hasil = check_and_update_statuses(today)
+    except Exception as e:
+        # check_and_update_statuses sudah rollback, jadi riwayat kembali ke isi di database
+        if klaim_baru:
+            # Lepaskan klaim agar job dicoba lagi pada putaran scheduler berikutnya
+            db.session.delete(riwayat)
+        else:
+            # Run ulang (paksa) atas baris yang sudah ada: penanda hari ini dan hasil run
+            # sebelumnya tetap disimpan, kegagalannya dicatat di keterangan
+            gagal = f'run ulang gagal: {type(e).__name__}: {e}'
+            riwayat.keterangan = (f'{riwayat.keterangan}; {gagal}' if riwayat.keterangan else gagal)[:255]
+        db.session.commit()
+        raise
+
+    riwayat.durasi_ms = int((time.perf_counter() - mulai) * 1000)
+    riwayat.baris_terdampak = hasil['dinonaktifkan'] + hasil['ditindaklanjuti']
+    riwayat.keterangan = (f"dinonaktifkan={hasil['dinonaktifkan']}, "
+                          f"ditindaklanjuti={hasil['ditindaklanjuti']}")
+    db.session.commit()
+    return riwayat
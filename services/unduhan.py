@@ -0,0 +1,111 @@
+import os
+
+from flask import current_app, request
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file as werkzeug_send_file
+
+OFFLOAD_X_ACCEL = 'x-accel-redirect'
+OFFLOAD_X_SENDFILE = 'x-sendfile'
+
+
+def _uri_internal(path, mapping):
+    """URI internal proxy untuk `path`, atau None jika path tidak berada di folder yang dipetakan."""
+    for folder, prefix in mapping:
+        folder = os.path.join(os.path.abspath(folder), '')
+        if path.startswith(folder):
+            return prefix.rstrip('/') + '/' + path[len(folder):].replace(os.sep, '/')
+    return None
+
+
+def kirim_file(path, download_name=None, etag=True):
+    """
+    Mengirim file sebagai lampiran, atau menyerahkan pengirimannya ke reverse proxy.
+
+    FILE_OFFLOAD = 'x-accel-redirect' (nginx) atau 'x-sendfile' (Apache/lighttpd): respons hanya
+    berisi header, proxy yang membaca file dan menangani Range/If-Modified-Since. Tanpa
+    offload, file dikirim oleh Python dengan ETag, Last-Modified, dan dukungan Range.
+    `etag` boleh berupa string (misalnya hash isi file) sebagai pengganti ETag dari stat file.
+    """
+    path = os.path.abspath(path)
+    if not os.path.isfile(path):
+        raise NotFound()
+
+    config = current_app.config
+    mode = config['FILE_OFFLOAD']
+    uri = _uri_internal(path, config['X_ACCEL_MAPPING']) if mode == OFFLOAD_X_ACCEL else None
+    offload = mode == OFFLOAD_X_SENDFILE or uri is not None
+
+    response = werkzeug_send_file(
+        path, request.environ,
+        as_attachment=True,
+        download_name=download_name,
+        conditional=not offload,
+        etag=False if offload else etag,
+        use_x_sendfile=offload,
+        response_class=current_app.response_class,
+    )
+    if offload:
+        # Body kosong; panjang dan isi file ditentukan oleh proxy
+        response.headers.pop('Content-Length', None)
+        if uri is not None:
+            response.headers.pop('X-Sendfile', None)
+            response.headers['X-Accel-Redirect'] = uri
+    # Dokumen karyawan tidak boleh disimpan oleh cache bersama (proxy/CDN)
+    response.cache_control.private = True
+    return response
+
+
+def kirim_file_dari_folder(folder, nama_file, download_name=None):
+    """Seperti send_from_directory: `nama_file` dari URL tidak boleh keluar dari `folder`."""
+    path = safe_join(folder, nama_file)
+    if path is None:
+        raise NotFound()
+    return kirim_file(path, download_name=download_name)
+
+
+class EmulasiOffload:
+    """
+    Middleware WSGI pengganti nginx/Apache untuk pengembangan dan pengujian (FILE_OFFLOAD_EMULASI).
+
+    Jika aplikasi menjawab dengan X-Accel-Redirect atau X-Sendfile, file yang dimaksud dikirim
+    di sini, seperti yang akan dilakukan proxy, sehingga mode offload bisa dicoba tanpa proxy.
+    """
+
+    def __init__(self, wsgi_app, mapping):
+        self.wsgi_app = wsgi_app
+        self.mapping = [(prefix.rstrip('/') + '/', os.path.abspath(folder)) for folder, prefix in mapping]
+
+    def _path(self, headers):
+        if headers.get('x-sendfile'):
+            return headers['x-sendfile']
+        uri = headers.get('x-accel-redirect')
+        for prefix, folder in self.mapping:
+            if uri and uri.startswith(prefix):
+                return safe_join(folder, uri[len(prefix):])
+        return None
+
+    def __call__(self, environ, start_response):
+        tangkapan = {}
+
+        def tangkap(status, headers, exc_info=None):
+            tangkapan['status'], tangkapan['headers'] = status, headers
+            return lambda data: None
+
+        body = self.wsgi_app(environ, tangkap)
+        headers = {k.lower(): v for k, v in tangkapan.get('headers', [])}
+        if 'x-accel-redirect' not in headers and 'x-sendfile' not in headers:
+            # Respons biasa: teruskan apa adanya
+            start_response(tangkapan['status'], tangkapan['headers'])
+            return body
+
+        if hasattr(body, 'close'):
+            body.close()
+        path = self._path(headers)
+        if not path or not os.path.isfile(path):
+            return NotFound()(environ, start_response)
+        response = werkzeug_send_file(path, environ, mimetype=headers.get('content-type'), conditional=True)
+        for nama in ('Content-Disposition', 'Cache-Control'):
+            if nama.lower() in headers:
+                response.headers[nama] = headers[nama.lower()]
+        return response(environ, start_response)
@@ -0,0 +1,197 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from models import db
+from models.job import Job
+from services.antrian import (enqueue, jalankan_job, jalankan_langsung, klaim_job, pulihkan_job_macet, tugas,
+                              worker_loop)
+from tests.test_impor_excel import _baris, _buat_excel
+
+
+@tugas('tes_selesai')
+def _job_selesai(payload, laporkan_progres):
+    time.sleep(payload.get('tidur', 0))
+    return {'pesan': 'ok'}
+
+
+@tugas('tes_diambil_alih')
+def _job_diambil_alih(payload, laporkan_progres):
+    # Selama job berjalan, worker lain menganggapnya macet dan mengklaimnya ulang
+    with db.engine.begin() as conn:
+        conn.execute(update(Job).where(Job.id == payload['job_id'])
+                     .values(worker='worker-lain', percobaan=Job.percobaan + 1))
+    return {'pesan': 'dari worker lama'}
+
+
+@tugas('tes_pulihkan_di_tengah')
+def _job_pulihkan_di_tengah(payload, laporkan_progres):
+    # Worker lain memulihkan job macet saat job ini masih berjalan
+    time.sleep(payload['tidur'])
+    diantrikan, _ = pulihkan_job_macet(payload['batas_detik'], maks_percobaan=3)
+    return {'diantrikan': diantrikan}
+
+
+def _hapus_berkas(payload):
+    os.remove(payload['path'])
+
+
+@tugas('tes_berkas', bersihkan=_hapus_berkas)
+def _job_berkas(payload, laporkan_progres):
+    if payload.get('galat'):
+        raise ValueError('isi file tidak valid')
+    with open(payload['path']) as f:
+        return {'isi': f.read()}
+
+
+def _berkas(tmp_path):
+    path = tmp_path / 'unggahan.txt'
+    path.write_text('data')
+    return str(path)
+
+
+def _mundurkan_heartbeat(job_id, detik):
+    with db.engine.begin() as conn:
+        conn.execute(update(Job).where(Job.id == job_id)
+                     .values(heartbeat=datetime.utcnow() - timedelta(seconds=detik)))
+
+
+def _klaim_job_baru(jenis, payload):
+    job_id = enqueue(jenis, payload).id
+    job = klaim_job('worker-mati')
+    assert job.id == job_id
+    return job
+
+
+def _muat(job_id):
+    db.session.expire_all()
+    return db.session.get(Job, job_id)
+
+
+def test_job_macet_diantrikan_ulang_lalu_gagal(app_context, bersihkan_data):
+    job_id = enqueue('tes_selesai').id
+    for percobaan in (1, 2):
+        assert klaim_job('worker-mati').id == job_id
+        assert _muat(job_id).percobaan == percobaan
+        _mundurkan_heartbeat(job_id, 600)
+        assert pulihkan_job_macet(300, maks_percobaan=3) == (1, 0)
+        job = _muat(job_id)
+        assert (job.status, job.worker) == (Job.STATUS_ANTRI, None)
+
+    klaim_job('worker-mati')
+    _mundurkan_heartbeat(job_id, 600)
+    assert pulihkan_job_macet(300, maks_percobaan=3) == (0, 1)
+    job = _muat(job_id)
+    assert job.status == Job.STATUS_GAGAL
+    assert '3 kali percobaan' in job.pesan_error
+    assert job.selesai is not None
+
+
+def test_job_dengan_heartbeat_baru_tidak_diambil(app_context, bersihkan_data):
+    job_id = enqueue('tes_selesai').id
+    klaim_job('worker-hidup')
+    _mundurkan_heartbeat(job_id, 10)
+    assert pulihkan_job_macet(300, maks_percobaan=3) == (0, 0)
+    assert _muat(job_id).status == Job.STATUS_BERJALAN
+
+
+def test_worker_menyelesaikan_job_dari_worker_mati(app, app_context, bersihkan_data, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_STALE_TIMEOUT', 60)
+    job_id = enqueue('tes_selesai').id
+    klaim_job('worker-mati')
+    _mundurkan_heartbeat(job_id, 120)
+
+    worker_loop(sekali=True)
+    job = _muat(job_id)
+    assert job.status == Job.STATUS_SELESAI
+    assert job.percobaan == 2
+    assert job.worker != 'worker-mati'
+
+
+def test_heartbeat_diperbarui_selama_job_berjalan(app, app_context, bersihkan_data, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_HEARTBEAT_INTERVAL', 0.1)
+    job_id = enqueue('tes_selesai', {'tidur': 0.5}).id
+    worker_loop(sekali=True)
+    job = _muat(job_id)
+    assert job.status == Job.STATUS_SELESAI
+    assert job.heartbeat > job.mulai
+
+
+def test_hasil_worker_lama_diabaikan_setelah_diambil_alih(app_context, bersihkan_data):
+    job = enqueue('tes_diambil_alih')
+    job.payload = f'{{"job_id": {job.id}}}'
+    db.session.commit()
+    job = jalankan_job(klaim_job('worker-lama'))
+    assert job.status == Job.STATUS_BERJALAN
+    assert job.worker == 'worker-lain'
+    assert job.hasil is None
+
+
+@pytest.mark.parametrize('jenis, status', [('tes_selesai', Job.STATUS_SELESAI), ('tidak_ada', Job.STATUS_GAGAL)])
+def test_job_langsung_mencatat_mulai_dan_worker(app_context, bersihkan_data, jenis, status):
+    job = Job(jenis=jenis, status=Job.STATUS_ANTRI)
+    db.session.add(job)
+    db.session.commit()
+    job = jalankan_langsung(job)
+    assert job.status == status
+    assert job.mulai is not None and job.selesai >= job.mulai
+    assert job.worker.endswith('(langsung)')
+    assert job.percobaan == 1
+
+
+def test_job_langsung_mengirim_heartbeat(app, app_context, bersihkan_data, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_HEARTBEAT_INTERVAL', 0.05)
+    job = enqueue('tes_pulihkan_di_tengah', {'tidur': 0.6, 'batas_detik': 0.3})
+    job = jalankan_langsung(job)
+    assert job.status == Job.STATUS_SELESAI
+    assert job.hasil_data['diantrikan'] == 0
+    assert job.percobaan == 1
+    assert job.heartbeat > job.mulai
+
+
+@pytest.mark.parametrize('galat, status', [(False, Job.STATUS_SELESAI), (True, Job.STATUS_GAGAL)])
+def test_pembersih_dipanggil_saat_job_berakhir(app_context, bersihkan_data, tmp_path, galat, status):
+    path = _berkas(tmp_path)
+    job = jalankan_job(_klaim_job_baru('tes_berkas', {'path': path, 'galat': galat}))
+    assert job.status == status
+    assert not os.path.exists(path)
+
+
+def test_pembersih_tidak_dipanggil_sebelum_percobaan_habis(app_context, bersihkan_data, tmp_path):
+    path = _berkas(tmp_path)
+    job_id = _klaim_job_baru('tes_berkas', {'path': path}).id
+    _mundurkan_heartbeat(job_id, 600)
+    assert pulihkan_job_macet(300, maks_percobaan=2) == (1, 0)
+    assert os.path.exists(path)
+
+    klaim_job('worker-mati')
+    _mundurkan_heartbeat(job_id, 600)
+    assert pulihkan_job_macet(300, maks_percobaan=2) == (0, 1)
+    assert not os.path.exists(path)
+
+
+def test_pembersih_tidak_dipanggil_setelah_diambil_alih(app_context, bersihkan_data, tmp_path):
+    path = _berkas(tmp_path)
+    job = _klaim_job_baru('tes_berkas', {'path': path})
+    with db.engine.begin() as conn:
+        conn.execute(update(Job).where(Job.id == job.id).values(worker='worker-lain', percobaan=Job.percobaan + 1))
+    assert jalankan_job(job).worker == 'worker-lain'
+    assert os.path.exists(path)
+
+
+def test_impor_excel_diulang_setelah_worker_mati(app, app_context, bersihkan_data, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_STALE_TIMEOUT', 60)
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER_LAPORAN', str(tmp_path / 'laporan'))
+    path = _buat_excel(tmp_path / 'impor.xlsx', [_baris('W-1'), _baris('W-2')])
+    job_id = _klaim_job_baru('impor_excel', {'path': path}).id
+    # Worker pertama mati di tengah impor: file unggahan harus tetap ada untuk percobaan berikutnya
+    _mundurkan_heartbeat(job_id, 120)
+
+    worker_loop(sekali=True)
+    job = _muat(job_id)
+    assert job.status == Job.STATUS_SELESAI
+    assert job.hasil_data['berhasil'] == 2
+    assert not os.path.exists(path)
@@ -0,0 +1,210 @@
+"""
+API JSON /api/v1: batch POST/PUT/PATCH karyawan (207/409/422/404, mode atomik, error database),
+sparse fieldset ?fields=, filter updated_since, dan autentikasi Bearer token.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+
+import services.batch_karyawan as batch_karyawan
+from models import db
+from models.karyawan import Karyawan
+
+
+def _item(nup, **kolom):
+    data = {
+        'nama': f'Pegawai {nup}', 'jenis_kelamin': 'Perempuan', 'nup': nup, 'nik': f'NIK-{nup}',
+        'tempat_lahir': 'Bandung', 'tanggal_lahir': '1991-02-03', 'tanggal_mulai': '2021-04-05',
+    }
+    data.update(kolom)
+    return data
+
+
+def _jumlah_karyawan():
+    return db.session.query(Karyawan).count()
+
+
+@pytest.fixture
+def rusak_saat_tulis(monkeypatch):
+    """Item dengan nup di `nup_rusak` gagal ditulis dengan OperationalError (misalnya disk penuh)."""
+    nup_rusak = set()
+    tulis_asli = batch_karyawan._tulis
+
+    def tulis(valid, mode, hasil):
+        if any(data.get('nup') in nup_rusak for _, data in valid):
+            raise OperationalError('INSERT INTO karyawan ...', {}, Exception('disk I/O error'))
+        return tulis_asli(valid, mode, hasil)
+
+    monkeypatch.setattr(batch_karyawan, '_tulis', tulis)
+    return nup_rusak
+
+
+def test_post_semua_berhasil(client, app_context):
+    response = client.post('/api/v1/karyawan', json=[_item('A1'), _item('A2')])
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body['berhasil'], body['gagal'], body['atomik']) == (2, 0, False)
+    ids = [item['id'] for item in body['hasil']]
+    assert [db.session.get(Karyawan, id).nup for id in ids] == ['A1', 'A2']
+    assert db.session.get(Karyawan, ids[0]).status == 'Aktif'
+
+
+def test_post_sebagian_gagal_207(client, buat_karyawan):
+    buat_karyawan(nup='SUDAH-ADA')
+    response = client.post('/api/v1/karyawan', json={'data': [
+        _item('B1'),
+        _item('SUDAH-ADA'),
+        _item('B2', tanggal_lahir='03-02-1991'),
+        _item('B3', nik='NIK-B1'),
+        _item('B4', kolom_asing=1),
+    ]})
+    assert response.status_code == 207
+    body = response.get_json()
+    assert (body['berhasil'], body['gagal']) == (1, 4)
+    assert [item['status'] for item in body['hasil']] == [201, 409, 422, 409, 422]
+    assert 'NUP' in body['hasil'][1]['error']
+    assert 'tanggal_lahir' in body['hasil'][2]['error']
+    assert 'NIK' in body['hasil'][3]['error']
+    assert 'kolom_asing' in body['hasil'][4]['error']
+    assert db.session.query(Karyawan.nup).filter(Karyawan.nup.like('B%')).scalar() == 'B1'
+
+
+def test_post_semua_gagal_422(client, app_context):
+    response = client.post('/api/v1/karyawan', json=[_item('C1', nama=''), {'id': 5}, 'bukan objek'])
+    assert response.status_code == 422
+    assert [item['status'] for item in response.get_json()['hasil']] == [422, 422, 422]
+    assert _jumlah_karyawan() == 0
+
+
+def test_body_tidak_valid(client, app):
+    assert client.post('/api/v1/karyawan', data='[]', content_type='text/plain').status_code == 415
+    assert client.post('/api/v1/karyawan', json=[]).status_code == 400
+    assert client.post('/api/v1/karyawan', json={'data': 'x'}).status_code == 400
+    app.config['API_BATCH_MAX'], batas = 2, app.config['API_BATCH_MAX']
+    try:
+        assert client.post('/api/v1/karyawan', json=[_item('D1')] * 3).status_code == 413
+    finally:
+        app.config['API_BATCH_MAX'] = batas
+
+
+def test_atomik_satu_gagal_membatalkan_semua(client, app_context):
+    response = client.post('/api/v1/karyawan?atomik=1', json=[_item('E1'), _item('E2', nama=None), _item('E3')])
+    assert response.status_code == 422
+    body = response.get_json()
+    assert body['atomik'] is True
+    assert [item['status'] for item in body['hasil']] == [424, 422, 424]
+    assert body['berhasil'] == 0
+    assert _jumlah_karyawan() == 0
+
+
+def test_put_id_tidak_ada_404_dan_patch(client, buat_karyawan):
+    id_ada = buat_karyawan()[0]
+    response = client.put('/api/v1/karyawan', json=[
+        {'id': id_ada, **_item('F1', status='Nonaktif')},
+        {'id': 999_999, **_item('F2')},
+    ])
+    assert response.status_code == 207
+    assert [item['status'] for item in response.get_json()['hasil']] == [200, 404]
+    karyawan = db.session.get(Karyawan, id_ada)
+    assert (karyawan.nup, karyawan.status, karyawan.jabatan) == ('F1', 'Nonaktif', None)
+
+    response = client.patch('/api/v1/karyawan', json=[{'id': id_ada, 'tindak_lanjut_kontrak': 'Belum ditindaklanjuti'}])
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(Karyawan, id_ada).tindak_lanjut_kontrak == 'Belum ditindaklanjuti'
+    assert db.session.get(Karyawan, id_ada).nup == 'F1'
+
+
+def test_patch_id_ganda_dan_status_tidak_valid(client, buat_karyawan):
+    id_a, id_b = buat_karyawan(2)
+    response = client.patch('/api/v1/karyawan', json=[
+        {'id': id_a, 'jabatan': 'Kepala'},
+        {'id': id_a, 'jabatan': 'Wakil'},
+        {'id': id_b, 'tindak_lanjut_kontrak': 'Entah'},
+        {'id': id_b},
+    ])
+    assert response.status_code == 207
+    hasil = response.get_json()['hasil']
+    assert [item['status'] for item in hasil] == [200, 422, 422, 422]
+    assert 'lebih dari sekali' in hasil[1]['error']
+    db.session.expire_all()
+    assert db.session.get(Karyawan, id_a).jabatan == 'Kepala'
+
+
+def test_error_database_per_item_500(client, app_context, rusak_saat_tulis):
+    rusak_saat_tulis.add('G2')
+    response = client.post('/api/v1/karyawan', json=[_item('G1'), _item('G2'), _item('G3')])
+    assert response.status_code == 207
+    hasil = response.get_json()['hasil']
+    assert [item['status'] for item in hasil] == [201, 500, 201]
+    assert 'database' in hasil[1]['error']
+    assert sorted(nup for nup, in db.session.query(Karyawan.nup)) == ['G1', 'G3']
+
+
+def test_error_database_atomik_rollback(client, app_context, rusak_saat_tulis):
+    rusak_saat_tulis.add('H2')
+    response = client.post('/api/v1/karyawan?atomik=1', json=[_item('H1'), _item('H2')])
+    assert response.status_code == 500
+    assert [item['status'] for item in response.get_json()['hasil']] == [424, 500]
+    assert _jumlah_karyawan() == 0
+
+
+def test_commit_gagal_dilaporkan(client, app_context, monkeypatch):
+    def commit_gagal():
+        raise OperationalError('COMMIT', {}, Exception('database is locked'))
+
+    monkeypatch.setattr(db.session, 'commit', commit_gagal)
+    response = client.post('/api/v1/karyawan', json=[_item('I1'), _item('I2', nama='')])
+    monkeypatch.undo()
+    assert response.status_code == 500
+    assert [item['status'] for item in response.get_json()['hasil']] == [500, 422]
+    assert _jumlah_karyawan() == 0
+
+
+def test_fields_dan_detail(client, buat_karyawan):
+    id_karyawan = buat_karyawan(nup='J1')[0]
+    body = client.get('/api/v1/karyawan?fields=nup,unit_kerja').get_json()
+    assert body['data'] == [{'nup': 'J1', 'unit_kerja': 'Unit A'}]
+
+    response = client.get('/api/v1/karyawan?fields=nup,gaji_rahasia')
+    assert response.status_code == 400
+    assert 'gaji_rahasia' in response.get_json()['error']
+
+    detail = client.get(f'/api/v1/karyawan/{id_karyawan}?fields=nama').get_json()
+    assert detail == {'data': {'nama': 'Karyawan 0001'}}
+    assert client.get('/api/v1/karyawan/999999').status_code == 404
+
+
+def test_updated_since_dengan_dan_tanpa_offset(client, buat_karyawan):
+    id_lama, id_baru = buat_karyawan(2)
+    for id_karyawan, waktu in ((id_lama, datetime(2026, 1, 1, 8, 0)), (id_baru, datetime(2026, 1, 1, 10, 0))):
+        db.session.execute(update(Karyawan).where(Karyawan.id == id_karyawan).values(updated_at=waktu))
+    db.session.commit()
+
+    def ids(updated_since):
+        response = client.get('/api/v1/karyawan', query_string={'updated_since': updated_since, 'fields': 'id'})
+        assert response.status_code == 200
+        return [baris['id'] for baris in response.get_json()['data']]
+
+    assert ids('2026-01-01T09:00:00') == [id_baru]
+    # 16:30 WIB = 09:30 UTC, 17:30 WIB = 10:30 UTC
+    assert ids('2026-01-01T16:30:00+07:00') == [id_baru]
+    assert ids('2026-01-01T17:30:00+07:00') == []
+    assert ids('2026-01-01T07:59:00Z') == [id_lama, id_baru]
+
+    response = client.get('/api/v1/karyawan?updated_since=kemarin')
+    assert response.status_code == 400
+    assert 'ISO 8601' in response.get_json()['error']
+
+
+def test_autentikasi_bearer(app, bersihkan_data, monkeypatch):
+    monkeypatch.setitem(app.config, 'API_TOKENS', ['token-rahasia'])
+    c = app.test_client()
+
+    response = c.get('/api/v1/karyawan')
+    assert response.status_code == 401
+    assert response.headers['WWW-Authenticate'] == 'Bearer'
+    assert c.get('/api/v1/karyawan', headers={'Authorization': 'Bearer salah'}).status_code == 401
+    assert c.get('/api/v1/karyawan', headers={'Authorization': 'Bearer token-rahasia'}).status_code == 200
@@ -0,0 +1,54 @@
+from datetime import date
+
+from models import db
+from models.karyawan import Karyawan
+from services.cache_halaman import baca_versi
+from tests.test_index import rekam_query
+
+
+def _versi_karyawan():
+    return dict(baca_versi({'karyawan'})).get('karyawan', 0)
+
+
+def _karyawan_baru(nama):
+    return Karyawan(nama=nama, jenis_kelamin='Laki-laki', nup=nama, nik=nama, tempat_lahir='Jakarta',
+                    tanggal_lahir=date(1990, 1, 1), tanggal_mulai=date(2020, 1, 1), unit_kerja='Unit A',
+                    jabatan='Staf', gaji_honorarium=1)
+
+
+def test_versi_naik_setelah_commit_di_luar_transaksi_bisnis(app_context, bersihkan_data):
+    awal = _versi_karyawan()
+    db.session.commit()
+
+    with rekam_query() as rekaman:
+        db.session.add_all([_karyawan_baru('Versi A'), _karyawan_baru('Versi B')])
+        db.session.flush()
+        db.session.execute(db.update(Karyawan).where(Karyawan.nama == 'Versi A').values(jabatan='Kepala'))
+        db.session.commit()
+    # Transaksi bisnis tidak menyentuh baris penghitung (tidak mengunci versi_tabel)
+    assert not [s for s, _ in rekaman if 'versi_tabel' in s]
+    # Satu kenaikan per tabel per transaksi, tidak peduli jumlah statement
+    assert _versi_karyawan() == awal + 1
+
+
+def test_rollback_tidak_menaikkan_versi(app_context, bersihkan_data):
+    awal = _versi_karyawan()
+    db.session.commit()
+    db.session.add(_karyawan_baru('Versi C'))
+    db.session.flush()
+    db.session.rollback()
+    assert _versi_karyawan() == awal
+
+
+def test_etag_berubah_setelah_data_berubah(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'HTTP_CACHE_ENABLED', True)
+    pertama = client.get('/karyawan')
+    etag = pertama.headers['ETag']
+    assert client.get('/karyawan', headers={'If-None-Match': etag}).status_code == 304
+
+    with app.app_context():
+        db.session.add(_karyawan_baru('Versi D'))
+        db.session.commit()
+    response = client.get('/karyawan', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert b'Versi D' in response.data
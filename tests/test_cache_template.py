@@ -0,0 +1,64 @@
+import os
+
+import docx
+import pytest
+
+from models import db
+from models.karyawan import Karyawan
+from models.template_kontrak import TemplateKontrak
+from services.cache_template import TemplateCache
+from services.kontrak import buat_kontrak_batch
+from services.metrik import HASIL_CACHE_TEMPLATE
+
+
+def _buat_docx(path, teks):
+    dokumen = docx.Document()
+    dokumen.add_paragraph(teks)
+    dokumen.save(path)
+    return path
+
+
+def _teks_hasil(doc, env, context=None):
+    doc.render(context or {}, jinja_env=env)
+    return doc.docx.paragraphs[0].text
+
+
+def test_id_dipakai_ulang_untuk_file_lain_tidak_memakai_entri_lama(tmp_path):
+    cache = TemplateCache()
+    lama = _buat_docx(tmp_path / 'lama.docx', 'Template lama')
+    baru = _buat_docx(tmp_path / 'baru.docx', 'Template baru')
+    os.utime(baru, ns=(os.stat(lama).st_atime_ns, os.stat(lama).st_mtime_ns))
+
+    assert _teks_hasil(*cache.siapkan(7, lama)) == 'Template lama'
+    assert _teks_hasil(*cache.siapkan(7, lama)) == 'Template lama'
+    # Template 7 dihapus (di proses lain) lalu ID-nya dipakai template baru
+    assert _teks_hasil(*cache.siapkan(7, baru)) == 'Template baru'
+    assert cache.statistik() == {'hits': 1, 'misses': 2, 'size': 1, 'maxsize': 16}
+
+
+def _hasil_cache():
+    nilai = HASIL_CACHE_TEMPLATE.nilai()
+    return nilai.get(('hit',), 0), nilai.get(('miss',), 0)
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_hit_miss_batch_tercatat_di_proses_induk(app, buat_karyawan, tmp_path, processes):
+    buat_karyawan(6)
+    template = TemplateKontrak(nama_template=f'Tes {processes}',
+                               file_path=str(_buat_docx(tmp_path / 'kontrak.docx', 'Kontrak {{ nama }}')))
+    db.session.add(template)
+    db.session.commit()
+
+    hit_awal, miss_awal = _hasil_cache()
+    hasil = buat_kontrak_batch(Karyawan.query.order_by(Karyawan.id).all(), template, processes=processes)
+    assert hasil['berhasil'] == 6
+    hit, miss = _hasil_cache()
+    # Setiap render tercatat sekali; template dimuat sekali per proses render
+    assert (hit - hit_awal) + (miss - miss_awal) == 6
+    assert 1 <= miss - miss_awal <= processes
+
+
+def test_statistik_cache_template(client):
+    data = client.get('/template/cache').get_json()
+    assert {'hits', 'misses', 'proses_web', 'fragmen_html'} <= set(data)
+    assert 'invalidations' not in data['proses_web']
@@ -0,0 +1,89 @@
+import csv
+import os
+from datetime import date
+
+import openpyxl
+import pytest
+
+from models import db
+from models.karyawan import Karyawan
+from services.impor_excel import EXPECTED_HEADER, HeaderTidakValid, impor_karyawan_excel, simpan_laporan_kesalahan
+
+
+def _baris(nup, nik=None, **kolom):
+    data = dict(nama=f'Impor {nup}', jenis_kelamin='Perempuan', nup=nup, tempat_lahir='Bandung',
+                tanggal_lahir=date(1991, 2, 3), nik=nik or f'NIK-{nup}', alamat=None, no_hp=None,
+                jabatan='Staf', unit_kerja='Unit B', email=None, tanggal_mulai=date(2021, 1, 1),
+                tanggal_akhir_kontrak=None, gaji_honorarium=4_000_000, tunjangan_tetap=None, status=None)
+    data.update(kolom)
+    return [data[k] for k in EXPECTED_HEADER]
+
+
+def _buat_excel(path, baris, header=EXPECTED_HEADER):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(header)
+    for b in baris:
+        sheet.append(b)
+    workbook.save(path)
+    return str(path)
+
+
+def _pesan_per_baris(hasil):
+    return {baris: pesan for baris, _, _, pesan in hasil.kesalahan}
+
+
+def test_impor_mencatat_duplikat_dan_baris_tidak_valid(buat_karyawan, tmp_path):
+    buat_karyawan(nup='ADA-1', nik='NIK-ADA-1', email='ada@contoh.id')
+    path = _buat_excel(tmp_path / 'impor.xlsx', [
+        _baris('B-1'),                                    # baris 2: valid
+        _baris('B-2', email='dua@contoh.id'),             # baris 3: valid
+        _baris('B-1', nik='NIK-LAIN'),                    # baris 4: NUP duplikat di file
+        _baris('B-3', email='dua@contoh.id'),             # baris 5: email duplikat di file
+        _baris('ADA-1', nik='NIK-BARU'),                  # baris 6: NUP sudah ada di database
+        _baris('B-4', email='ada@contoh.id'),             # baris 7: email sudah ada di database
+        _baris('B-5', jenis_kelamin=None),                # baris 8: jenis kelamin kosong
+        _baris('B-6', tempat_lahir='  '),                 # baris 9: tempat lahir kosong
+        _baris('B-7', tanggal_lahir='bukan tanggal'),     # baris 10: tanggal salah
+        _baris('B-8', nama='x' * 200),                    # baris 11: nama terlalu panjang
+        _baris('B-9', gaji_honorarium=10 ** 12),          # baris 12: di luar INTEGER
+        [None] * len(EXPECTED_HEADER),                    # baris 13: kosong, diabaikan
+        _baris('B-10'),                                   # baris 14: valid
+    ])
+
+    hasil = impor_karyawan_excel(path)
+
+    assert (hasil.berhasil, hasil.duplikat, hasil.tidak_valid) == (3, 4, 5)
+    assert sorted(db.session.execute(db.select(Karyawan.nup).where(Karyawan.nup.like('B-%'))).scalars()) == \
+        ['B-1', 'B-10', 'B-2']
+    pesan = _pesan_per_baris(hasil)
+    assert set(pesan) == {4, 5, 6, 7, 8, 9, 10, 11, 12}
+    assert 'baris sebelumnya' in pesan[4] and 'baris sebelumnya' in pesan[5]
+    assert 'sudah ada' in pesan[6] and 'sudah ada' in pesan[7]
+    assert 'Jenis Kelamin' in pesan[8] and 'Tempat Lahir' in pesan[9]
+    assert 'Format data salah' in pesan[10]
+    assert 'nama lebih dari 150' in pesan[11]
+    assert 'gaji_honorarium' in pesan[12]
+
+    nama_file = simpan_laporan_kesalahan(hasil, str(tmp_path / 'laporan'))
+    with open(tmp_path / 'laporan' / nama_file, newline='', encoding='utf-8') as f:
+        laporan = list(csv.reader(f))
+    assert laporan[0] == ['baris', 'nup', 'nik', 'pesan']
+    assert [r[0] for r in laporan[1:]] == ['4', '5', '6', '7', '8', '9', '10', '11', '12']
+    assert laporan[1][1:3] == ['B-1', 'NIK-LAIN']
+
+
+def test_job_impor_tidak_gagal_karena_satu_baris(app, buat_karyawan, tmp_path, monkeypatch):
+    from services.impor_excel import job_impor_excel
+
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER_LAPORAN', str(tmp_path / 'laporan'))
+    path = _buat_excel(tmp_path / 'job.xlsx', [_baris('J-1'), _baris('J-2', jenis_kelamin=None), _baris('J-3')])
+    hasil = job_impor_excel({'path': path}, lambda *a: None)
+    assert (hasil['berhasil'], hasil['tidak_valid']) == (2, 1)
+    assert os.path.exists(tmp_path / 'laporan' / hasil['laporan'])
+
+
+def test_header_salah_ditolak(app_context, tmp_path):
+    path = _buat_excel(tmp_path / 'salah.xlsx', [], header=['nama', 'nup'])
+    with pytest.raises(HeaderTidakValid):
+        impor_karyawan_excel(path)
@@ -0,0 +1,130 @@
+"""
+Memastikan query yang benar-benar dijalankan aplikasi memakai index dari migrasi.
+
+Statement SQL direkam saat route/service dijalankan, lalu rencana eksekusinya diperiksa dengan
+EXPLAIN QUERY PLAN (SQLite) atau EXPLAIN (PostgreSQL). Tabel tes kecil, sehingga di PostgreSQL
+seq scan dimatikan untuk transaksi EXPLAIN: yang diperiksa adalah index bisa dipakai untuk
+bentuk query ini, bukan pilihan planner pada data sebenarnya.
+"""
+import re
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from models import db
+from services.referensi import _muat_unit_kerja
+from services.status_otomatis import check_and_update_statuses
+
+
+@contextmanager
+def rekam_query():
+    rekaman = []
+
+    def catat(conn, cursor, statement, parameters, context, executemany):
+        rekaman.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', catat)
+    try:
+        yield rekaman
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', catat)
+
+
+def cari_statement(rekaman, *pola):
+    """Statement pertama yang cocok dengan semua regex `pola`."""
+    for statement, parameters in rekaman:
+        if all(re.search(p, statement, re.IGNORECASE | re.DOTALL) for p in pola):
+            return statement, parameters
+    raise AssertionError(f'Tidak ada statement yang cocok dengan {pola}')
+
+
+def rencana(statement, parameters):
+    """Rencana eksekusi `statement` sebagai satu string."""
+    with db.engine.connect() as conn:
+        if conn.dialect.name == 'sqlite':
+            baris = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, tuple(parameters)).all()
+            return '\n'.join(b[-1] for b in baris)
+        with conn.begin():
+            conn.execute(text('SET LOCAL enable_seqscan = off'))
+            baris = conn.exec_driver_sql('EXPLAIN ' + statement, parameters).all()
+            return '\n'.join(b[0] for b in baris)
+
+
+@pytest.fixture
+def data_karyawan(app, buat_karyawan):
+    hari_ini = date.today()
+    for i in range(20):
+        buat_karyawan(10, unit_kerja=f'Unit {i % 5}', tanggal_akhir_kontrak=hari_ini + timedelta(days=i * 20 - 60),
+                      tindak_lanjut_kontrak='Tidak diperpanjang' if i % 4 == 0 else 'Tidak perlu',
+                      status='Aktif' if i % 3 else 'Nonaktif')
+    # Statistik tabel seperti pada database yang sudah berisi data
+    with db.engine.begin() as conn:
+        conn.execute(text('ANALYZE'))
+
+
+def test_dashboard_memakai_index(client, data_karyawan):
+    with rekam_query() as rekaman:
+        assert client.get('/dashboard').status_code == 200
+
+    # Daftar karyawan aktif: WHERE status = 'Aktif' ORDER BY nama, id LIMIT ...
+    daftar = cari_statement(rekaman, r'FROM karyawan', r"status = ", r'ORDER BY karyawan\.nama, karyawan\.id')
+    assert 'ix_karyawan_aktif_nama_id' in rencana(*daftar)
+
+    # Kontrak akan habis: WHERE tanggal_akhir_kontrak BETWEEN ... AND status = 'Aktif'
+    akan_habis = cari_statement(rekaman, r'FROM karyawan', r'ORDER BY karyawan\.tanggal_akhir_kontrak')
+    assert 'ix_karyawan_status_akhir_kontrak' in rencana(*akan_habis)
+
+
+def test_daftar_karyawan_memakai_index_keyset(client, data_karyawan):
+    with rekam_query() as rekaman:
+        assert client.get('/karyawan').status_code == 200
+    daftar = cari_statement(rekaman, r'FROM karyawan', r'ORDER BY karyawan\.nama, karyawan\.id')
+    assert 'ix_karyawan_nama_id' in rencana(*daftar)
+
+
+def test_update_status_otomatis_memakai_index(app_context, data_karyawan):
+    with rekam_query() as rekaman:
+        check_and_update_statuses()
+    nonaktif = cari_statement(rekaman, r'^UPDATE karyawan SET status')
+    tindak_lanjut = cari_statement(rekaman, r'^UPDATE karyawan SET tindak_lanjut_kontrak')
+    # Kedua index komposit cocok untuk transisi ke Nonaktif; planner boleh memilih salah satunya
+    assert re.search(r'ix_karyawan_(tindak_lanjut|status)_akhir_kontrak', rencana(*nonaktif))
+    assert 'ix_karyawan_tindak_lanjut_akhir_kontrak' in rencana(*tindak_lanjut)
+
+
+def test_dropdown_unit_kerja_memakai_index(app_context, data_karyawan):
+    with rekam_query() as rekaman:
+        assert list(_muat_unit_kerja()) == [f'Unit {i}' for i in range(5)]
+    assert 'ix_karyawan_unit_kerja' in rencana(*cari_statement(rekaman, r'DISTINCT karyawan\.unit_kerja'))
+
+
+def test_dokumen_per_karyawan_memakai_index(client, data_karyawan):
+    from models.dokumen import Dokumen
+    from models.karyawan import Karyawan
+
+    karyawan_id = db.session.query(Karyawan.id).order_by(Karyawan.id).first()[0]
+    db.session.add_all([Dokumen(karyawan_id=karyawan_id, jenis='KTP', file_path=f'/tmp/{i}.pdf',
+                                tanggal_upload=date.today()) for i in range(3)])
+    db.session.commit()
+
+    with rekam_query() as rekaman:
+        assert client.get(f'/karyawan/detail/{karyawan_id}').status_code == 200
+    assert 'ix_dokumen_karyawan_id' in rencana(*cari_statement(rekaman, r'FROM dokumen', r'karyawan_id IN'))
+
+
+def test_pencarian_memakai_index_teks(client, data_karyawan):
+    with rekam_query() as rekaman:
+        assert client.get('/dashboard?search=Karyawan 01').status_code == 200
+    statement = cari_statement(rekaman, r'FROM karyawan', r'(karyawan_fts|ILIKE|lower)',
+                               r'ORDER BY karyawan\.nama, karyawan\.id')
+    plan = rencana(*statement)
+    if db.engine.dialect.name == 'sqlite':
+        if 'karyawan_fts' not in statement[0]:
+            pytest.skip('SQLite tanpa FTS5')
+        assert 'VIRTUAL TABLE INDEX' in plan
+    else:
+        if 'ILIKE' not in statement[0].upper():
+            pytest.skip('pg_trgm tidak tersedia')
+        assert re.search(r'ix_karyawan_(nama|nup|jabatan)_trgm', plan)
@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+
+from models import db
+from models.dokumen import Dokumen
+from services.instrumentasi import TerlaluBanyakQuery
+from tests.conftest import KonfigurasiTes
+
+
+def _tambah_dokumen(karyawan_id, jumlah):
+    db.session.add_all([Dokumen(karyawan_id=karyawan_id, jenis='KTP', file_path=f'/tmp/tidak-ada-{i}.pdf',
+                                tanggal_upload=date.today()) for i in range(jumlah)])
+    db.session.commit()
+
+
+def _jumlah_query(response):
+    return int(response.headers['X-Query-Count'])
+
+
+def test_detail_karyawan_tanpa_n_plus_1(client, buat_karyawan):
+    satu, banyak = buat_karyawan(2)
+    _tambah_dokumen(satu, 1)
+    _tambah_dokumen(banyak, 30)
+
+    # Request pertama mengisi cache per proses (daftar unit kerja, backend pencarian)
+    client.get(f'/karyawan/detail/{satu}')
+    r_satu = client.get(f'/karyawan/detail/{satu}')
+    r_banyak = client.get(f'/karyawan/detail/{banyak}')
+    assert r_satu.status_code == r_banyak.status_code == 200
+    # Dokumen dimuat dengan satu query IN, berapa pun jumlahnya
+    assert _jumlah_query(r_banyak) == _jumlah_query(r_satu)
+
+
+def test_hapus_karyawan_tanpa_n_plus_1(client, buat_karyawan):
+    satu, banyak = buat_karyawan(2)
+    _tambah_dokumen(satu, 1)
+    _tambah_dokumen(banyak, 30)
+
+    r_satu = client.post(f'/karyawan/hapus/{satu}')
+    r_banyak = client.post(f'/karyawan/hapus/{banyak}')
+    assert r_satu.status_code == r_banyak.status_code == 302
+    assert _jumlah_query(r_banyak) == _jumlah_query(r_satu)
+    assert db.session.query(Dokumen).count() == 0
+
+
+class KonfigurasiBatasKetat(KonfigurasiTes):
+    SQL_QUERY_LIMIT = 1
+
+
+@pytest.fixture
+def app_batas_ketat(app):
+    # Database yang sama dengan fixture `app` (skema sudah dibuat), batas query sangat kecil
+    from app import create_app
+
+    aplikasi = create_app(KonfigurasiBatasKetat)
+    yield aplikasi
+    with aplikasi.app_context():
+        db.engine.dispose()
+
+
+def _client_login(aplikasi):
+    c = aplikasi.test_client()
+    with c.session_transaction() as sesi:
+        sesi['user_id'] = 1
+        sesi['username'] = 'admin'
+    return c
+
+
+def test_melebihi_batas_query_gagal(app_batas_ketat, buat_karyawan):
+    karyawan_id = buat_karyawan()[0]
+    with pytest.raises(TerlaluBanyakQuery, match='SQL_QUERY_LIMIT|batas 1'):
+        _client_login(app_batas_ketat).get(f'/karyawan/detail/{karyawan_id}')
+
+
+def test_melebihi_batas_query_dicatat(app_batas_ketat, buat_karyawan, monkeypatch, caplog):
+    monkeypatch.setitem(app_batas_ketat.config, 'SQL_QUERY_LIMIT_RAISE', False)
+    karyawan_id = buat_karyawan()[0]
+    response = _client_login(app_batas_ketat).get(f'/karyawan/detail/{karyawan_id}')
+    assert response.status_code == 200
+    assert _jumlah_query(response) > 1
+    assert any('kemungkinan N+1' in record.getMessage() for record in caplog.records)
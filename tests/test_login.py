@@ -0,0 +1,59 @@
+import pytest
+
+from models import db
+from services.pembatas_login import pembatas_login, pembatas_login_ip
+from tests.conftest import KonfigurasiTes
+
+
+class KonfigurasiProxy(KonfigurasiTes):
+    LOGIN_RATE_LIMIT = 3
+    LOGIN_RATE_LIMIT_IP = 5
+    PROXY_FIX_X_FOR = 1
+
+
+@pytest.fixture
+def buat_app_login(app):
+    """buat_app_login(**config): aplikasi dengan pembatas login aktif, pada database yang sama."""
+    from app import create_app
+
+    dibuat = []
+
+    def buat(**config):
+        aplikasi = create_app(type('KonfigurasiLogin', (KonfigurasiProxy,), config))
+        dibuat.append(aplikasi)
+        return aplikasi
+
+    yield buat
+    # Pembatas dipakai bersama semua aplikasi di proses ini: kembalikan seperti konfigurasi tes biasa
+    for pembatas in (pembatas_login, pembatas_login_ip):
+        pembatas.reset()
+        pembatas.batas = 0
+    for aplikasi in dibuat:
+        with aplikasi.app_context():
+            db.engine.dispose()
+
+
+def _login_gagal(client, username, ip):
+    return client.post('/login', data={'username': username, 'password': 'salah'},
+                       headers={'X-Forwarded-For': ip}).status_code
+
+
+def test_ip_klien_dari_proxy_dipakai_sebagai_kunci(buat_app_login):
+    client = buat_app_login().test_client()
+    assert [_login_gagal(client, 'admin', '203.0.113.1') for _ in range(4)] == [200, 200, 200, 429]
+    # Username yang sama dari IP lain tidak ikut terkunci
+    assert _login_gagal(client, 'admin', '203.0.113.2') == 200
+
+
+def test_tanpa_proxy_fix_header_diabaikan(buat_app_login):
+    client = buat_app_login(PROXY_FIX_X_FOR=0).test_client()
+    hasil = [_login_gagal(client, 'admin', f'203.0.113.{i}') for i in range(4)]
+    # Semua percobaan dihitung untuk remote_addr yang sama; X-Forwarded-For palsu tidak membantu
+    assert hasil == [200, 200, 200, 429]
+
+
+def test_batas_per_ip_untuk_banyak_username(buat_app_login):
+    client = buat_app_login().test_client()
+    hasil = [_login_gagal(client, f'user{i}', '203.0.113.9') for i in range(6)]
+    assert hasil == [200] * 5 + [429]
+    assert _login_gagal(client, 'user99', '203.0.113.10') == 200
@@ -0,0 +1,60 @@
+import json
+import os
+import time
+
+import pytest
+
+from services.antrian import worker_loop
+from services.metrik import DURASI_RENDER_DOCX, render_prometheus
+
+
+@pytest.fixture
+def folder_metrik(app):
+    folder = app.config['METRICS_DIR']
+    os.makedirs(folder, exist_ok=True)
+    for nama in os.listdir(folder):
+        os.remove(os.path.join(folder, nama))
+    return folder
+
+
+def _tulis_snapshot_worker(folder, nama, waktu=None):
+    # Snapshot seperti yang ditulis worker antrian yang sudah merender dua kontrak
+    jumlah_bucket = [0] * len(DURASI_RENDER_DOCX.bucket)
+    for i, batas in enumerate(DURASI_RENDER_DOCX.bucket):
+        jumlah_bucket[i] = 2 if 0.5 <= batas else 0
+    data = {'proses': nama, 'waktu': time.time() if waktu is None else waktu,
+            'metrik': {DURASI_RENDER_DOCX.nama: [[['tes-99'], [jumlah_bucket, 0.8, 2]]]}}
+    with open(os.path.join(folder, f'{nama}.json'), 'w') as f:
+        json.dump(data, f)
+
+
+def test_metrik_worker_dijumlahkan_di_endpoint(client, folder_metrik):
+    _tulis_snapshot_worker(folder_metrik, 'worker-a')
+    _tulis_snapshot_worker(folder_metrik, 'worker-b')
+    _tulis_snapshot_worker(folder_metrik, 'worker-mati', waktu=time.time() - 10 ** 6)
+
+    teks = client.get('/metrics').get_data(as_text=True)
+    assert 'hr_docx_render_duration_seconds_count{template_id="tes-99"} 4' in teks
+    assert 'hr_docx_render_duration_seconds_sum{template_id="tes-99"} 1.6' in teks
+    assert 'hr_docx_render_duration_seconds_bucket{template_id="tes-99",le="0.25"} 0' in teks
+    assert 'hr_docx_render_duration_seconds_bucket{template_id="tes-99",le="+Inf"} 4' in teks
+
+
+def test_worker_menulis_snapshot(app, app_context, bersihkan_data, folder_metrik):
+    worker_loop(sekali=True)
+    file = os.listdir(folder_metrik)
+    assert len(file) == 1
+    with open(os.path.join(folder_metrik, file[0])) as f:
+        data = json.load(f)
+    assert DURASI_RENDER_DOCX.nama in data['metrik']
+    assert render_prometheus(folder_metrik).count('# TYPE hr_docx_render_duration_seconds histogram') == 1
+
+
+def test_token_metrik(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'rahasia')
+    tanpa_login = app.test_client()
+    assert tanpa_login.get('/metrics').status_code == 401
+    assert tanpa_login.get('/metrics', headers={'Authorization': 'Bearer salah'}).status_code == 401
+    response = tanpa_login.get('/metrics', headers={'Authorization': 'Bearer rahasia'})
+    assert response.status_code == 200
+    assert '# TYPE hr_http_request_duration_seconds histogram' in response.get_data(as_text=True)
@@ -0,0 +1,67 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from models import db
+from models.nomor_kontrak import NomorKontrakCounter
+from services.kontrak import alokasi_nomor_kontrak, format_nomor_kontrak
+
+JUMLAH_THREAD = 8
+ALOKASI_PER_THREAD = 25
+
+
+def _alokasi_paralel(app, ukuran_blok):
+    """Menjalankan alokasi_nomor_kontrak dari banyak thread sekaligus; mengembalikan semua nomor."""
+    mulai = threading.Barrier(JUMLAH_THREAD)
+    hasil, galat = [], []
+    lock = threading.Lock()
+
+    def kerja(indeks):
+        with app.app_context():
+            try:
+                mulai.wait()
+                for i in range(ALOKASI_PER_THREAD):
+                    nomor = alokasi_nomor_kontrak(ukuran_blok(indeks, i))
+                    with lock:
+                        hasil.extend(nomor)
+            except Exception as e:  # pragma: no cover - dilaporkan oleh assert di bawah
+                galat.append(e)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=kerja, args=(i,)) for i in range(JUMLAH_THREAD)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not galat
+    return hasil
+
+
+@pytest.mark.parametrize('returning', [True, False], ids=['update-returning', 'update-lalu-select'])
+def test_alokasi_paralel_tanpa_nomor_ganda(app, bersihkan_data, monkeypatch, returning):
+    if not returning:
+        with app.app_context():
+            # Jalur SQLite lama (< 3.35) tanpa UPDATE ... RETURNING
+            monkeypatch.setattr(db.engine.dialect, 'update_returning', False)
+
+    # Campuran alokasi satu nomor dan blok untuk batch, dimulai saat baris counter tahun ini belum ada
+    hasil = _alokasi_paralel(app, lambda indeks, i: 1 + (indeks + i) % 4)
+
+    total = sum(1 + (indeks + i) % 4 for indeks in range(JUMLAH_THREAD) for i in range(ALOKASI_PER_THREAD))
+    assert len(hasil) == total
+    assert len(set(hasil)) == total
+    # Tanpa celah: nomor 1..total semuanya terpakai
+    tahun = datetime.now()
+    assert set(hasil) == {format_nomor_kontrak(n, tahun.strftime('%y')) for n in range(1, total + 1)}
+    with app.app_context():
+        assert db.session.get(NomorKontrakCounter, tahun.year).nilai == total
+
+
+def test_blok_nomor_berurutan(app_context, bersihkan_data):
+    pertama = alokasi_nomor_kontrak(3)
+    kedua = alokasi_nomor_kontrak(2)
+    tahun = datetime.now().strftime('%y')
+    assert pertama == [format_nomor_kontrak(n, tahun) for n in (1, 2, 3)]
+    assert kedua == [format_nomor_kontrak(n, tahun) for n in (4, 5)]
@@ -0,0 +1,65 @@
+import base64
+import json
+
+import pytest
+
+from models.karyawan import Karyawan
+from services.paginasi import CursorTidakValid, decode_cursor, encode_cursor
+
+
+def _cursor_mentah(nilai):
+    return base64.urlsafe_b64encode(json.dumps(nilai).encode()).decode().rstrip('=')
+
+
+CURSOR_RUSAK = [
+    _cursor_mentah({'nama': 'A', 'id': 1}),
+    _cursor_mentah([['A'], 1]),
+    _cursor_mentah(['A', {'$gt': 1}]),
+    _cursor_mentah(['A', 10 ** 30]),
+    _cursor_mentah(['A', True]),
+    _cursor_mentah(['A', 1.5]),
+    _cursor_mentah([1, 1]),
+    _cursor_mentah(['x' * 1000, 1]),
+    _cursor_mentah(['A']),
+    'bukan-base64!!',
+]
+
+
+@pytest.mark.parametrize('cursor', CURSOR_RUSAK)
+def test_decode_cursor_menolak_tipe_salah(cursor):
+    with pytest.raises(CursorTidakValid):
+        decode_cursor(cursor, (Karyawan.nama, Karyawan.id))
+
+
+def test_decode_cursor_kebalikan_encode():
+    assert decode_cursor(encode_cursor(('Budi', 2 ** 63 - 1)), (Karyawan.nama, Karyawan.id)) == ('Budi', 2 ** 63 - 1)
+    assert decode_cursor('', (Karyawan.nama, Karyawan.id)) is None
+
+
+@pytest.mark.parametrize('cursor', CURSOR_RUSAK)
+@pytest.mark.parametrize('url', ['/dashboard', '/karyawan'])
+def test_halaman_html_mengabaikan_cursor_rusak(client, buat_karyawan, url, cursor):
+    buat_karyawan(3)
+    for param in ('after', 'before'):
+        response = client.get(url, query_string={param: cursor})
+        # Dianggap tanpa cursor: halaman pertama
+        assert response.status_code == 200
+        assert b'Karyawan 0001' in response.data
+
+
+@pytest.mark.parametrize('cursor', CURSOR_RUSAK)
+def test_api_menolak_cursor_rusak(client, buat_karyawan, cursor):
+    buat_karyawan(3)
+    response = client.get('/api/v1/karyawan', query_string={'after': cursor})
+    assert response.status_code == 400
+    assert 'Cursor' in response.get_json()['error']
+
+
+def test_api_navigasi_cursor(client, buat_karyawan):
+    buat_karyawan(5)
+    pertama = client.get('/api/v1/karyawan?per_page=2&fields=nama').get_json()
+    kedua = client.get(pertama['paging']['next']).get_json()
+    assert [k['nama'] for k in pertama['data']] == ['Karyawan 0001', 'Karyawan 0002']
+    assert [k['nama'] for k in kedua['data']] == ['Karyawan 0003', 'Karyawan 0004']
+    kembali = client.get(kedua['paging']['prev']).get_json()
+    assert kembali['data'] == pertama['data']
@@ -0,0 +1,122 @@
+"""
+Penyimpanan blob dokumen: file dengan isi sama disimpan sekali, jumlah_referensi mengikuti jumlah
+dokumen, dan file fisik hanya dihapus saat referensi terakhir hilang atau transaksinya dibatalkan.
+"""
+import hashlib
+import io
+import os
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from werkzeug.datastructures import FileStorage
+
+from models import db
+from models.blob_dokumen import BlobDokumen
+from models.dokumen import Dokumen
+from models.karyawan import Karyawan
+from services.penyimpanan import (buang_blob_yatim, hapus_beserta_dokumen, hapus_file, path_blob,
+                                  simpan_blob)
+
+
+@pytest.fixture
+def isi():
+    """Isi file acak per tes, agar blob dari tes lain di folder yang sama tidak ikut terhitung."""
+    data = os.urandom(50_000)
+    return data, hashlib.sha256(data).hexdigest()
+
+
+def _unggah(client, karyawan_id, data, nama='ktp.pdf'):
+    response = client.post(f'/dokumen/upload/{karyawan_id}', content_type='multipart/form-data',
+                           data={'jenis_dokumen': 'KTP', 'file': (io.BytesIO(data), nama)})
+    assert response.status_code == 302
+
+
+def _referensi(sha256):
+    db.session.expire_all()
+    blob = db.session.get(BlobDokumen, sha256)
+    return blob.jumlah_referensi if blob else None
+
+
+def test_dua_dokumen_berbagi_blob(client, buat_karyawan, isi):
+    data, sha256 = isi
+    id_a, id_b = buat_karyawan(2)
+    _unggah(client, id_a, data, 'ktp-a.pdf')
+    _unggah(client, id_b, data, 'ktp-b.pdf')
+
+    dokumen = db.session.query(Dokumen).filter_by(blob_sha256=sha256).order_by(Dokumen.id).all()
+    assert [d.nama_file for d in dokumen] == ['ktp-a.pdf', 'ktp-b.pdf']
+    assert {d.file_path for d in dokumen} == {path_blob(sha256)}
+    assert _referensi(sha256) == 2
+    with open(path_blob(sha256), 'rb') as f:
+        assert f.read() == data
+
+    # Satu dokumen dihapus: blob masih dipakai dokumen lain
+    assert hapus_beserta_dokumen(dokumen[0], [dokumen[0]]) == []
+    db.session.commit()
+    assert _referensi(sha256) == 1
+    assert os.path.exists(path_blob(sha256))
+
+    # Referensi terakhir: baris blob dihapus dan path file dikembalikan untuk dihapus setelah commit
+    terakhir = db.session.get(Dokumen, dokumen[1].id)
+    file_dihapus = hapus_beserta_dokumen(terakhir, [terakhir])
+    db.session.commit()
+    assert file_dihapus == [path_blob(sha256)]
+    assert _referensi(sha256) is None
+    hapus_file(file_dihapus)
+    assert not os.path.exists(path_blob(sha256))
+
+
+def test_hapus_karyawan_menghapus_file_pada_referensi_terakhir(client, buat_karyawan, isi):
+    data, sha256 = isi
+    id_a, id_b = buat_karyawan(2)
+    _unggah(client, id_a, data)
+    _unggah(client, id_a, data, 'ktp-lagi.pdf')
+    _unggah(client, id_b, data)
+    assert _referensi(sha256) == 3
+
+    assert client.post(f'/karyawan/hapus/{id_a}').status_code == 302
+    assert db.session.get(Karyawan, id_a) is None
+    assert _referensi(sha256) == 1
+    assert os.path.exists(path_blob(sha256))
+
+    assert client.post(f'/karyawan/hapus/{id_b}').status_code == 302
+    assert _referensi(sha256) is None
+    assert not os.path.exists(path_blob(sha256))
+
+
+def test_rollback_blob_baru_tidak_meninggalkan_file(app_context, bersihkan_data, isi):
+    data, sha256 = isi
+    assert simpan_blob(FileStorage(io.BytesIO(data), 'ktp.pdf')) == sha256
+    assert os.path.exists(path_blob(sha256))
+    db.session.rollback()
+    buang_blob_yatim(sha256)
+    assert _referensi(sha256) is None
+    assert not os.path.exists(path_blob(sha256))
+
+
+def test_rollback_blob_lama_tidak_mengubah_referensi(app_context, bersihkan_data, isi):
+    data, sha256 = isi
+    simpan_blob(FileStorage(io.BytesIO(data), 'ktp.pdf'))
+    db.session.commit()
+
+    simpan_blob(FileStorage(io.BytesIO(data), 'ktp-lagi.pdf'))
+    assert _referensi(sha256) == 2
+    db.session.rollback()
+    buang_blob_yatim(sha256)
+    assert _referensi(sha256) == 1
+    assert os.path.exists(path_blob(sha256))
+
+
+def test_unggahan_gagal_commit_dibersihkan(client, buat_karyawan, isi, monkeypatch):
+    data, sha256 = isi
+    karyawan_id = buat_karyawan()[0]
+
+    def commit_gagal():
+        raise OperationalError('COMMIT', {}, Exception('database is locked'))
+
+    monkeypatch.setattr(db.session, 'commit', commit_gagal)
+    _unggah(client, karyawan_id, data)
+    monkeypatch.undo()
+    assert db.session.query(Dokumen).filter_by(karyawan_id=karyawan_id).count() == 0
+    assert _referensi(sha256) is None
+    assert not os.path.exists(path_blob(sha256))
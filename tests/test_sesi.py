@@ -0,0 +1,103 @@
+import os
+import time
+
+import pytest
+from flask import flash
+
+from models import db
+from services.sesi import PenyimpananSesiFile, PenyimpananSesiSQLite, ringkas_pesan_flash
+from tests.conftest import KonfigurasiTes
+
+
+def _ringkasan(kategori, jumlah):
+    return f'[{jumlah} tersembunyi]'
+
+
+def test_ringkasan_menyimpan_pesan_terbaru_dan_jumlah_tepat():
+    tersembunyi = {}
+    pesan = [('info', f'p{i}') for i in range(1, 8)] + [('danger', 'gagal')]
+    hasil = ringkas_pesan_flash(pesan, 3, tersembunyi, _ringkasan)
+    assert hasil == [('info', '[5 tersembunyi]'), ('info', 'p6'), ('info', 'p7'), ('danger', 'gagal')]
+    assert tersembunyi['info']['pesan'] == ['p1', 'p2', 'p3', 'p4', 'p5']
+
+    # Diringkas lagi setelah pesan baru masuk: ringkasan lama dihitung sesuai jumlah yang diwakilinya
+    hasil = ringkas_pesan_flash(hasil + [('info', 'p8'), ('info', 'p9')], 3, tersembunyi, _ringkasan)
+    assert hasil == [('info', '[7 tersembunyi]'), ('info', 'p8'), ('info', 'p9'), ('danger', 'gagal')]
+    assert tersembunyi['info']['jumlah'] == 7
+    assert tersembunyi['info']['pesan'] == ['p1', 'p2', 'p3', 'p4', 'p5', 'p6', 'p7']
+
+
+def test_tidak_diringkas_jika_di_bawah_batas():
+    assert ringkas_pesan_flash([('info', 'a'), ('info', 'b')], 2, {}, _ringkasan) is None
+
+
+@pytest.fixture
+def client_flash(app, bersihkan_data):
+    """Client untuk aplikasi dengan rute /tes-flash/<n> yang mem-flash n pesan."""
+    from app import create_app
+
+    aplikasi = create_app(KonfigurasiTes)
+
+    def tes_flash(n):
+        for i in range(1, n + 1):
+            flash(f'Pesan {i:02d}', 'info')
+        return 'ok'
+
+    aplikasi.add_url_rule('/tes-flash/<int:n>', view_func=tes_flash)
+    c = aplikasi.test_client()
+    with c.session_transaction() as sesi:
+        sesi['user_id'] = 1
+        sesi['username'] = 'admin'
+    yield c
+    with aplikasi.app_context():
+        db.engine.dispose()
+
+
+def test_ringkasan_berulang_dan_halaman_pesan(client_flash):
+    client_flash.get('/tes-flash/7')
+    client_flash.get('/tes-flash/7')
+    halaman = client_flash.get('/dashboard').get_data(as_text=True)
+    # 14 pesan, batas 5: 4 pesan terbaru ditampilkan, 10 sisanya diringkas
+    assert '10 pesan sebelumnya tidak ditampilkan' in halaman
+    assert all(f'Pesan {i:02d}' in halaman for i in (4, 5, 6, 7))
+    assert 'Pesan 03' not in halaman
+
+    laporan = client_flash.get('/pesan').get_data(as_text=True)
+    assert 'info (10 pesan)' in laporan
+    assert laporan.count('Pesan 0') + laporan.count('Pesan 1') == 10
+    # Ringkasan sudah ditampilkan, jadi tidak muncul lagi
+    assert 'tidak ditampilkan' not in client_flash.get('/dashboard').get_data(as_text=True)
+
+
+def test_sesi_file_yang_hanya_dibaca_tidak_kedaluwarsa(tmp_path):
+    penyimpanan = PenyimpananSesiFile(str(tmp_path), umur=3600)
+    penyimpanan.simpan('sid-aktif', b'{"user_id": 1}')
+    path = penyimpanan._path('sid-aktif')
+
+    # Ditulis 50 menit lalu dan sejak itu hanya dibaca: masa berlakunya dihitung ulang dari sekarang
+    lama = time.time() - 3000
+    os.utime(path, (lama, lama))
+    assert penyimpanan.baca('sid-aktif') == b'{"user_id": 1}'
+    assert os.path.getmtime(path) > time.time() - 5
+
+    lama = time.time() - 3601
+    os.utime(path, (lama, lama))
+    assert penyimpanan.baca('sid-aktif') is None
+    assert not os.path.exists(path)
+
+
+def test_sesi_sqlite_yang_hanya_dibaca_tidak_kedaluwarsa(tmp_path):
+    penyimpanan = PenyimpananSesiSQLite(str(tmp_path / 'sesi.db'), umur=3600)
+    penyimpanan.simpan('sid-aktif', b'{"user_id": 1}')
+
+    def kedaluwarsa():
+        return penyimpanan._koneksi().execute('SELECT kedaluwarsa FROM sesi').fetchone()[0]
+
+    with penyimpanan._koneksi() as conn:
+        conn.execute('UPDATE sesi SET kedaluwarsa = ?', (time.time() + 600,))
+    assert penyimpanan.baca('sid-aktif') == b'{"user_id": 1}'
+    assert kedaluwarsa() > time.time() + 3595
+
+    with penyimpanan._koneksi() as conn:
+        conn.execute('UPDATE sesi SET kedaluwarsa = ?', (time.time() - 1,))
+    assert penyimpanan.baca('sid-aktif') is None
@@ -0,0 +1,129 @@
+"""Update status karyawan otomatis: UPDATE berbasis himpunan dan penanda sekali per hari di riwayat_jadwal."""
+import re
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+
+import services.status_otomatis as status_otomatis
+from models import db
+from models.karyawan import Karyawan
+from models.riwayat_jadwal import RiwayatJadwal
+from services.status_otomatis import (NAMA_JOB_UPDATE_STATUS, check_and_update_statuses,
+                                      jalankan_update_status_harian)
+from tests.test_index import rekam_query
+
+HARI_INI = date(2026, 3, 10)
+
+
+def _status(ids):
+    db.session.expire_all()
+    return [(k.status, k.tindak_lanjut_kontrak) for k in (db.session.get(Karyawan, id) for id in ids)]
+
+
+def _riwayat():
+    db.session.expire_all()
+    return RiwayatJadwal.query.filter_by(nama_job=NAMA_JOB_UPDATE_STATUS).all()
+
+
+def _gagal(today=None):
+    # Seperti check_and_update_statuses: rollback lalu melempar ulang
+    db.session.rollback()
+    raise RuntimeError('database is locked')
+
+
+def test_update_status_berbasis_himpunan(buat_karyawan):
+    kemarin, besok = HARI_INI - timedelta(days=1), HARI_INI + timedelta(days=1)
+    habis, = buat_karyawan(tindak_lanjut_kontrak='Tidak diperpanjang', tanggal_akhir_kontrak=kemarin)
+    belum_habis, = buat_karyawan(tindak_lanjut_kontrak='Tidak diperpanjang', tanggal_akhir_kontrak=besok)
+    sudah_nonaktif, = buat_karyawan(tindak_lanjut_kontrak='Tidak diperpanjang', tanggal_akhir_kontrak=kemarin,
+                                    status='Nonaktif')
+    batas_90, = buat_karyawan(tanggal_akhir_kontrak=HARI_INI + timedelta(days=90))
+    lewat_90, = buat_karyawan(tanggal_akhir_kontrak=HARI_INI + timedelta(days=91))
+    tanpa_akhir, = buat_karyawan(tanggal_akhir_kontrak=None)
+    sedang_diproses, = buat_karyawan(tindak_lanjut_kontrak='Dalam proses perpanjangan kontrak',
+                                     tanggal_akhir_kontrak=besok)
+
+    with rekam_query() as rekaman:
+        hasil = check_and_update_statuses(HARI_INI)
+    assert hasil == {'dinonaktifkan': 1, 'ditindaklanjuti': 1}
+
+    # Dua UPDATE ... WHERE, tanpa memuat baris karyawan
+    statement = [s for s, _ in rekaman if not re.match(r'\s*(SAVEPOINT|RELEASE)', s)]
+    assert len(statement) == 2
+    assert all(s.lstrip().upper().startswith('UPDATE KARYAWAN') for s in statement)
+
+    assert _status([habis, belum_habis, sudah_nonaktif, batas_90, lewat_90, tanpa_akhir, sedang_diproses]) == [
+        ('Nonaktif', 'Tidak diperpanjang'),
+        ('Aktif', 'Tidak diperpanjang'),
+        ('Nonaktif', 'Tidak diperpanjang'),
+        ('Aktif', 'Belum ditindaklanjuti'),
+        ('Aktif', 'Tidak perlu'),
+        ('Aktif', 'Tidak perlu'),
+        ('Aktif', 'Dalam proses perpanjangan kontrak'),
+    ]
+
+
+def test_sekali_per_hari(buat_karyawan):
+    buat_karyawan(tanggal_akhir_kontrak=HARI_INI + timedelta(days=10))
+    riwayat = jalankan_update_status_harian(HARI_INI)
+    assert riwayat.baris_terdampak == 1
+    assert riwayat.keterangan == 'dinonaktifkan=0, ditindaklanjuti=1'
+    assert riwayat.durasi_ms is not None
+
+    assert jalankan_update_status_harian(HARI_INI) is None
+
+    # paksa menjalankan ulang dengan baris riwayat yang sama
+    ulang = jalankan_update_status_harian(HARI_INI, paksa=True)
+    assert ulang.id == riwayat.id
+    assert ulang.keterangan == 'dinonaktifkan=0, ditindaklanjuti=0'
+
+    assert jalankan_update_status_harian(HARI_INI + timedelta(days=1)) is not None
+    assert sorted(r.tanggal for r in _riwayat()) == [HARI_INI, HARI_INI + timedelta(days=1)]
+
+
+def test_klaim_bentrok_dengan_proses_lain(app_context, bersihkan_data, monkeypatch):
+    """Proses lain mengklaim hari yang sama di antara SELECT dan INSERT: IntegrityError, job tidak dijalankan."""
+    dijalankan = []
+    monkeypatch.setattr(status_otomatis, 'check_and_update_statuses', dijalankan.append)
+
+    def klaim_proses_lain(session):
+        with db.engine.begin() as conn:
+            conn.execute(insert(RiwayatJadwal).values(nama_job=NAMA_JOB_UPDATE_STATUS, tanggal=HARI_INI,
+                                                      keterangan='proses lain'))
+
+    sesi = db.session()
+    event.listen(sesi, 'before_commit', klaim_proses_lain, once=True)
+    try:
+        assert jalankan_update_status_harian(HARI_INI) is None
+    finally:
+        if event.contains(sesi, 'before_commit', klaim_proses_lain):
+            event.remove(sesi, 'before_commit', klaim_proses_lain)
+    assert dijalankan == []
+    assert [r.keterangan for r in _riwayat()] == ['proses lain']
+
+
+def test_gagal_melepas_klaim_baru(app_context, bersihkan_data, monkeypatch):
+    monkeypatch.setattr(status_otomatis, 'check_and_update_statuses', _gagal)
+    with pytest.raises(RuntimeError):
+        jalankan_update_status_harian(HARI_INI)
+    # Klaim dilepas, sehingga putaran scheduler berikutnya mencoba lagi
+    assert _riwayat() == []
+
+
+def test_gagal_saat_paksa_tidak_menghapus_riwayat(buat_karyawan, monkeypatch):
+    buat_karyawan(tanggal_akhir_kontrak=HARI_INI + timedelta(days=10))
+    riwayat_id = jalankan_update_status_harian(HARI_INI).id
+
+    monkeypatch.setattr(status_otomatis, 'check_and_update_statuses', _gagal)
+    with pytest.raises(RuntimeError):
+        jalankan_update_status_harian(HARI_INI, paksa=True)
+
+    riwayat, = _riwayat()
+    assert riwayat.id == riwayat_id
+    assert riwayat.baris_terdampak == 1
+    assert riwayat.keterangan == ('dinonaktifkan=0, ditindaklanjuti=1; '
+                                  'run ulang gagal: RuntimeError: database is locked')
+    # Penanda hari ini tetap ada
+    monkeypatch.undo()
+    assert jalankan_update_status_harian(HARI_INI) is None
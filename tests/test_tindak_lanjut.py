@@ -0,0 +1,74 @@
+"""Ubah status tindak lanjut massal dari dashboard (POST /karyawan/update_tindak_lanjut)."""
+import pytest
+
+from models import db
+from models.karyawan import Karyawan
+
+URL = '/karyawan/update_tindak_lanjut'
+STATUS = 'Dalam proses perpanjangan kontrak'
+JSON = {'Accept': 'application/json'}
+
+
+def _status(ids):
+    db.session.expire_all()
+    return [db.session.get(Karyawan, id).tindak_lanjut_kontrak for id in ids]
+
+
+def _flash(client):
+    with client.session_transaction() as sesi:
+        return sesi.get('_flashes', [])
+
+
+def test_json_hanya_menghitung_id_yang_ada(client, buat_karyawan):
+    ids = buat_karyawan(3)
+    response = client.post(URL, headers=JSON, data={
+        'status_tindak_lanjut': STATUS, 'ids': [str(ids[0]), str(ids[2]), str(ids[2]), '987654'],
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['ids'] == [ids[0], ids[2]]
+    assert body['status'] == STATUS
+    assert body['pesan'].startswith('Status tindak lanjut 2 karyawan')
+    assert STATUS in body['html']
+    assert _status(ids) == [STATUS, 'Tidak perlu', STATUS]
+
+
+def test_form_redirect_dengan_flash(client, buat_karyawan):
+    ids = buat_karyawan(2)
+    response = client.post(URL, data={'status_tindak_lanjut': STATUS, 'ids': [str(id) for id in ids]},
+                           headers={'Referer': '/dashboard?unit_kerja=Unit+A'})
+    assert response.status_code == 302
+    assert response.headers['Location'] == '/dashboard?unit_kerja=Unit+A'
+    assert _flash(client) == [('success', f'Status tindak lanjut 2 karyawan diperbarui menjadi "{STATUS}".')]
+    assert _status(ids) == [STATUS, STATUS]
+
+
+@pytest.mark.parametrize('status', ['Diperpanjang', '', None])
+def test_status_tidak_valid(client, buat_karyawan, status):
+    ids = buat_karyawan()
+    data = {'ids': [str(ids[0])]}
+    if status is not None:
+        data['status_tindak_lanjut'] = status
+    response = client.post(URL, headers=JSON, data=data)
+    assert response.status_code == 400
+    assert 'tidak valid' in response.get_json()['error']
+    assert _status(ids) == ['Tidak perlu']
+
+    response = client.post(URL, data=data)
+    assert response.status_code == 302
+    assert _flash(client)[0][0] == 'danger'
+
+
+@pytest.mark.parametrize('ids', [[], ['abc', '-1', '1.5', '²', ''], ['99999999999999999999']])
+def test_tanpa_id_valid(client, buat_karyawan, ids):
+    buat_karyawan()
+    response = client.post(URL, headers=JSON, data={'status_tindak_lanjut': STATUS, 'ids': ids})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Pilih minimal satu karyawan.'
+
+
+def test_id_tidak_ada_tidak_dihitung(client, buat_karyawan):
+    buat_karyawan()
+    response = client.post(URL, data={'status_tindak_lanjut': STATUS, 'ids': ['987654', '987655']})
+    assert response.status_code == 302
+    assert _flash(client) == [('success', f'Status tindak lanjut 0 karyawan diperbarui menjadi "{STATUS}".')]
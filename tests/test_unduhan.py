@@ -0,0 +1,104 @@
+"""
+Unduhan dokumen: dikirim Python (ETag, Range) atau diserahkan ke proxy (X-Accel-Redirect/X-Sendfile).
+
+Proxy digantikan EmulasiOffload, middleware yang membaca header offload dan mengirim file
+seperti nginx, sehingga jalur offload diuji dari ujung ke ujung tanpa nginx.
+"""
+import io
+import os
+
+import pytest
+
+from models import db
+from models.dokumen import Dokumen
+from services.unduhan import EmulasiOffload
+
+ISI = os.urandom(300_000)
+
+
+@pytest.fixture
+def dokumen_id(client, buat_karyawan):
+    karyawan_id = buat_karyawan()[0]
+    response = client.post(f'/dokumen/upload/{karyawan_id}', content_type='multipart/form-data',
+                           data={'jenis_dokumen': 'KTP', 'file': (io.BytesIO(ISI), 'ktp.pdf')})
+    assert response.status_code == 302
+    return db.session.query(Dokumen.id).filter_by(karyawan_id=karyawan_id).scalar()
+
+
+@pytest.fixture
+def offload(app, monkeypatch):
+    """offload(mode, emulasi=False): mengaktifkan FILE_OFFLOAD untuk tes ini."""
+    def atur(mode, emulasi=False):
+        monkeypatch.setitem(app.config, 'FILE_OFFLOAD', mode)
+        if emulasi:
+            monkeypatch.setattr(app, 'wsgi_app', EmulasiOffload(app.wsgi_app, app.config['X_ACCEL_MAPPING']))
+    return atur
+
+
+def test_dikirim_python_dengan_etag_dan_range(client, dokumen_id):
+    response = client.get(f'/dokumen/download/{dokumen_id}')
+    assert response.status_code == 200
+    assert response.data == ISI
+    assert response.headers['Content-Disposition'].startswith('attachment; filename=ktp.pdf')
+    assert 'private' in response.headers['Cache-Control']
+    assert response.headers['Last-Modified']
+
+    tidak_berubah = client.get(f'/dokumen/download/{dokumen_id}',
+                               headers={'If-None-Match': response.headers['ETag']})
+    assert tidak_berubah.status_code == 304
+
+    sebagian = client.get(f'/dokumen/download/{dokumen_id}', headers={'Range': 'bytes=100-199'})
+    assert sebagian.status_code == 206
+    assert sebagian.data == ISI[100:200]
+    assert sebagian.headers['Content-Range'] == f'bytes 100-199/{len(ISI)}'
+
+
+def test_x_accel_redirect_tanpa_body(client, dokumen_id, offload):
+    offload('x-accel-redirect')
+    response = client.get(f'/dokumen/download/{dokumen_id}')
+    assert response.status_code == 200
+    assert response.data == b''
+    assert response.headers['X-Accel-Redirect'].startswith('/_internal/uploads/blob/')
+    assert 'X-Sendfile' not in response.headers
+    assert response.headers['Content-Disposition'].startswith('attachment; filename=ktp.pdf')
+
+
+def test_x_sendfile_tanpa_body(client, dokumen_id, offload):
+    offload('x-sendfile')
+    response = client.get(f'/dokumen/download/{dokumen_id}')
+    assert response.data == b''
+    path = db.session.get(Dokumen, dokumen_id).file_path
+    assert response.headers['X-Sendfile'] == os.path.abspath(path)
+
+
+@pytest.mark.parametrize('mode', ['x-accel-redirect', 'x-sendfile'])
+def test_offload_lewat_proxy_pengganti(client, dokumen_id, offload, mode):
+    offload(mode, emulasi=True)
+    response = client.get(f'/dokumen/download/{dokumen_id}')
+    assert response.status_code == 200
+    assert response.data == ISI
+    assert response.headers['Content-Disposition'].startswith('attachment; filename=ktp.pdf')
+    assert 'X-Accel-Redirect' not in response.headers and 'X-Sendfile' not in response.headers
+
+    sebagian = client.get(f'/dokumen/download/{dokumen_id}', headers={'Range': 'bytes=0-99'})
+    assert sebagian.status_code == 206
+    assert sebagian.data == ISI[:100]
+
+
+def test_file_di_luar_folder_terpetakan_dikirim_python(client, offload):
+    # static/ tidak ada di X_ACCEL_MAPPING tes, jadi tidak bisa diserahkan ke nginx
+    offload('x-accel-redirect')
+    response = client.get('/karyawan/download_template')
+    assert response.status_code == 200
+    assert 'X-Accel-Redirect' not in response.headers
+    assert response.data[:2] == b'PK'
+
+
+def test_path_traversal_ditolak(client):
+    assert client.get('/karyawan/upload_excel/laporan/..%2F..%2Fconfig.py').status_code == 404
+
+
+def test_upload_ke_karyawan_tidak_ada(client):
+    response = client.post('/dokumen/upload/999999', content_type='multipart/form-data',
+                           data={'jenis_dokumen': 'KTP', 'file': (io.BytesIO(ISI), 'ktp.pdf')})
+    assert response.status_code == 404